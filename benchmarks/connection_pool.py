@@ -0,0 +1,146 @@
+"""
+PostgreSQL connections held by a burst of concurrent requests to the public
+animal endpoints, served in-process by the test client from many threads,
+with persistent connections (CONN_MAX_AGE) and with the connection pool of
+reks_manager.utils.postgresql_pool. The connections to the database are
+sampled from pg_stat_activity during the run.
+
+    DJANGO_SETTINGS_MODULE=config.settings.local python benchmarks/connection_pool.py --threads 32
+    DJANGO_SETTINGS_MODULE=config.settings.local python benchmarks/connection_pool.py --threads 32 --pool-size 4
+
+Without --pool-size every thread keeps a connection of its own, with it the
+connection count stays at the pool size whatever the number of threads. The
+response cache is replaced by a dummy one so every request reaches the
+database. The animals are created before the run and deleted afterwards.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--animals", type=int, default=50)
+parser.add_argument("--requests", type=int, default=4000)
+parser.add_argument("--threads", type=int, default=32)
+parser.add_argument("--pool-size", type=int, default=0, help="pool connections, 0 for persistent connections")
+parser.add_argument("--conn-max-age", type=int, default=60)
+args = parser.parse_args()
+
+from django.conf import settings  # noqa: E402
+
+# The database settings are read when the first connection is made, after setup.
+database = settings.DATABASES["default"]
+if database["ENGINE"] != "django.db.backends.postgresql":
+    sys.exit("The benchmark needs a PostgreSQL database.")
+if args.pool_size:
+    database["ENGINE"] = "reks_manager.utils.postgresql_pool"
+    database["CONN_MAX_AGE"] = 0
+    database["OPTIONS"] = {**database.get("OPTIONS", {}), "pool": {"min_size": 1, "max_size": args.pool_size}}
+else:
+    database["CONN_MAX_AGE"] = args.conn_max_age
+settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from reks_manager.core.models import PUBLIC_STATUS, Animal, AnimalStatusTransition  # noqa: E402
+from reks_manager.utils.postgresql_pool import get_pool_stats  # noqa: E402
+
+COUNT_CONNECTIONS = """
+    SELECT count(*) FROM pg_stat_activity
+    WHERE datname = current_database() AND pid <> pg_backend_pid()
+"""
+
+
+def create_animals(count, user):
+    animals = []
+    for number in range(count):
+        animal = Animal(
+            name=f"Benchmark {number}",
+            animal_type="PIES",
+            gender="SAMIEC",
+            birth_date="2020-01-01",
+            status=PUBLIC_STATUS,
+            added_by=user,
+        )
+        animal.save()
+        animals.append(animal)
+    return animals
+
+
+def sample_connections(samples, stop, interval=0.05):
+    """Append the number of other connections to the database to ``samples`` until ``stop`` is set."""
+
+    # A connection of its own, outside Django and the pool.
+    with connection.Database.connect(**connection.get_connection_params(), autocommit=True) as sampler:
+        while not stop.is_set():
+            samples.append(sampler.execute(COUNT_CONNECTIONS).fetchone()[0])
+            stop.wait(interval)
+
+
+def run(urls, requests, threads):
+    errors = []
+
+    def worker(count):
+        client = Client(SERVER_NAME="localhost")
+        for number in range(count):
+            response = client.get(urls[number % len(urls)])
+            if response.status_code != 200:
+                errors.append(response.status_code)
+        connections.close_all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(worker, [requests // threads] * threads))
+    return (requests // threads * threads) / (time.perf_counter() - started), errors
+
+
+def main():
+    user, _ = get_user_model().objects.get_or_create(email="benchmark@reks-manager.pl")
+    animals = create_animals(args.animals, user)
+    urls = [reverse("api:public-animals-list")] + [
+        reverse("api:public-animal-detail", kwargs={"slug": animal.slug}) for animal in animals
+    ]
+    # Gives the connection of the main thread back to the pool before the run.
+    connection.close()
+    mode = f"pool of {args.pool_size}" if args.pool_size else f"CONN_MAX_AGE={args.conn_max_age}"
+    print(f"{mode}, {args.requests} requests, {args.threads} threads")
+
+    samples = []
+    stop = threading.Event()
+    sampler = threading.Thread(target=sample_connections, args=(samples, stop))
+    try:
+        sampler.start()
+        throughput, errors = run(urls, args.requests, args.threads)
+        stop.set()
+        sampler.join()
+    finally:
+        stop.set()
+        pks = [animal.pk for animal in animals]
+        Animal.objects.filter(pk__in=pks).delete()
+        AnimalStatusTransition.objects.filter(animal__in=pks).delete()
+
+    print(f"  {throughput:,.0f} requests/s, {len(errors)} failed")
+    print(
+        f"  connections: min {min(samples)}, max {max(samples)}, "
+        f"mean {statistics.mean(samples):.1f} over {len(samples)} samples"
+    )
+    for alias, values in get_pool_stats().items():
+        print(f"  pool {alias}: {values}")
+
+
+if __name__ == "__main__":
+    main()
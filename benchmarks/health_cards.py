@@ -0,0 +1,121 @@
+"""
+Queries and time of a health card PATCH through the API setting --rows
+allergies, medications and vaccinations, each size first creating the rows and
+then updating them. The batched writes of HealthCardWriteSerializer run the
+same number of queries whatever the number of rows, run the benchmark on a
+checkout from before them to compare with the writes per row.
+
+    DJANGO_SETTINGS_MODULE=config.settings.local python benchmarks/health_cards.py --rows 5 50 --repeat 20
+
+Everything is created in a transaction which is rolled back afterwards.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.authtoken.models import Token  # noqa: E402
+
+from reks_manager.core.models import ALLERGY_CATEGORY, Allergy, Animal, Medication, Vaccination  # noqa: E402
+
+
+class Rollback(Exception):
+    pass
+
+
+def create_catalogue(count):
+    """``count`` allergies, medications and vaccinations to put on the health cards."""
+
+    return (
+        Allergy.objects.bulk_create(
+            Allergy(category=ALLERGY_CATEGORY[0][0], name=f"Benchmark {number}") for number in range(count)
+        ),
+        Medication.objects.bulk_create(Medication(name=f"Benchmark {number}") for number in range(count)),
+        Vaccination.objects.bulk_create(Vaccination(name=f"Benchmark {number}") for number in range(count)),
+    )
+
+
+def payload(catalogue, rows, description):
+    allergies, medications, vaccinations = (items[:rows] for items in catalogue)
+    today = timezone.localdate().isoformat()
+    return json.dumps(
+        {
+            "allergies": [{"allergy": allergy.pk, "description": description} for allergy in allergies],
+            "medications": [{"medication": medication.pk, "description": description} for medication in medications],
+            "vaccinations": [
+                {"vaccination": vaccination.pk, "vaccination_date": today, "description": description}
+                for vaccination in vaccinations
+            ],
+        }
+    )
+
+
+def patch(client, url, data):
+    """Number of queries and time in milliseconds of a PATCH of ``data``."""
+
+    with CaptureQueriesContext(connection) as context:
+        started = time.perf_counter()
+        response = client.patch(url, data=data, content_type="application/json")
+        elapsed = time.perf_counter() - started
+    assert response.status_code == 200, response.content
+    return len(context), elapsed * 1000
+
+
+def measure(client, user, catalogue, rows, repeat):
+    """Median of the queries and times of ``repeat`` PATCHes creating and then updating ``rows`` rows."""
+
+    results = {"create": [], "update": []}
+    for number in range(repeat):
+        animal = Animal(
+            name=f"Benchmark {number}", animal_type="PIES", gender="SAMIEC", birth_date="2020-01-01", added_by=user
+        )
+        animal.save()
+        url = reverse("api:healthcard-detail", kwargs={"animal": animal.pk})
+        results["create"].append(patch(client, url, payload(catalogue, rows, "Created")))
+        results["update"].append(patch(client, url, payload(catalogue, rows, "Updated")))
+    return {
+        label: (statistics.median(queries for queries, _ in values), statistics.median(ms for _, ms in values))
+        for label, values in results.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[5, 50])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"database: {connection.vendor}, median of {args.repeat} PATCHes")
+    try:
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(email="benchmark@reks-manager.pl", is_staff=True)
+            client = Client(
+                SERVER_NAME="localhost", headers={"authorization": f"Token {Token.objects.create(user=user).key}"}
+            )
+            catalogue = create_catalogue(max(args.rows))
+            for rows in args.rows:
+                for label, (queries, ms) in measure(client, user, catalogue, rows, args.repeat).items():
+                    print(f"  {rows:4} rows {label}: {queries:.0f} queries, {ms:,.1f} ms")
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Insert throughput of animals (each with its health card) with time-ordered
+primary keys, compared with random keys of the same length, and how far the
+previous ShortUUID strategy gets before running out of IDs.
+
+    DJANGO_SETTINGS_MODULE=config.settings.local python benchmarks/ids.py --sizes 10000 100000
+
+Every run inserts in a transaction which is rolled back afterwards.
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from shortuuid import ShortUUID  # noqa: E402
+
+from reks_manager.core.fields import generate_id  # noqa: E402
+from reks_manager.core.models import Animal  # noqa: E402
+
+
+class Rollback(Exception):
+    pass
+
+
+def shortuuid_ids(size):
+    """Draws needed by the previous ``length=6, alphabet="12345"`` field to get ``size`` unique IDs."""
+
+    generator = ShortUUID(alphabet="12345")
+    capacity = 5**6
+    seen = set()
+    draws = 0
+    while len(seen) < min(size, capacity):
+        seen.add(generator.random(length=6))
+        draws += 1
+    return draws, len(seen)
+
+
+def index_size():
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_relation_size('core_animal_pkey')")
+        return cursor.fetchone()[0]
+
+
+def insert(size, user, make_id=None):
+    started = time.perf_counter()
+    try:
+        with transaction.atomic():
+            for number in range(size):
+                animal = Animal(
+                    name=f"Animal {number}",
+                    animal_type="PIES",
+                    gender="SAMIEC",
+                    birth_date="2020-01-01",
+                    added_by=user,
+                )
+                if make_id is not None:
+                    animal.id = make_id()
+                animal.save()
+            elapsed = time.perf_counter() - started
+            size_bytes = index_size()
+            raise Rollback
+    except Rollback:
+        pass
+    return elapsed, size_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    user, _ = get_user_model().objects.get_or_create(email="benchmark@reks-manager.pl")
+    print(f"database: {connection.vendor}")
+    for size in args.sizes:
+        draws, unique = shortuuid_ids(size)
+        print(f"\n{size} animals")
+        exhausted = " (exhausted)" if unique < size else ""
+        print(f"  previous ShortUUID: {unique} unique IDs after {draws} draws{exhausted}")
+
+        started = time.perf_counter()
+        for _ in range(size):
+            generate_id("p_")
+        print(f"  generate_id: {size / (time.perf_counter() - started):,.0f} IDs/s")
+
+        for label, make_id in [
+            ("time-ordered", None),
+            ("random", lambda: f"p_{uuid.uuid4().hex[:26]}"),
+        ]:
+            elapsed, size_bytes = insert(size, user, make_id)
+            line = f"  {label} inserts: {size / elapsed:,.0f} animals/s"
+            if size_bytes is not None:
+                line += f", primary key index {size_bytes / 1024:,.0f} KiB"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
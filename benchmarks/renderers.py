@@ -0,0 +1,102 @@
+"""
+Rendering and parsing time of the JSON of 1k animals, as listed by the API
+(AnimalReadSerializer with nested relations), with DRF's JSONRenderer /
+JSONParser and with the orjson ones of reks_manager.utils.
+
+    DJANGO_SETTINGS_MODULE=config.settings.local python benchmarks/renderers.py --animals 1000 --repeat 20
+
+The animals are serialized once, only the rendering and parsing are timed.
+They are created in a transaction which is rolled back afterwards.
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import transaction  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from reks_manager.core.models import Animal  # noqa: E402
+from reks_manager.core.optimizers import optimize_queryset  # noqa: E402
+from reks_manager.core.serializers import AnimalReadSerializer  # noqa: E402
+from reks_manager.utils.parsers import ORJSONParser  # noqa: E402
+from reks_manager.utils.renderers import ORJSONRenderer, orjson  # noqa: E402
+
+
+class Rollback(Exception):
+    pass
+
+
+def serialized_animals(count, user):
+    """``ReturnList`` of ``count`` animals serialized like the API does."""
+
+    data = None
+    try:
+        with transaction.atomic():
+            for number in range(count):
+                Animal(
+                    name=f"Animal {number}",
+                    animal_type="PIES",
+                    gender="SAMIEC",
+                    birth_date="2020-01-01",
+                    # Stands in for the long texts of real listings.
+                    description="Łagodny, lubi dzieci. " * 20,
+                    added_by=user,
+                ).save()
+            queryset = optimize_queryset(Animal.objects.order_by("created_at"), AnimalReadSerializer)[:count]
+            data = AnimalReadSerializer(queryset, many=True).data
+            raise Rollback
+    except Rollback:
+        pass
+    return data
+
+
+def timed(function, repeat):
+    """Median time of ``function()`` in milliseconds."""
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--animals", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    if orjson is None:
+        sys.exit("The benchmark needs orjson, see requirements/base.txt.")
+
+    user, _ = get_user_model().objects.get_or_create(email="benchmark@reks-manager.pl")
+    data = serialized_animals(args.animals, user)
+    rendered = JSONRenderer().render(data)
+    if ORJSONRenderer().render(data) != rendered:
+        sys.exit("The renderers disagree.")
+    print(f"{len(data)} animals, {len(rendered) / 1024:,.0f} KiB of JSON, median of {args.repeat} runs")
+
+    for label, renderer_class, parser_class in [
+        ("DRF", JSONRenderer, JSONParser),
+        ("orjson", ORJSONRenderer, ORJSONParser),
+    ]:
+        render_ms = timed(lambda: renderer_class().render(data), args.repeat)
+        parse_ms = timed(lambda: parser_class().parse(io.BytesIO(rendered)), args.repeat)
+        print(f"  {label}: render {render_ms:,.1f} ms, parse {parse_ms:,.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Latency of quick requests to the public animal detail while many slow clients
+download a large public animal list, with gunicorn sync workers (WSGI) and
+with uvicorn workers (ASGI, DJANGO_ASYNC_PUBLIC_VIEWS=True). Each server is
+started on a local port with the same number of workers, the slow clients
+read their response at --rate bytes per second through a small receive buffer.
+
+    DJANGO_SETTINGS_MODULE=config.settings.local python benchmarks/slow_clients.py --slow-clients 50 --workers 2
+
+Needs gunicorn and uvicorn, see requirements/production.txt. The animals are
+created before the run and deleted afterwards.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from reks_manager.core.models import PUBLIC_STATUS, Animal, AnimalStatusTransition  # noqa: E402
+
+SERVERS = {
+    "WSGI": ["config.wsgi:application"],
+    "ASGI": ["config.asgi:application", "--worker-class", "uvicorn.workers.UvicornWorker"],
+}
+
+
+def create_animals(count, user):
+    animals = []
+    for number in range(count):
+        animal = Animal(
+            name=f"Benchmark {number}",
+            animal_type="PIES",
+            gender="SAMIEC",
+            birth_date="2020-01-01",
+            status=PUBLIC_STATUS,
+            # Stands in for the photo URLs and long texts of real listings.
+            description="Benchmark " * 200,
+            added_by=user,
+        )
+        animal.save()
+        animals.append(animal)
+    return animals
+
+
+def start_server(name, port, workers):
+    env = {**os.environ, "DJANGO_ASYNC_PUBLIC_VIEWS": str(name == "ASGI")}
+    command = [sys.executable, "-m", "gunicorn", *SERVERS[name]]
+    command += ["--bind", f"127.0.0.1:{port}", "--workers", str(workers), "--timeout", "300"]
+    server = subprocess.Popen(command, cwd=BASE_DIR, env=env, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    sys.exit(f"{name} server did not start.")
+
+
+async def get(port, path, rate=None, chunk_size=4096):
+    """GET ``path``, reading the response at ``rate`` bytes per second, return the bytes received."""
+
+    sock = socket.socket()
+    if rate is not None:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, chunk_size)
+    sock.setblocking(False)
+    await asyncio.get_running_loop().sock_connect(sock, ("127.0.0.1", port))
+    reader, writer = await asyncio.open_connection(sock=sock, limit=chunk_size)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+
+    received = 0
+    while data := await reader.read(chunk_size):
+        received += len(data)
+        if rate is not None:
+            await asyncio.sleep(len(data) / rate)
+    writer.close()
+    return received
+
+
+async def run(port, list_path, detail_path, args):
+    slow_clients = [asyncio.create_task(get(port, list_path, rate=args.rate)) for _ in range(args.slow_clients)]
+    # Let the slow clients occupy the server first.
+    await asyncio.sleep(1)
+
+    latencies = []
+    for _ in range(args.probes):
+        started = time.perf_counter()
+        await asyncio.wait_for(get(port, detail_path), timeout=args.timeout)
+        latencies.append(time.perf_counter() - started)
+
+    received = await asyncio.gather(*slow_clients)
+    return latencies, received
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--animals", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--slow-clients", type=int, default=50)
+    parser.add_argument("--rate", type=int, default=64 * 1024, help="bytes per second read by a slow client")
+    parser.add_argument("--probes", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=120, help="seconds a probe may take")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    user, _ = get_user_model().objects.get_or_create(email="benchmark@reks-manager.pl")
+    animals = create_animals(args.animals, user)
+    list_path = f"{reverse('api:public-animals-list')}?page_size=100"
+    detail_path = reverse("api:public-animal-detail", kwargs={"slug": animals[0].slug})
+
+    print(f"{args.workers} workers, {args.slow_clients} slow clients at {args.rate:,} B/s, {args.probes} probes")
+    try:
+        for name in SERVERS:
+            server = start_server(name, args.port, args.workers)
+            try:
+                latencies, received = asyncio.run(run(args.port, list_path, detail_path, args))
+            finally:
+                server.terminate()
+                server.wait()
+            print(
+                f"  {name}: probe p50 {statistics.median(latencies) * 1000:,.0f} ms, "
+                f"max {max(latencies) * 1000:,.0f} ms, "
+                f"{statistics.mean(received) / 1024:,.0f} KiB per slow client"
+            )
+    finally:
+        pks = [animal.pk for animal in animals]
+        Animal.objects.filter(pk__in=pks).delete()
+        AnimalStatusTransition.objects.filter(animal__in=pks).delete()
+
+
+if __name__ == "__main__":
+    main()
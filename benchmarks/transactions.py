@@ -0,0 +1,101 @@
+"""
+Throughput of the public animal endpoints with every request wrapped in a
+transaction (the previous ATOMIC_REQUESTS = True) and in autocommit, served
+in-process by the test client from a few threads. The response cache is
+replaced by a dummy one so every request reaches the database, pass
+--cached to keep the configured cache.
+
+    DJANGO_SETTINGS_MODULE=config.settings.local python benchmarks/transactions.py --animals 200 --requests 2000
+
+The animals are created before the run and deleted afterwards.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from reks_manager.core.models import PUBLIC_STATUS, Animal, AnimalStatusTransition  # noqa: E402
+
+
+def create_animals(count, user):
+    animals = []
+    for number in range(count):
+        animal = Animal(
+            name=f"Benchmark {number}",
+            animal_type="PIES",
+            gender="SAMIEC",
+            birth_date="2020-01-01",
+            status=PUBLIC_STATUS,
+            added_by=user,
+        )
+        animal.save()
+        animals.append(animal)
+    return animals
+
+
+def run(urls, requests, threads):
+    def worker(count):
+        client = Client(SERVER_NAME="localhost")
+        for number in range(count):
+            response = client.get(urls[number % len(urls)])
+            assert response.status_code == 200, response.status_code
+        connections.close_all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(worker, [requests // threads] * threads))
+    return (requests // threads * threads) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--animals", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--cached", action="store_true", help="keep the configured response cache")
+    args = parser.parse_args()
+
+    user, _ = get_user_model().objects.get_or_create(email="benchmark@reks-manager.pl")
+    animals = create_animals(args.animals, user)
+    endpoints = {
+        "list": [reverse("api:public-animals-list")],
+        "detail": [reverse("api:public-animal-detail", kwargs={"slug": animal.slug}) for animal in animals],
+    }
+    caches = (
+        nullcontext()
+        if args.cached
+        else override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}})
+    )
+
+    print(f"database: {connection.vendor}, {args.animals} animals, {args.requests} requests, {args.threads} threads")
+    try:
+        with caches:
+            for name, urls in endpoints.items():
+                for label, atomic_requests in [("ATOMIC_REQUESTS", True), ("autocommit", False)]:
+                    for alias in connections:
+                        connections[alias].settings_dict["ATOMIC_REQUESTS"] = atomic_requests
+                    run(urls, args.threads * 10, args.threads)  # warm-up
+                    print(f"  {name:6} {label:15} {run(urls, args.requests, args.threads):,.0f} requests/s")
+    finally:
+        pks = [animal.pk for animal in animals]
+        Animal.objects.filter(pk__in=pks).delete()
+        AnimalStatusTransition.objects.filter(animal__in=pks).delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 from django.conf import settings
+from django.urls import URLPattern
 from rest_framework.routers import DefaultRouter, SimpleRouter
 
 from reks_manager.blog.views import CategoryViewSet, PostViewSet
+from reks_manager.core.async_views import AsyncReadView
 from reks_manager.core.views import (
     AdopterView,
     AllergyView,
@@ -10,6 +12,7 @@ from reks_manager.core.views import (
     AnimalsViewSet,
     HealthCardView,
     MedicationView,
+    StatisticsViewSet,
     TemporaryHomeView,
     VaccinationView,
     VeterinaryVisitView,
@@ -21,8 +24,8 @@ else:
     router = SimpleRouter()
 
 # router.register("users", UserViewSet)
-router.register("public/animals", AnimalsPublicViewSet)
-router.register("public/animal", AnimalPublicView)
+router.register("public/animals", AnimalsPublicViewSet, basename="public-animals")
+router.register("public/animal", AnimalPublicView, basename="public-animal")
 router.register("animals", AnimalsViewSet)
 router.register("allergy", AllergyView, basename="allergy")
 router.register("medication", MedicationView)
@@ -31,6 +34,7 @@ router.register("veterinary-visit", VeterinaryVisitView)
 router.register("temporary-home", TemporaryHomeView)
 router.register("adopter", AdopterView)
 router.register("health-card", HealthCardView)
+router.register("statistics", StatisticsViewSet, basename="statistics")
 
 router.register("blog/category", CategoryViewSet)
 router.register("blog/post", PostViewSet)
@@ -38,3 +42,25 @@ router.register("blog/post", PostViewSet)
 
 app_name = "api"
 urlpatterns = router.urls
+
+if settings.ASYNC_PUBLIC_VIEWS:
+    # Read endpoints served with the async ORM under ASGI, see reks_manager.core.async_views.
+    async_read_views = {
+        "public-animals-list",
+        "public-animal-detail",
+        "category-list",
+        "category-detail",
+        "post-list",
+        "post-detail",
+    }
+    urlpatterns = [
+        URLPattern(
+            pattern.pattern,
+            AsyncReadView.as_view(viewset_view=pattern.callback),
+            pattern.default_args,
+            pattern.name,
+        )
+        if isinstance(pattern, URLPattern) and pattern.name in async_read_views
+        else pattern
+        for pattern in urlpatterns
+    ]
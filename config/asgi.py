@@ -0,0 +1,31 @@
+"""
+ASGI config for reks_manager project.
+
+It exposes the ASGI callable as a module-level variable named ``application``,
+served e.g. by gunicorn with uvicorn workers, in the Procfile::
+
+    web: gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker
+
+The server writes responses to slow clients without holding a worker. Set
+DJANGO_ASYNC_PUBLIC_VIEWS=True to also serve the public and blog read
+endpoints with async views, see reks_manager.core.async_views.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/dev/howto/deployment/asgi/
+
+"""
+import os
+import sys
+from pathlib import Path
+
+from django.core.asgi import get_asgi_application
+
+# This allows easy placement of apps within the interior
+# reks_manager directory.
+BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
+sys.path.append(str(BASE_DIR / "reks_manager"))
+# We defer to a DJANGO_SETTINGS_MODULE already in the environment, like config/wsgi.py.
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+
+# This application object is used by any ASGI server configured to use this file.
+application = get_asgi_application()
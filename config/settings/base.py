@@ -57,7 +57,15 @@ DATABASES = {
         default="postgres://localhost/reks_manager",
     ),
 }
-DATABASES["default"]["ATOMIC_REQUESTS"] = True
+# Requests run in autocommit, writes open their own transactions, see reks_manager.utils.transactions.
+DATABASES["default"]["ATOMIC_REQUESTS"] = False
+# Optional read replica of the public and reporting views, see reks_manager.utils.replicas
+if env("DATABASE_REPLICA_URL", default=None):
+    DATABASES["replica"] = env.db("DATABASE_REPLICA_URL")
+DATABASE_ROUTERS = ["reks_manager.utils.replicas.ReplicaRouter"]
+REPLICA_DATABASE: str | None = "replica"
+# Seconds the reads of a staff browser stay on the primary after it wrote to it
+REPLICA_STICKY_SECONDS = env.int("DJANGO_REPLICA_STICKY_SECONDS", default=10)
 # https://docs.djangoproject.com/en/stable/ref/settings/#std:setting-DEFAULT_AUTO_FIELD
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -67,6 +75,8 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 ROOT_URLCONF = "config.urls"
 # https://docs.djangoproject.com/en/dev/ref/settings/#wsgi-application
 WSGI_APPLICATION = "config.wsgi.application"
+# Serve the public and blog read endpoints with async views, for ASGI deployments, see config/asgi.py.
+ASYNC_PUBLIC_VIEWS = env.bool("DJANGO_ASYNC_PUBLIC_VIEWS", default=False)
 
 # APPS
 # ------------------------------------------------------------------------------
@@ -80,6 +90,7 @@ DJANGO_APPS = [
     # "django.contrib.humanize", # Handy template tags
     "jazzmin",
     "django.contrib.admin",
+    "django.contrib.postgres",
     "django.forms",
     "ckeditor",
 ]
@@ -146,6 +157,7 @@ AUTH_PASSWORD_VALIDATORS = [
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
+    "reks_manager.utils.instrumentation.QueryMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -154,6 +166,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "reks_manager.utils.replicas.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",
@@ -238,6 +251,8 @@ EMAIL_BACKEND = env(
 )
 # https://docs.djangoproject.com/en/dev/ref/settings/#email-timeout
 EMAIL_TIMEOUT = 5
+# Send queued e-mails right after commit instead of waiting for manage.py send_outbox_emails
+EMAIL_OUTBOX_EAGER = env.bool("DJANGO_EMAIL_OUTBOX_EAGER", default=False)
 
 # ADMIN
 # ------------------------------------------------------------------------------
@@ -303,11 +318,22 @@ SOCIALACCOUNT_FORMS = {"signup": "reks_manager.users.forms.UserSocialSignupForm"
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
+        "reks_manager.user_auth.authentication.CachedTokenAuthentication",
     ),
     "EXCEPTION_HANDLER": "reks_manager.users.api.views.custom_exception_handler",
+    "DEFAULT_RENDERER_CLASSES": (
+        "reks_manager.utils.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "reks_manager.utils.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_PAGINATION_CLASS": "reks_manager.core.pagination.KeysetPagination",
+    "PAGE_SIZE": 20,
     # "DEFAULT_THROTTLE_CLASSES": [
     #     'rest_framework.throttling.ScopedRateThrottle',
     # ],
@@ -372,6 +398,37 @@ STORAGES = {
 # ------------------------------------------------------------------------------
 MEDIA_URL = f"https://{aws_s3_domain}/media/"
 
+# PUBLIC API CACHE
+# ------------------------------------------------------------------------------
+# Seconds a cached public animal response is kept, entries are also dropped on every change.
+PUBLIC_CACHE_TIMEOUT = env.int("DJANGO_PUBLIC_CACHE_TIMEOUT", default=60 * 15)
+
+# IMAGE VARIANTS
+# ------------------------------------------------------------------------------
+# Generate photo variants right after commit instead of waiting for manage.py generate_image_variants
+IMAGE_VARIANTS_EAGER = env.bool("DJANGO_IMAGE_VARIANTS_EAGER", default=False)
+
+# INSTRUMENTATION
+# ------------------------------------------------------------------------------
+# Server-Timing / X-SQL-Count headers on every response, see reks_manager.utils.instrumentation
+METRICS_RESPONSE_HEADERS = env.bool("DJANGO_METRICS_RESPONSE_HEADERS", default=DEBUG)
+# Bearer token of the Prometheus scraper, /metrics/ is only served in DEBUG without it
+METRICS_TOKEN = env("DJANGO_METRICS_TOKEN", default=None)
+# Raise instead of logging when a view runs more queries than its query_budgets allow
+QUERY_BUDGET_STRICT = env.bool("DJANGO_QUERY_BUDGET_STRICT", default=False)
+
+# TOKEN AUTHENTICATION
+# ------------------------------------------------------------------------------
+# Seconds a token from /auth-token/ stays valid, 0 for tokens that never expire
+AUTH_TOKEN_TTL = env.int("DJANGO_AUTH_TOKEN_TTL", default=60 * 60 * 24 * 14)
+# Seconds after which /auth-token/ replaces the token of the user with a new one
+AUTH_TOKEN_ROTATE_AFTER = env.int("DJANGO_AUTH_TOKEN_ROTATE_AFTER", default=60 * 60 * 24)
+# Seconds a token lookup is kept in the default cache, see reks_manager.user_auth.authentication
+AUTH_TOKEN_CACHE_TIMEOUT = env.int("DJANGO_AUTH_TOKEN_CACHE_TIMEOUT", default=60 * 5)
+# Per-process LRU in front of it, a change made by another process is seen after this many seconds
+AUTH_TOKEN_LOCAL_CACHE_TIMEOUT = env.int("DJANGO_AUTH_TOKEN_LOCAL_CACHE_TIMEOUT", default=10)
+AUTH_TOKEN_LOCAL_CACHE_SIZE = env.int("DJANGO_AUTH_TOKEN_LOCAL_CACHE_SIZE", default=1024)
+
 CKEDITOR_CONFIGS = {
     "default": {
         "toolbar": "full",
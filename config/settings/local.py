@@ -27,6 +27,11 @@ CACHES = {
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#email-backend
 EMAIL_BACKEND = env("DJANGO_EMAIL_BACKEND", default="django.core.mail.backends.console.EmailBackend")
+EMAIL_OUTBOX_EAGER = env.bool("DJANGO_EMAIL_OUTBOX_EAGER", default=True)
+
+# IMAGE VARIANTS
+# ------------------------------------------------------------------------------
+IMAGE_VARIANTS_EAGER = env.bool("DJANGO_IMAGE_VARIANTS_EAGER", default=True)
 
 # WhiteNoise
 # ------------------------------------------------------------------------------
@@ -12,6 +12,34 @@ ALLOWED_HOSTS = env.list("DJANGO_ALLOWED_HOSTS", default=["example.com"])
 # DATABASES
 # ------------------------------------------------------------------------------
 DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)  # noqa: F405
+# Pooled connections, see reks_manager.utils.postgresql_pool. Only worth it when
+# a worker serves several requests at once: under ASGI (DJANGO_ASYNC_PUBLIC_VIEWS)
+# or with gunicorn --threads, WEB_THREADS. Sync gunicorn workers serve one
+# request at a time and keep their connection with CONN_MAX_AGE instead.
+WEB_THREADS = env.int("WEB_THREADS", default=1)
+# An ASGI worker starts every request it receives, ASGI_CONCURRENCY is the number
+# of them expected to run their views at once (cap it with uvicorn --limit-concurrency).
+# ReleaseConnectionsMiddleware returns the connections before the response is
+# sent, so requests waiting for slow clients do not count.
+ASGI_CONCURRENCY = env.int("ASGI_CONCURRENCY", default=10)
+if env.bool("DATABASE_POOL", default=ASYNC_PUBLIC_VIEWS or WEB_THREADS > 1):  # noqa: F405
+    for database in DATABASES.values():  # noqa: F405
+        database["ENGINE"] = "reks_manager.utils.postgresql_pool"
+        # Connections go back to the pool at the end of every request, or earlier
+        # with ReleaseConnectionsMiddleware.
+        database["CONN_MAX_AGE"] = 0
+        database.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": 1,
+            "max_size": env.int(
+                "DATABASE_POOL_MAX_SIZE",
+                default=ASGI_CONCURRENCY if ASYNC_PUBLIC_VIEWS else WEB_THREADS,  # noqa: F405
+            ),
+            # Seconds a request waits for a connection before failing.
+            "timeout": env.float("DATABASE_POOL_TIMEOUT", default=10),
+            "max_idle": env.float("DATABASE_POOL_MAX_IDLE", default=300),
+            "max_lifetime": env.float("DATABASE_POOL_MAX_LIFETIME", default=1800),
+        }
+    MIDDLEWARE.insert(0, "reks_manager.utils.postgresql_pool.ReleaseConnectionsMiddleware")  # noqa: F405
 
 # CACHES
 # ------------------------------------------------------------------------------
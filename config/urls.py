@@ -8,6 +8,7 @@ from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
 from reks_manager.core.views import HomeTestView
 from reks_manager.users.api.views import CustomAuthToken
+from reks_manager.utils.instrumentation import metrics_view
 
 urlpatterns = [
     path("", HomeTestView.as_view(), name="home"),
@@ -33,6 +34,8 @@ urlpatterns += [
         SpectacularSwaggerView.as_view(url_name="api-schema"),
         name="api-docs",
     ),
+    # Prometheus
+    path("metrics/", metrics_view, name="metrics"),
 ]
 
 if settings.DEBUG:
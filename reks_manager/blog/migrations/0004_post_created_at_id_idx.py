@@ -0,0 +1,16 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0003_alter_post_author"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["created_at", "id"], name="post_created_at_id_idx"),
+        ),
+    ]
@@ -37,3 +37,4 @@ class Post(models.Model):
     class Meta:
         verbose_name = _("Post")
         verbose_name_plural = _("Posts")
+        indexes = [models.Index(fields=["created_at", "id"], name="post_created_at_id_idx")]
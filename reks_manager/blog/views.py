@@ -1,14 +1,21 @@
 from rest_framework.viewsets import ModelViewSet
 
+from reks_manager.core.mixins import ConditionalGetMixin
+from reks_manager.utils.instrumentation import InstrumentedViewMixin
+from reks_manager.utils.replicas import ReplicaReadsMixin
+from reks_manager.utils.transactions import AtomicWritesMixin
+
 from .models import Category, Post
 from .serializers import CategorySerializer, PostSerializer
 
 
-class CategoryViewSet(ModelViewSet):
+class CategoryViewSet(InstrumentedViewMixin, AtomicWritesMixin, ReplicaReadsMixin, ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    query_budgets = {"list": 5, "retrieve": 5}
 
 
-class PostViewSet(ModelViewSet):
+class PostViewSet(InstrumentedViewMixin, AtomicWritesMixin, ReplicaReadsMixin, ConditionalGetMixin, ModelViewSet):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
+    query_budgets = {"list": 6, "retrieve": 6}
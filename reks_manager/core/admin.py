@@ -1,4 +1,13 @@
+import json
+import typing
+
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Count, IntegerField, OuterRef, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils.functional import cached_property
 from django.utils.translation import gettext as _
 
 from .models import (
@@ -16,16 +25,127 @@ from .models import (
 )
 
 
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator using the planner's row estimate on PostgreSQL instead of an
+    exact ``COUNT(*)`` when it is above ``exact_count_threshold``, the last
+    page numbers are approximate then. Small results are counted exactly, and
+    so are filtered or searched lists, which the estimate can be far off for.
+    """
+
+    exact_count_threshold = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = typing.cast(QuerySet, self.object_list)
+        if connections[queryset.db].vendor == "postgresql" and not queryset.query.where:
+            estimate = json.loads(queryset.explain(format="json"))[0]["Plan"]["Plan Rows"]
+            if estimate > self.exact_count_threshold:
+                return estimate
+        return super().count
+
+
+class InputFilter(admin.SimpleListFilter):
+    """
+    Text box filtering ``field_path`` with ``lookup``, for free-text columns
+    where a list of choices would be a ``SELECT DISTINCT`` over the table.
+    Use ``InputFilter.for_field("name", _("Name"))`` in ``list_filter``.
+    """
+
+    template = "admin/filters/input_filter.html"
+    field_path = None
+    lookup = "icontains"
+
+    @classmethod
+    def for_field(cls, field_path, title, lookup="icontains"):
+        attrs = {
+            "field_path": field_path,
+            "title": title,
+            "parameter_name": f"{field_path}__{lookup}",
+            "lookup": lookup,
+        }
+        return type(f"{field_path.title().replace('_', '')}InputFilter", (cls,), attrs)
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{f"{self.field_path}__{self.lookup}": self.value()})
+        return queryset
+
+
+class AutocompleteFilter(admin.RelatedFieldListFilter):
+    """
+    Foreign key filter searching the related objects with the admin
+    autocomplete view, instead of listing all of them. The admin of the related
+    model needs ``search_fields``. Use ``("field", AutocompleteFilter)``.
+    """
+
+    template = "admin/filters/autocomplete_filter.html"
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.model = model
+        # The cleared select submits an empty value, which would match nothing.
+        lookup_kwarg = f"{field_path}__{field.target_field.name}__exact"
+        if params.get(lookup_kwarg) == "":
+            del params[lookup_kwarg]
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+    def has_output(self):
+        return True
+
+    def field_choices(self, field, request, model_admin):
+        # Only the selected object, the others are fetched while typing.
+        if self.lookup_val is None:
+            return []
+        related = field.remote_field.model._default_manager.filter(**{field.target_field.name: self.lookup_val})
+        return [(getattr(obj, field.target_field.attname), str(obj)) for obj in related]
+
+    @property
+    def app_label(self):
+        return self.model._meta.app_label
+
+    @property
+    def model_name(self):
+        return self.model._meta.model_name
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist settings for tables too large to count or scan on every page
+    load: estimated page counts, no full result count, and filters from
+    ``InputFilter`` / ``AutocompleteFilter`` instead of lists of all values.
+    Set ``list_select_related`` for the foreign keys shown in ``list_display``.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @property
+    def media(self):
+        media = super().media
+        filters = [item[1] for item in self.list_filter if isinstance(item, (list, tuple))]
+        if any(
+            isinstance(list_filter, type) and issubclass(list_filter, AutocompleteFilter) for list_filter in filters
+        ):
+            media += AutocompleteSelect(self.model._meta.pk, self.admin_site).media
+        return media
+
+
 @admin.register(Adopter)
-class AdopterAdmin(admin.ModelAdmin):
+class AdopterAdmin(LargeTableAdmin):
     list_display = ("name", "phone_number", "address", "updated_at")
-    list_filter = ("name", "created_at", "updated_at")
+    list_filter = (InputFilter.for_field("name", _("Name")), "created_at", "updated_at")
     search_fields = ("name",)
     readonly_fields = ("id",)
 
 
 @admin.register(Animal)
-class AnimalAdmin(admin.ModelAdmin):
+class AnimalAdmin(LargeTableAdmin):
     list_display = (
         "id",
         "animal_type",
@@ -35,7 +155,7 @@ class AnimalAdmin(admin.ModelAdmin):
         "created_at",
         "updated_at",
     )
-    list_filter = ("name", "created_at", "updated_at")
+    list_filter = (InputFilter.for_field("name", _("Name")), "status", "residence", "created_at", "updated_at")
     search_fields = ("name",)
     readonly_fields = ("slug", "id", "added_by")
 
@@ -47,7 +167,7 @@ class AnimalAdmin(admin.ModelAdmin):
 
 
 @admin.register(TemporaryHome)
-class TemporaryHomeAdmin(admin.ModelAdmin):
+class TemporaryHomeAdmin(LargeTableAdmin):
     list_display = (
         "owner",
         "phone_number",
@@ -56,13 +176,19 @@ class TemporaryHomeAdmin(admin.ModelAdmin):
         "building",
         "apartment",
     )
-    list_filter = ("owner", "city", "street", "created_at", "updated_at")
+    list_filter = (
+        InputFilter.for_field("owner", _("Owner")),
+        InputFilter.for_field("city", _("City"), lookup="istartswith"),
+        InputFilter.for_field("street", _("Street")),
+        "created_at",
+        "updated_at",
+    )
     search_fields = ("owner",)
     readonly_fields = ("id",)
 
 
 @admin.register(VeterinaryVisit)
-class VeterinaryVisitAdmin(admin.ModelAdmin):
+class VeterinaryVisitAdmin(LargeTableAdmin):
     list_display = (
         "health_card",
         "doctor",
@@ -70,8 +196,9 @@ class VeterinaryVisitAdmin(admin.ModelAdmin):
         "created_at",
         "updated_at",
     )
-    list_filter = ("health_card", "doctor", "date", "created_at", "updated_at")
-    search_fields = ("health_card.animal.name", "doctor")
+    list_filter = (("health_card", AutocompleteFilter), "doctor", "date", "created_at", "updated_at")
+    list_select_related = ("health_card__animal",)
+    search_fields = ("health_card__animal__name", "doctor")
 
 
 class HealthCardAllergyInline(admin.StackedInline):
@@ -90,7 +217,7 @@ class HealthCardVaccinationInline(admin.StackedInline):
 
 
 @admin.register(HealthCard)
-class HealthCardAdmin(admin.ModelAdmin):
+class HealthCardAdmin(LargeTableAdmin):
     inlines = [HealthCardVaccinationInline, HealthCardAllergyInline, HealthCardMedicationInline]
     list_display = (
         "id",
@@ -104,31 +231,59 @@ class HealthCardAdmin(admin.ModelAdmin):
     fields = ("animal",)
     readonly_fields = ("id",)
     list_filter = (
-        "animal",
+        ("animal", AutocompleteFilter),
         "created_at",
         "updated_at",
     )
+    search_fields = ("animal__name",)
+
+    # Counted by a subquery per relation: joining all three would multiply the rows.
+    counted_relations = {
+        "allergies_count": HealthCardAllergy,
+        "medications_count": HealthCardMedication,
+        "vaccinations_count": HealthCardVaccination,
+    }
+    list_select_related = ("animal",)
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return queryset.annotate(
+            **{
+                name: Coalesce(
+                    Subquery(
+                        model._default_manager.filter(health_card=OuterRef("pk"))
+                        .order_by()
+                        .values("health_card")
+                        .annotate(count=Count("pk"))
+                        .values("count"),
+                        output_field=IntegerField(),
+                    ),
+                    Value(0),
+                )
+                for name, model in self.counted_relations.items()
+            }
+        )
 
     @admin.display(
         description=_("Allergies Count"),
-        ordering="Allergies__Count",
+        ordering="allergies_count",
     )
     def allergies_count(self, obj):
-        return obj.allergies.count()
+        return obj.allergies_count
 
     @admin.display(
         description=_("Medications Count"),
-        ordering="medications__count",
+        ordering="medications_count",
     )
     def medications_count(self, obj):
-        return obj.medications.count()
+        return obj.medications_count
 
     @admin.display(
         description=_("Vaccinations Count"),
-        ordering="vaccinations__count",
+        ordering="vaccinations_count",
     )
     def vaccinations_count(self, obj):
-        return obj.vaccinations.count()
+        return obj.vaccinations_count
 
 
 @admin.register(Allergy)
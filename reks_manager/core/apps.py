@@ -5,3 +5,6 @@ from django.utils.translation import gettext_lazy as _
 class UsersConfig(AppConfig):
     name = "reks_manager.core"
     verbose_name = _("Core")
+
+    def ready(self):
+        import reks_manager.core.signals  # noqa: F401
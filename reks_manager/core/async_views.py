@@ -0,0 +1,128 @@
+"""
+Async variants of the read endpoints of a DRF viewset, for ASGI deployments
+(``ASYNC_PUBLIC_VIEWS``, see config/asgi.py). DRF views are sync only, so
+``AsyncReadView`` drives the viewset of the route it replaces: its queryset,
+filters, pagination, serializer, conditional and cached responses, with the
+queries run by the async ORM (``aiterator``, ``aget``, ``aaggregate``).
+
+Authentication, permissions and throttling of the viewset run in a thread,
+other methods than GET / HEAD are handed over to the viewset itself. The
+serializer must not load relations on its own, ``OptimizedQuerySetMixin``
+preloads them.
+"""
+import typing
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.views import View
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+from .mixins import CachedListMixin, CachedRetrieveMixin, ConditionalListMixin, ConditionalRetrieveMixin
+
+
+def aiterate(queryset):
+    """Async iterator over ``queryset``, chunked with ``aiterator`` unless it prefetches relations."""
+
+    # aiterator() does not support prefetch_related() before Django 5.0.
+    if queryset._prefetch_related_lookups:
+        return queryset.__aiter__()
+    return queryset.aiterator()
+
+
+class AsyncReadView(View):
+    """
+    Serves the ``list`` or ``retrieve`` action of ``viewset_view``, the view
+    function the router made for the route, asynchronously.
+    """
+
+    viewset_view: typing.Any = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view: typing.Any = super().as_view(**initkwargs)
+        # Labelled like the viewset action in the metrics, with its query budget.
+        viewset_view = initkwargs["viewset_view"]
+        view.cls = viewset_view.cls
+        view.actions = viewset_view.actions
+        view.initkwargs = viewset_view.initkwargs
+        # DRF enforces CSRF in SessionAuthentication, for the handed over writes too.
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return await sync_to_async(self.viewset_view)(request, *args, **kwargs)
+        # The handlers of this view are coroutines, so is what dispatch() returns.
+        return await super().dispatch(request, *args, **kwargs)  # type: ignore[misc]
+
+    def get_viewset(self, request, *args, **kwargs):
+        """Viewset instance set up like ``ViewSetMixin.as_view`` and ``APIView.dispatch`` do."""
+
+        viewset = self.viewset_view.cls(**self.viewset_view.initkwargs)
+        viewset.action_map = {"get": self.viewset_view.actions["get"], "head": self.viewset_view.actions["get"]}
+        # The browsable API renders forms with sync queries.
+        viewset.renderer_classes = [
+            renderer for renderer in viewset.renderer_classes if not issubclass(renderer, BrowsableAPIRenderer)
+        ]
+        viewset.args = args
+        viewset.kwargs = kwargs
+        viewset.request = viewset.initialize_request(request, *args, **kwargs)
+        viewset.headers = viewset.default_response_headers
+        return viewset
+
+    async def get(self, request, *args, **kwargs):
+        viewset = self.get_viewset(request, *args, **kwargs)
+        try:
+            await sync_to_async(viewset.initial)(viewset.request, *args, **kwargs)
+            handler = getattr(self, viewset.action)
+            response = await handler(viewset, viewset.request, *args, **kwargs)
+        except Exception as exc:
+            response = viewset.handle_exception(exc)
+        response = viewset.finalize_response(viewset.request, response, *args, **kwargs)
+        # Not modified responses are plain HttpResponses.
+        return response.render() if isinstance(response, Response) else response
+
+    async def list(self, viewset, request, *args, **kwargs):
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        handler = partial(self.list_response, viewset, queryset)
+        if isinstance(viewset, ConditionalListMixin):
+            handler = partial(viewset.aget_conditional_response, queryset, handler)
+        # Cache hits, 304s included, are answered before the validators are computed.
+        if isinstance(viewset, CachedListMixin):
+            handler = partial(viewset.aget_cached_response, handler)
+        return await handler(request, *args, **kwargs)
+
+    async def list_response(self, viewset, queryset, request, *args, **kwargs):
+        paginator = viewset.paginator
+        page = None if paginator is None else await paginator.apaginate_queryset(queryset, request, view=viewset)
+        if page is not None:
+            return viewset.get_paginated_response(viewset.get_serializer(page, many=True).data)
+        objects = [obj async for obj in aiterate(queryset)]
+        return Response(viewset.get_serializer(objects, many=True).data)
+
+    async def retrieve(self, viewset, request, *args, **kwargs):
+        lookup_url_kwarg = viewset.lookup_url_kwarg or viewset.lookup_field
+        # Same as get_object_or_404 of DRF.
+        try:
+            queryset = viewset.filter_queryset(viewset.get_queryset()).filter(
+                **{viewset.lookup_field: kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        handler = partial(self.retrieve_response, viewset, queryset)
+        if isinstance(viewset, ConditionalRetrieveMixin):
+            handler = partial(viewset.aget_conditional_response, queryset, handler)
+        if isinstance(viewset, CachedRetrieveMixin):
+            handler = partial(viewset.aget_cached_response, handler)
+        return await handler(request, *args, **kwargs)
+
+    async def retrieve_response(self, viewset, queryset, request, *args, **kwargs):
+        try:
+            instance = await queryset.aget()
+        except queryset.model.DoesNotExist:
+            raise Http404
+        await sync_to_async(viewset.check_object_permissions)(request, instance)
+        return Response(viewset.get_serializer(instance).data)
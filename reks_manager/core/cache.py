@@ -0,0 +1,66 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import get_language
+
+from reks_manager.utils.replicas import pin_primary_reads
+
+PUBLIC_ANIMALS_NAMESPACE = "public-animals"
+
+
+def _generation_key(namespace):
+    return f"{namespace}:generation"
+
+
+def get_generation(namespace):
+    """
+    Return the current generation of ``namespace``. Cached responses embed the
+    generation in their keys, so bumping it drops all of them at once.
+    """
+    key = _generation_key(namespace)
+    generation = cache.get(key)
+    if generation is None:
+        # Start from a timestamp so an evicted counter never reuses an old generation.
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(namespace):
+    key = _generation_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), timeout=None)
+    # The replica may not have the change yet, refill the cache from the primary.
+    pin_primary_reads(namespace)
+
+
+def get_response_cache_key(namespace, request, view_name, view_kwargs):
+    generation = get_generation(namespace)
+    if generation is None:
+        return None
+
+    params = sorted((key, request.query_params.getlist(key)) for key in request.query_params)
+    digest = hashlib.md5(
+        # Paginated responses hold absolute links, hence the scheme and host, and
+        # the cached ETag depends on the renderer.
+        repr(
+            (
+                request.scheme,
+                request.get_host(),
+                getattr(request, "accepted_media_type", None),
+                view_name,
+                sorted(view_kwargs.items()),
+                params,
+            )
+        ).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    return f"{namespace}:{generation}:{get_language()}:{digest}"
+
+
+def get_cache_timeout():
+    return getattr(settings, "PUBLIC_CACHE_TIMEOUT", 60 * 15)
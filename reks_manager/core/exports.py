@@ -0,0 +1,192 @@
+"""
+Full dumps of the animals with the contents of their health cards as CSV,
+JSON lines or XLSX.
+
+Rows are read with ``.iterator(chunk_size=...)``, a server-side cursor on
+PostgreSQL, and written one at a time, so memory use does not depend on the
+number of animals. Health card rows are prefetched per chunk.
+"""
+import csv
+import json
+import tempfile
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.utils import timezone
+from openpyxl import Workbook
+
+from .models import Animal, HealthCardAllergy, HealthCardMedication, HealthCardVaccination, VeterinaryVisit
+
+CHUNK_SIZE = 500
+XLSX_READ_SIZE = 64 * 1024
+
+FIELDS = (
+    "id",
+    "name",
+    "slug",
+    "animal_type",
+    "breed",
+    "gender",
+    "birth_date",
+    "status",
+    "residence",
+    "location_where_found",
+    "date_when_found",
+    "description",
+    "description_of_health",
+    "size",
+    "chip",
+    "neutered",
+    "vaccinated",
+    "dewormed",
+    "character",
+    "for_who",
+    "added_by",
+    "adopted_by",
+    "temporary_home",
+    "allergies",
+    "medications",
+    "vaccinations",
+    "veterinary_visits",
+    "created_at",
+    "updated_at",
+)
+HEALTH_CARD_FIELDS = ("allergies", "medications", "vaccinations", "veterinary_visits")
+
+
+def get_queryset():
+    return (
+        Animal.objects.select_related("added_by", "adopted_by", "temporary_home", "healthcards")
+        .prefetch_related(
+            Prefetch(
+                "healthcards__healthcardallergies",
+                queryset=HealthCardAllergy.objects.select_related("allergy").order_by("id"),
+            ),
+            Prefetch(
+                "healthcards__healthcardmedications",
+                queryset=HealthCardMedication.objects.select_related("medication").order_by("id"),
+            ),
+            Prefetch(
+                "healthcards__healthcardvaccinations",
+                queryset=HealthCardVaccination.objects.select_related("vaccination").order_by(
+                    "vaccination_date", "id"
+                ),
+            ),
+            Prefetch("healthcards__veterinaryvisits", queryset=VeterinaryVisit.objects.order_by("date", "id")),
+        )
+        .order_by("created_at", "id")
+    )
+
+
+def _get_health_card(animal):
+    try:
+        return animal.healthcards
+    except Animal.healthcards.RelatedObjectDoesNotExist:
+        return None
+
+
+def get_record(animal):
+    """Export record of a prefetched ``animal``, health card rows as lists of dicts."""
+
+    record = {field: getattr(animal, field) for field in FIELDS if field not in HEALTH_CARD_FIELDS}
+    record["added_by"] = animal.added_by.email if animal.added_by else None
+    record["adopted_by"] = str(animal.adopted_by) if animal.adopted_by else None
+    record["temporary_home"] = str(animal.temporary_home) if animal.temporary_home else None
+
+    health_card = _get_health_card(animal)
+    record["allergies"] = [
+        {"category": row.allergy.category, "name": row.allergy.name, "description": row.description}
+        for row in (health_card.healthcardallergies.all() if health_card else [])
+    ]
+    record["medications"] = [
+        {"name": row.medication.name, "description": row.description}
+        for row in (health_card.healthcardmedications.all() if health_card else [])
+    ]
+    record["vaccinations"] = [
+        {"name": row.vaccination.name, "date": row.vaccination_date, "description": row.description}
+        for row in (health_card.healthcardvaccinations.all() if health_card else [])
+    ]
+    record["veterinary_visits"] = [
+        {"date": row.date, "doctor": row.doctor, "description": row.description}
+        for row in (health_card.veterinaryvisits.all() if health_card else [])
+    ]
+    return record
+
+
+def iter_records(queryset=None, chunk_size=CHUNK_SIZE):
+    queryset = get_queryset() if queryset is None else queryset
+    for animal in queryset.iterator(chunk_size=chunk_size):
+        yield get_record(animal)
+
+
+def _flatten(value):
+    # One cell per health card list, "name date: description" entries separated by "; ".
+    if not isinstance(value, list):
+        return value
+    entries = []
+    for item in value:
+        item = dict(item)
+        description = item.pop("description", "")
+        entry = " ".join(str(part) for part in item.values() if part not in (None, ""))
+        entries.append(f"{entry}: {description}" if description else entry)
+    return "; ".join(entries)
+
+
+class _Echo:
+    """File-like object returning what is written, lets csv.writer feed a generator."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(records):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(FIELDS)
+    for record in records:
+        yield writer.writerow([_flatten(record[field]) for field in FIELDS])
+
+
+def iter_jsonl(records):
+    for record in records:
+        yield json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+def _xlsx_value(value):
+    # Excel has no time zones, datetimes are written in the local time.
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.make_naive(value)
+    return value
+
+
+def iter_xlsx(records):
+    """
+    XLSX is a zip archive written when the workbook is saved, so rows go to a
+    write-only workbook, which keeps them in a temporary file instead of in
+    memory, and the saved archive is streamed from disk.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("animals")
+    sheet.append(FIELDS)
+    for record in records:
+        sheet.append([_xlsx_value(_flatten(record[field])) for field in FIELDS])
+
+    with tempfile.TemporaryFile() as file:
+        workbook.save(file)
+        file.seek(0)
+        while chunk := file.read(XLSX_READ_SIZE):
+            yield chunk
+
+
+EXPORT_FORMATS = {
+    "csv": (iter_csv, "text/csv; charset=utf-8"),
+    "jsonl": (iter_jsonl, "application/x-ndjson; charset=utf-8"),
+    "xlsx": (iter_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def export(export_format, queryset=None, chunk_size=CHUNK_SIZE):
+    """Generator of the ``export_format`` dump, ``str`` chunks for text formats and ``bytes`` for XLSX."""
+
+    writer, _content_type = EXPORT_FORMATS[export_format]
+    return writer(iter_records(queryset, chunk_size))
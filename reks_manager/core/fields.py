@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+from functools import partial, reduce
+from operator import or_
+
+from autoslug import AutoSlugField
+from autoslug.utils import crop_slug, get_prepopulated_value
+from django.db import models
+
+CROCKFORD_ALPHABET = "0123456789abcdefghjkmnpqrstvwxyz"
+RANDOMNESS_BITS = 80
+ID_LENGTH = 26
+# Suffixes of up to this many digits are among the slugs read to pick a free one.
+SLUG_SUFFIX_DIGITS = 3
+
+_lock = threading.Lock()
+_last = (0, 0)
+
+
+def _reset_after_fork():
+    global _last
+    _last = (0, 0)
+
+
+# A forked worker must not continue the sequence of its parent.
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _encode(value, length):
+    chars = []
+    for _ in range(length):
+        value, remainder = divmod(value, 32)
+        chars.append(CROCKFORD_ALPHABET[remainder])
+    return "".join(reversed(chars))
+
+
+def generate_id(prefix=""):
+    """
+    ``prefix`` followed by a ULID: 48 bits of milliseconds and 80 random bits in
+    lowercase Crockford base32, so IDs sort by creation time and new rows are
+    appended to the end of the primary key index.
+
+    IDs generated by one process within the same millisecond increment the
+    random part of the previous one, so they stay ordered and never repeat.
+    """
+    global _last
+    with _lock:
+        timestamp = time.time_ns() // 1_000_000
+        last_timestamp, last_randomness = _last
+        if timestamp <= last_timestamp:
+            timestamp, randomness = last_timestamp, last_randomness + 1
+        else:
+            randomness = int.from_bytes(os.urandom(RANDOMNESS_BITS // 8), "big")
+        _last = (timestamp, randomness)
+    value = (timestamp << RANDOMNESS_BITS) | (randomness & ((1 << RANDOMNESS_BITS) - 1))
+    return prefix + _encode(value, ID_LENGTH)
+
+
+class TimeOrderedIDField(models.CharField):
+    """
+    Primary key generated by ``generate_id``. IDs generated by the previous
+    fields stay valid, they are plain strings of the same column.
+    """
+
+    def __init__(self, *args, prefix="", **kwargs):
+        self.prefix = prefix
+        kwargs.setdefault("max_length", len(prefix) + ID_LENGTH)
+        kwargs["default"] = partial(generate_id, prefix)
+        kwargs.setdefault("editable", False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        del kwargs["default"]
+        kwargs["prefix"] = self.prefix
+        return name, path, args, kwargs
+
+
+class PrecomputedSlugField(AutoSlugField):
+    """
+    AutoSlugField keeping the slug assigned by ``assign_unique_slugs``, and the
+    current one while ``populate_from`` is unchanged since the instance was
+    loaded (per its ``_loaded_values``). New slugs are made unique with one
+    query for the slugs starting with the same base, cropped to leave room for
+    a suffix, instead of a query per attempt.
+    """
+
+    def pre_save(self, instance, add):
+        slug = instance.__dict__.pop(f"_precomputed_{self.attname}", None)
+        if slug is None and not add and self._is_source_unchanged(instance):
+            slug = getattr(instance, self.attname)
+        if slug is None:
+            if self.unique_with:
+                return super().pre_save(instance, add)
+            base = _get_base_slug(self, instance)
+            rivals = type(instance)._default_manager.filter(
+                **{f"{self.attname}__startswith": _get_rivals_prefix(self, base)}
+            )
+            if instance.pk is not None:
+                rivals = rivals.exclude(pk=instance.pk)
+            slug = _get_free_slug(self, base, set(rivals.values_list(self.attname, flat=True)))
+        setattr(instance, self.attname, slug)
+        return slug
+
+    def _is_source_unchanged(self, instance):
+        if not isinstance(self.populate_from, str) or not getattr(instance, self.attname):
+            return False
+        loaded = getattr(instance, "_loaded_values", {})
+        return self.populate_from in loaded and loaded[self.populate_from] == getattr(instance, self.populate_from)
+
+
+def _get_base_slug(field, instance):
+    # Same steps as AutoSlugField.pre_save up to the uniqueness check.
+    value = get_prepopulated_value(field, instance)
+    slug = (field.slugify(value) if value else None) or instance._meta.model_name
+    return field.slugify(crop_slug(field, slug))
+
+
+def _get_rivals_prefix(field, base):
+    # A base filling max_length is cropped to make room for the suffix.
+    return base[: field.max_length - len(field.index_sep) - SLUG_SUFFIX_DIGITS]
+
+
+def _get_free_slug(field, base, taken):
+    slug, index = base, 1
+    while slug in taken:
+        index += 1
+        tail = f"{field.index_sep}{index}"
+        slug = f"{base[: field.max_length - len(tail)]}{tail}"
+    return slug
+
+
+def assign_unique_slugs(instances, field_name="slug"):
+    """
+    Assign unique slugs to new ``instances`` with one query for the slugs
+    already taken, also among the instances themselves. Used before
+    ``bulk_create`` so the whole batch is made unique at once, ``pre_save``
+    of the slug field then keeps the precomputed values.
+    """
+    if not instances:
+        return
+    model = type(instances[0])
+    field = model._meta.get_field(field_name)
+    bases = [_get_base_slug(field, instance) for instance in instances]
+    prefixes = {_get_rivals_prefix(field, base) for base in bases}
+    query = reduce(or_, (models.Q(**{f"{field.attname}__startswith": prefix}) for prefix in prefixes))
+    taken = set(model._default_manager.filter(query).values_list(field.attname, flat=True))
+
+    for instance, base in zip(instances, bases):
+        slug = _get_free_slug(field, base, taken)
+        taken.add(slug)
+        setattr(instance, field.attname, slug)
+        instance.__dict__[f"_precomputed_{field.attname}"] = slug
@@ -0,0 +1,36 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField, TrigramSimilarity
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+
+class AnimalSearchFilter(filters.SearchFilter):
+    """
+    Full-text search over the generated ``core_animal.search_vector`` column
+    (name, breed, character, for_who and description, diacritics folded) with
+    a trigram match on the name to survive typos. Results are ranked by
+    relevance unless the client asked for an explicit ordering.
+
+    On databases other than PostgreSQL the default ``icontains`` search over
+    ``search_fields`` is used.
+    """
+
+    search_config = "polish_unaccent"
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = " ".join(self.get_search_terms(request))
+        if not search_terms or connections[queryset.db].vendor != "postgresql":
+            return super().filter_queryset(request, queryset, view)
+
+        query = SearchQuery(search_terms, config=self.search_config, search_type="websearch")
+        vector = RawSQL(f'"{queryset.model._meta.db_table}"."search_vector"', [], output_field=SearchVectorField())
+        queryset = (
+            queryset.alias(search_vector=vector)
+            .filter(Q(search_vector=query) | Q(name__trigram_similar=search_terms))
+            .annotate(search_rank=SearchRank(F("search_vector"), query) + TrigramSimilarity("name", search_terms))
+        )
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by("-search_rank")
+        return queryset
@@ -0,0 +1,93 @@
+"""
+Resized, EXIF-stripped JPEG / WebP variants of uploaded photos, stored next
+to the original as ``<upload_to>/variants/<name>-<width>w.<ext>``.
+"""
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+VARIANT_WIDTHS = (320, 640, 1024, 1600)
+VARIANT_FORMATS = {
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def get_variant_widths(width):
+    """Widths smaller than ``width``, plus the original one when it is below the largest."""
+
+    widths = {size for size in VARIANT_WIDTHS if size < width}
+    widths.add(min(width, VARIANT_WIDTHS[-1]))
+    return sorted(widths)
+
+
+def _open(field_file):
+    with field_file.open("rb"):
+        image = Image.open(field_file)
+        # JPEG can be decoded at a fraction of its size, much cheaper for large photos.
+        image.draft("RGB", (VARIANT_WIDTHS[-1], VARIANT_WIDTHS[-1]))
+        image.load()
+    # Rotate according to the orientation tag before the EXIF data is dropped.
+    return ImageOps.exif_transpose(image)
+
+
+def _flatten(image):
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def generate_variants(field_file):
+    """
+    Write the variants of the image in ``field_file`` to its storage and return
+    ``{format: [{"width", "height", "name"}, ...]}``, ordered by width.
+
+    Images are saved without ``exif`` / ``icc_profile``, so no metadata such as
+    the GPS position of the phone that took the photo is published.
+    """
+    image = _flatten(_open(field_file))
+    directory, filename = posixpath.split(field_file.name)
+    stem = posixpath.splitext(filename)[0]
+
+    variants: dict[str, list] = {key: [] for key in VARIANT_FORMATS}
+    for width in get_variant_widths(image.width):
+        height = max(round(image.height * width / image.width), 1)
+        resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+        for key, (image_format, extension, options) in VARIANT_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, format=image_format, **options)
+            name = field_file.storage.save(
+                posixpath.join(directory, "variants", f"{stem}-{width}w.{extension}"), ContentFile(buffer.getvalue())
+            )
+            variants[key].append({"width": width, "height": height, "name": name})
+    return variants
+
+
+def delete_variants(storage, variants):
+    """Delete the files of ``variants`` as returned by ``generate_variants`` from ``storage``."""
+
+    for key in VARIANT_FORMATS:
+        for variant in variants.get(key, ()):
+            storage.delete(variant["name"])
+
+
+def get_srcset(storage, variants):
+    """``srcset`` attribute values and the largest JPEG as ``src``, ``None`` without variants."""
+
+    if not variants:
+        return None
+    largest = variants["jpeg"][-1]
+    return {
+        "src": storage.url(largest["name"]),
+        "width": largest["width"],
+        "height": largest["height"],
+        **{
+            key: ", ".join(f"{storage.url(variant['name'])} {variant['width']}w" for variant in variants[key])
+            for key in VARIANT_FORMATS
+        },
+    }
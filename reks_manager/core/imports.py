@@ -0,0 +1,356 @@
+"""
+Loading of legacy shelter records from CSV, see manage.py import_records.
+
+Files are read in chunks and every row is validated with the rules of the API
+serializers. References are given by natural keys, an adopter by
+``adopter_name`` / ``adopter_phone_number`` / ``adopter_address``, a temporary
+home by ``temporary_home_owner`` / ``temporary_home_phone_number`` and the
+animal of a veterinary visit by its ``animal`` id or slug. They are resolved
+through in-memory maps instead of a query per row.
+
+On PostgreSQL a chunk is COPYed into a temporary staging table and merged into
+the target table with one ``INSERT ... SELECT ... ON CONFLICT``, adopters and
+temporary homes are upserted by their natural keys. Other databases fall back
+to ``bulk_create``.
+"""
+import csv
+import time
+import typing
+from collections.abc import Mapping
+from itertools import islice
+
+from django.db import connections, transaction
+from django.db.models import Model, Q
+from django.utils.translation import gettext as _
+from rest_framework import serializers
+
+from . import statistics
+from .cache import PUBLIC_ANIMALS_NAMESPACE, bump_generation
+from .fields import assign_unique_slugs
+from .models import PUBLIC_STATUS, Adopter, Animal, AnimalStatusTransition, HealthCard, TemporaryHome, VeterinaryVisit
+from .serializers import (
+    AdopterSerializer,
+    AnimalWriteSerializer,
+    BulkPrimaryKeyRelatedField,
+    TemporaryHomeSerializer,
+    VeterinaryVisitsSerializer,
+)
+
+CHUNK_SIZE = 2000
+
+
+class AdopterImportSerializer(AdopterSerializer):
+    class Meta(AdopterSerializer.Meta):
+        # Existing adopters are updated, not rejected as duplicates.
+        validators: list = []
+
+
+class TemporaryHomeImportSerializer(TemporaryHomeSerializer):
+    class Meta(TemporaryHomeSerializer.Meta):
+        validators: list = []
+
+
+class AnimalImportSerializer(AnimalWriteSerializer):
+    class Meta(AnimalWriteSerializer.Meta):
+        fields = [
+            field
+            for field in AnimalWriteSerializer.Meta.fields
+            if field not in ("image", "added_by", "health_card", "health_card_id")
+        ]
+
+
+class VeterinaryVisitImportSerializer(VeterinaryVisitsSerializer):
+    health_card = BulkPrimaryKeyRelatedField(queryset=HealthCard.objects.all())
+
+
+class _ResolvedInstances(Mapping):
+    """
+    ``BulkPrimaryKeyRelatedField.instances`` for primary keys already known to
+    exist, the instances are only used for their pk.
+    """
+
+    def __init__(self, model, pks):
+        self.model = model
+        self.pks = pks
+
+    def __getitem__(self, pk):
+        if pk not in self.pks:
+            raise KeyError(pk)
+        return self.model(pk=pk)
+
+    def __iter__(self):
+        return iter(self.pks)
+
+    def __len__(self):
+        return len(self.pks)
+
+
+def _normalize(value):
+    return " ".join(value.split()) if isinstance(value, str) else value
+
+
+class ImportResult:
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.loaded = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.name}: {self.rows} rows, {self.loaded} loaded, {len(self.errors)} rejected "
+            f"in {self.seconds:.2f}s ({self.rows_per_second:.0f} rows/s)"
+        )
+
+
+class RecordImporter:
+    """
+    Import of one CSV file into ``model``. Rows sharing ``unique_fields`` with
+    an existing record update its ``update_fields``.
+    """
+
+    name: str
+    model: type[Model]
+    serializer_class: type[serializers.Serializer]
+    unique_fields: tuple[str, ...] = ()
+    update_fields: tuple[str, ...] = ()
+
+    def __init__(self, using="default", chunk_size=CHUNK_SIZE):
+        self.using = using
+        self.connection = connections[using]
+        self.chunk_size = chunk_size
+        self.serializer = self.serializer_class()
+        self.staging_tables = set()
+
+    def set_known_pks(self, field_name, model, pks):
+        """Let the ``field_name`` field of the serializer accept the ``pks`` of ``model`` without a query."""
+
+        field = typing.cast(BulkPrimaryKeyRelatedField, self.serializer.fields[field_name])
+        field.instances = _ResolvedInstances(model, pks)
+
+    def run(self, file):
+        result = ImportResult(self.name)
+        started = time.perf_counter()
+        reader = csv.DictReader(file)
+        try:
+            while chunk := list(islice(self.iter_rows(reader), self.chunk_size)):
+                result.rows += len(chunk)
+                instances = self.validate(chunk, result.errors)
+                with transaction.atomic(using=self.using):
+                    result.loaded += self.load(instances)
+        finally:
+            self.drop_staging_tables()
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def iter_rows(self, reader):
+        for row in reader:
+            # Empty cells are left out, so optional fields take their defaults.
+            values = {key: _normalize(value) for key, value in row.items() if key and value not in (None, "")}
+            yield reader.line_num, values
+
+    def resolve(self, chunk, errors):
+        """Replace natural keys of the rows in ``chunk`` by primary keys, return the rows left."""
+
+        return chunk
+
+    def validate(self, chunk, errors):
+        instances = []
+        for line, data in self.resolve(chunk, errors):
+            try:
+                validated_data = self.serializer.run_validation(data)
+            except serializers.ValidationError as exc:
+                errors.append((line, exc.detail))
+            else:
+                instances.append(self.model(**validated_data))
+        return instances
+
+    def load(self, instances):
+        if not instances:
+            return 0
+        if self.connection.vendor == "postgresql":
+            return self.copy_and_merge(self.model, instances, self.unique_fields, self.update_fields)
+        if self.update_fields:
+            options: dict[str, typing.Any] = {"update_conflicts": True, "unique_fields": self.unique_fields}
+            options["update_fields"] = self.update_fields
+        else:
+            options = {"ignore_conflicts": bool(self.unique_fields)}
+        self.model._default_manager.using(self.using).bulk_create(instances, **options)
+        return len(instances)
+
+    def copy_and_merge(self, model, instances, unique_fields=(), update_fields=()):
+        """COPY ``instances`` into the staging table of ``model`` and merge it into the table."""
+
+        quote = self.connection.ops.quote_name
+        # Automatic primary keys are left to their sequence.
+        fields = [field for field in model._meta.concrete_fields if not (field.primary_key and field.auto_created)]
+        table = quote(model._meta.db_table)
+        staging = quote(f"import_{model._meta.db_table}")
+        columns = ", ".join(quote(field.column) for field in fields)
+
+        with self.connection.cursor() as cursor:
+            if staging not in self.staging_tables:
+                # Without the constraints and generated columns of the table.
+                cursor.execute(f"CREATE TEMPORARY TABLE {staging} AS SELECT {columns} FROM {table} WITH NO DATA")
+                self.staging_tables.add(staging)
+            cursor.execute(f"TRUNCATE {staging}")
+
+            with cursor.copy(f"COPY {staging} ({columns}) FROM STDIN") as copy:
+                for instance in instances:
+                    # pre_save fills created_at / updated_at and the slug, as in bulk_create.
+                    copy.write_row(
+                        [field.get_db_prep_save(field.pre_save(instance, True), self.connection) for field in fields]
+                    )
+
+            if unique_fields:
+                key = ", ".join(quote(model._meta.get_field(name).column) for name in unique_fields)
+                # A key can only be merged once per statement, the last row of the file wins.
+                select = f"SELECT DISTINCT ON ({key}) {columns} FROM {staging} ORDER BY {key}, ctid DESC"
+                if update_fields:
+                    assignments = ", ".join(
+                        f"{column} = EXCLUDED.{column}"
+                        for column in (quote(model._meta.get_field(name).column) for name in update_fields)
+                    )
+                    conflict = f" ON CONFLICT ({key}) DO UPDATE SET {assignments}"
+                else:
+                    conflict = f" ON CONFLICT ({key}) DO NOTHING"
+            else:
+                select, conflict = f"SELECT {columns} FROM {staging}", ""
+            cursor.execute(f"INSERT INTO {table} ({columns}) {select}{conflict}")
+            return cursor.rowcount
+
+    def drop_staging_tables(self):
+        if not self.staging_tables:
+            return
+        with self.connection.cursor() as cursor:
+            for staging in self.staging_tables:
+                cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+        self.staging_tables.clear()
+
+
+class AdopterImporter(RecordImporter):
+    name = "adopters"
+    model = Adopter
+    serializer_class = AdopterImportSerializer
+    unique_fields = ("name", "phone_number", "address")
+    update_fields = ("updated_at",)
+
+
+class TemporaryHomeImporter(RecordImporter):
+    name = "temporary homes"
+    model = TemporaryHome
+    serializer_class = TemporaryHomeImportSerializer
+    unique_fields = ("owner", "phone_number")
+    update_fields = ("city", "street", "building", "apartment", "zip_code", "updated_at")
+
+
+class AnimalImporter(RecordImporter):
+    """Animals are always added, each with a new health card."""
+
+    name = "animals"
+    model = Animal
+    serializer_class = AnimalImportSerializer
+
+    def __init__(self, *args, added_by=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.added_by = added_by
+        # Loaded once, these tables are small next to the number of animals.
+        self.adopters = {
+            tuple(_normalize(value) for value in key): pk
+            for *key, pk in Adopter.objects.using(self.using).values_list("name", "phone_number", "address", "pk")
+        }
+        self.temporary_homes = {
+            tuple(_normalize(value) for value in key): pk
+            for *key, pk in TemporaryHome.objects.using(self.using).values_list("owner", "phone_number", "pk")
+        }
+        self.set_known_pks("adopted_by", Adopter, set(self.adopters.values()))
+        self.set_known_pks("temporary_home", TemporaryHome, set(self.temporary_homes.values()))
+
+    def resolve(self, chunk, errors):
+        for line, data in chunk:
+            adopter = tuple(data.pop(f"adopter_{field}", "") for field in ("name", "phone_number", "address"))
+            home = tuple(data.pop(f"temporary_home_{field}", "") for field in ("owner", "phone_number"))
+            row_errors = {}
+            if any(adopter):
+                if adopter in self.adopters:
+                    data["adopted_by"] = self.adopters[adopter]
+                else:
+                    row_errors["adopted_by"] = [_("Unknown adopter.")]
+            if any(home):
+                if home in self.temporary_homes:
+                    data["temporary_home"] = self.temporary_homes[home]
+                else:
+                    row_errors["temporary_home"] = [_("Unknown temporary home.")]
+            if row_errors:
+                errors.append((line, row_errors))
+            else:
+                yield line, data
+
+    def validate(self, chunk, errors):
+        animals = super().validate(chunk, errors)
+        for animal in animals:
+            animal.added_by = self.added_by
+        return animals
+
+    def load(self, animals):
+        if not animals:
+            return 0
+        assign_unique_slugs(animals)
+        health_cards = [HealthCard(animal=animal) for animal in animals]
+        if self.connection.vendor == "postgresql":
+            loaded = self.copy_and_merge(Animal, animals)
+            self.copy_and_merge(HealthCard, health_cards)
+            self.copy_and_merge(
+                AnimalStatusTransition, [AnimalStatusTransition.for_created(animal) for animal in animals]
+            )
+        else:
+            loaded = len(Animal.objects.using(self.using).bulk_create(animals))
+            HealthCard.objects.using(self.using).bulk_create(health_cards)
+            AnimalStatusTransition.objects.using(self.using).bulk_create(
+                [AnimalStatusTransition.for_created(animal) for animal in animals]
+            )
+        statistics.record_created(animals, using=self.using)
+        # Bulk loading sends no post_save, see reks_manager.core.signals
+        if any(animal.status == PUBLIC_STATUS for animal in animals):
+            transaction.on_commit(lambda: bump_generation(PUBLIC_ANIMALS_NAMESPACE), using=self.using)
+        return loaded
+
+
+class VeterinaryVisitImporter(RecordImporter):
+    """Visits are always added, the ``animal`` column holds the id or the slug of the animal."""
+
+    name = "veterinary visits"
+    model = VeterinaryVisit
+    serializer_class = VeterinaryVisitImportSerializer
+
+    def resolve(self, chunk, errors):
+        keys = {data["animal"] for line, data in chunk if "animal" in data}
+        health_cards = {}
+        for animal_id, slug, pk in (
+            HealthCard.objects.using(self.using)
+            .filter(Q(animal_id__in=keys) | Q(animal__slug__in=keys))
+            .values_list("animal_id", "animal__slug", "pk")
+        ):
+            health_cards[animal_id] = health_cards[slug] = pk
+        self.set_known_pks("health_card", HealthCard, set(health_cards.values()))
+
+        for line, data in chunk:
+            animal = data.pop("animal", None)
+            if animal not in health_cards:
+                errors.append((line, {"animal": [_("Unknown animal.")]}))
+                continue
+            data["health_card"] = health_cards[animal]
+            yield line, data
+
+
+IMPORTERS = {
+    "adopters": AdopterImporter,
+    "temporary_homes": TemporaryHomeImporter,
+    "animals": AnimalImporter,
+    "veterinary_visits": VeterinaryVisitImporter,
+}
@@ -0,0 +1,102 @@
+import re
+
+from django.core.exceptions import FieldError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from rest_framework.settings import api_settings
+
+from config.api_router import router
+from reks_manager.core.pagination import KeysetPagination
+
+SEQ_SCAN_PATTERNS = {
+    "postgresql": re.compile(r"Seq Scan on (\S+)"),
+    "sqlite": re.compile(r"\bSCAN (\S+)$"),
+}
+
+# Page size explained when neither the paginator nor PAGE_SIZE sets one.
+DEFAULT_PAGE_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the queryset behind every registered API viewset, as paginated by "
+        "KeysetPagination, and report the sequential scans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--orderings",
+            action="store_true",
+            help="Also explain the first page for every entry of the viewset's ordering_fields.",
+        )
+        parser.add_argument(
+            "--no-seqscan",
+            action="store_true",
+            help="PostgreSQL only: disable seq scans, so small tables show whether an index path exists at all.",
+        )
+        parser.add_argument("--fail", action="store_true", help="Exit with an error when a seq scan is found.")
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        pattern = SEQ_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f"Unsupported database vendor: {connection.vendor}")
+
+        found = []
+        with transaction.atomic(using=options["database"]):
+            if options["no_seqscan"] and connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+            for prefix, viewset, basename in router.registry:
+                for label, queryset in self.get_querysets(viewset, basename, options["orderings"]):
+                    plan = queryset.using(options["database"]).explain()
+                    tables = [match.group(1) for match in map(pattern.search, plan.splitlines()) if match]
+                    if tables:
+                        found.append(label)
+                        self.stdout.write(self.style.WARNING(f"{label}: seq scan on {', '.join(tables)}"))
+                    else:
+                        self.stdout.write(self.style.SUCCESS(f"{label}: OK"))
+                    if options["verbosity"] > 1:
+                        self.stdout.write(plan)
+
+        self.stdout.write(f"{len(found)} querysets with seq scans")
+        if found and options["fail"]:
+            raise CommandError(f"Seq scans in: {', '.join(found)}")
+
+    def get_querysets(self, viewset, basename, with_orderings):
+        """
+        Yield ``(label, queryset)`` for the list and retrieve actions of ``viewset``,
+        built the way the view builds them. Only the main query is explained, the
+        prefetch queries always filter on an indexed foreign key.
+        """
+        if hasattr(viewset, "list"):
+            view = viewset(action="list", request=None, format_kwarg=None, args=(), kwargs={})
+            paginator = KeysetPagination()
+            page_size = paginator.page_size or api_settings.PAGE_SIZE or DEFAULT_PAGE_SIZE
+            queryset = view.get_queryset()
+            orderings = [None]
+            if with_orderings:
+                orderings += getattr(view, "ordering_fields", None) or []
+            for term in orderings:
+                try:
+                    ordered = queryset.order_by(term) if term else queryset
+                except FieldError:
+                    self.stdout.write(
+                        f"{basename}-list ?ordering={term}: skipped, not a field of {queryset.model._meta.label}"
+                    )
+                    continue
+                ordering = paginator.get_ordering(ordered, view)
+                label = f"{basename}-list" + (f" ?ordering={term}" if term else "")
+                yield label, ordered.order_by(*ordering)[: page_size + 1]
+
+        if hasattr(viewset, "retrieve"):
+            view = viewset(action="retrieve", request=None, format_kwarg=None, args=(), kwargs={})
+            lookup_field = view.lookup_field
+            queryset = view.get_queryset()
+            value = queryset.model._default_manager.values_list(lookup_field, flat=True).first()
+            if value is None:
+                self.stdout.write(f"{basename}-detail: skipped, no rows to look up")
+            else:
+                yield f"{basename}-detail", queryset.filter(**{lookup_field: value})
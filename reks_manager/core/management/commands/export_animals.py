@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reks_manager.core.exports import CHUNK_SIZE, EXPORT_FORMATS, export
+
+
+class Command(BaseCommand):
+    help = "Export every animal with the contents of its health card as CSV, JSON lines or XLSX."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv", dest="export_format")
+        parser.add_argument("--output", "-o", help="File to write to, standard output by default.")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Animals fetched per round trip.")
+
+    def handle(self, *args, **options):
+        export_format, output = options["export_format"], options["output"]
+        binary = export_format == "xlsx"
+        if binary and not output:
+            raise CommandError("XLSX can only be written to a file, use --output.")
+
+        chunks = export(export_format, chunk_size=options["chunk_size"])
+        if not output:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(output, "wb") as file:
+            for chunk in chunks:
+                file.write(chunk if binary else chunk.encode())
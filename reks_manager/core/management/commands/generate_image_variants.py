@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from PIL import Image
+
+from reks_manager.core.models import Animal
+
+
+class Command(BaseCommand):
+    help = "Generate the resized JPEG / WebP variants of animal photos uploaded since the last run, until stopped."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=10, help="Seconds to wait when nothing is left.")
+        parser.add_argument("--once", action="store_true", help="Exit once every photo has its variants.")
+        parser.add_argument("--all", action="store_true", help="Regenerate the variants of every photo and exit.")
+
+    def handle(self, *args, **options):
+        queryset = Animal.objects.exclude(Q(image="") | Q(image__isnull=True)).only("pk", "image")
+        if options["all"]:
+            self.generate(queryset.iterator())
+            return
+
+        try:
+            while True:
+                if not self.generate(queryset.filter(image_variants={})[:100]):
+                    if options["once"]:
+                        break
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+
+    def generate(self, animals):
+        count = 0
+        for animal in animals:
+            count += 1
+            try:
+                animal.generate_image_variants()
+            except (OSError, Image.DecompressionBombError) as e:
+                # Keep broken uploads from being picked up again, --all retries them.
+                Animal.objects.filter(pk=animal.pk, image=animal.image.name).update(image_variants={"error": repr(e)})
+                self.stderr.write(f"{animal.pk}: {e!r}")
+            else:
+                self.stdout.write(f"{animal.pk}: {animal.image.name}")
+        return count
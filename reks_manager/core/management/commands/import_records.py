@@ -0,0 +1,46 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from reks_manager.core.imports import CHUNK_SIZE, IMPORTERS, AnimalImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Import legacy records from CSV files with a header row named after the API fields. "
+        "Files are loaded in dependency order, rows failing validation are reported and skipped."
+    )
+
+    def add_arguments(self, parser):
+        for name in IMPORTERS:
+            parser.add_argument(f"--{name.replace('_', '-')}", metavar="CSV", help=f"CSV file of {name}.")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows validated and loaded at once.")
+        parser.add_argument("--added-by", metavar="EMAIL", help="User recorded as having added the animals.")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if not any(options[name] for name in IMPORTERS):
+            raise CommandError(f"Nothing to import, pass at least one of --{', --'.join(IMPORTERS)}.")
+        if options["added_by"] and not options["animals"]:
+            raise CommandError("--added-by only applies to --animals.")
+        added_by = None
+        if options["added_by"]:
+            try:
+                added_by = get_user_model()._default_manager.get(email=options["added_by"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user with the e-mail {options['added_by']}.")
+
+        for name, importer_class in IMPORTERS.items():
+            path = options[name]
+            if not path:
+                continue
+            kwargs = {"using": options["database"], "chunk_size": options["chunk_size"]}
+            if importer_class is AnimalImporter:
+                kwargs["added_by"] = added_by
+            with open(path, newline="", encoding="utf-8-sig") as file:
+                result = importer_class(**kwargs).run(file)
+            for line, errors in result.errors:
+                self.stderr.write(f"{path}:{line}: {json.dumps(errors, ensure_ascii=False)}")
+            self.stdout.write(str(result))
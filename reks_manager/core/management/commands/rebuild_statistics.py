@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from reks_manager.core.statistics import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the shelter statistics summary table from the animals."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        count = rebuild(using=options["database"])
+        self.stdout.write(f"{count} counters rebuilt")
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:17
+
+from django.db import migrations
+from django.db.models import Count, Max
+
+
+def remove_duplicate_rows(apps, schema_editor):
+    """
+    Keep only the newest row per natural key, get_or_create used to fail on the
+    duplicates anyway.
+    """
+    for model_name, key_fields in [
+        ("HealthCardAllergy", ["health_card", "allergy"]),
+        ("HealthCardMedication", ["health_card", "medication"]),
+        ("HealthCardVaccination", ["health_card", "vaccination", "vaccination_date"]),
+    ]:
+        model = apps.get_model("core", model_name)
+        duplicates = model.objects.values(*key_fields).annotate(rows=Count("pk"), newest=Max("pk")).filter(rows__gt=1)
+        for duplicate in duplicates:
+            newest = duplicate.pop("newest")
+            duplicate.pop("rows")
+            model.objects.filter(**duplicate).exclude(pk=newest).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0021_alter_animal_breed_alter_animal_character_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_rows, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name="healthcardallergy",
+            unique_together={("health_card", "allergy")},
+        ),
+        migrations.AlterUniqueTogether(
+            name="healthcardmedication",
+            unique_together={("health_card", "medication")},
+        ),
+        migrations.AlterUniqueTogether(
+            name="healthcardvaccination",
+            unique_together={("health_card", "vaccination", "vaccination_date")},
+        ),
+    ]
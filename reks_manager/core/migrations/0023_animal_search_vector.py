@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:02
+
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.db import migrations
+
+# Postgres ships no Polish stemmer, the configuration folds diacritics and keeps whole words.
+CREATE_SEARCH_SQL = [
+    """
+    CREATE TEXT SEARCH CONFIGURATION polish_unaccent (COPY = simple);
+    ALTER TEXT SEARCH CONFIGURATION polish_unaccent
+        ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple;
+    """,
+    """
+    ALTER TABLE core_animal ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('polish_unaccent', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('polish_unaccent', coalesce(breed, '')), 'B')
+        || setweight(to_tsvector('polish_unaccent', coalesce("character", '') || ' ' || coalesce(for_who, '')), 'C')
+        || setweight(to_tsvector('polish_unaccent', coalesce(description, '')), 'D')
+    ) STORED;
+    """,
+    "CREATE INDEX core_animal_search_vector_idx ON core_animal USING gin (search_vector);",
+    "CREATE INDEX core_animal_name_trgm_idx ON core_animal USING gin (name gin_trgm_ops);",
+]
+
+DROP_SEARCH_SQL = [
+    "DROP INDEX IF EXISTS core_animal_name_trgm_idx;",
+    "DROP INDEX IF EXISTS core_animal_search_vector_idx;",
+    "ALTER TABLE core_animal DROP COLUMN IF EXISTS search_vector;",
+    "DROP TEXT SEARCH CONFIGURATION IF EXISTS polish_unaccent;",
+]
+
+
+def run_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0022_healthcard_rows_unique_together"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        UnaccentExtension(),
+        migrations.RunPython(run_postgresql(CREATE_SEARCH_SQL), run_postgresql(DROP_SEARCH_SQL)),
+    ]
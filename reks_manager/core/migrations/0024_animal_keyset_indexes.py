@@ -0,0 +1,79 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0023_animal_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="animal",
+            index=models.Index(fields=["created_at", "id"], name="animal_created_at_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="animal",
+            index=models.Index(fields=["name", "id"], name="animal_name_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="animal",
+            index=models.Index(fields=["animal_type", "id"], name="animal_type_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="animal",
+            index=models.Index(fields=["status", "id"], name="animal_status_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="animal",
+            index=models.Index(fields=["birth_date", "id"], name="animal_birth_date_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="animal",
+            index=models.Index(
+                condition=models.Q(("status", "DO_ADOPCJI")),
+                fields=["created_at", "id"],
+                name="animal_adoptable_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="animal",
+            index=models.Index(
+                condition=models.Q(("status", "DO_ADOPCJI")), fields=["name", "id"], name="animal_adoptable_name_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="animal",
+            index=models.Index(
+                condition=models.Q(("status", "DO_ADOPCJI")),
+                fields=["animal_type", "id"],
+                name="animal_adoptable_type_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="animal",
+            index=models.Index(
+                condition=models.Q(("status", "DO_ADOPCJI")),
+                fields=["birth_date", "id"],
+                name="animal_adoptable_birth_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="animal",
+            index=models.Index(
+                condition=models.Q(("status", "DO_ADOPCJI")),
+                fields=["updated_at"],
+                include=("id",),
+                name="animal_adoptable_updated_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="healthcardvaccination",
+            index=models.Index(fields=["vaccination_date"], name="healthcardvacc_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="veterinaryvisit",
+            index=models.Index(fields=["date"], name="veterinaryvisit_date_idx"),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0024_animal_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="animal",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name="Photo variants"),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:40
+
+from django.db import migrations
+
+import reks_manager.core.fields
+
+
+class Migration(migrations.Migration):
+    """
+    Only widens the columns, existing IDs stay as they are. The foreign keys to
+    them are altered along with the primary keys.
+    """
+
+    dependencies = [
+        ("core", "0025_animal_image_variants"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="animal",
+            name="id",
+            field=reks_manager.core.fields.TimeOrderedIDField(
+                editable=False, max_length=28, prefix="p_", primary_key=True, serialize=False
+            ),
+        ),
+        migrations.AlterField(
+            model_name="healthcard",
+            name="id",
+            field=reks_manager.core.fields.TimeOrderedIDField(
+                editable=False, max_length=29, prefix="hc_", primary_key=True, serialize=False
+            ),
+        ),
+    ]
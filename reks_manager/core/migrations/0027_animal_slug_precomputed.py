@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:20
+
+from django.db import migrations
+
+import reks_manager.core.fields
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0026_time_ordered_ids"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="animal",
+            name="slug",
+            field=reks_manager.core.fields.PrecomputedSlugField(
+                always_update=True, editable=False, populate_from="get_name_without_polish_letters", unique=True
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0027_animal_slug_precomputed"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatisticCounter",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("dimension", models.CharField(max_length=50, verbose_name="Dimension")),
+                ("key", models.CharField(max_length=50, verbose_name="Key")),
+                ("count", models.BigIntegerField(default=0, verbose_name="Count")),
+                ("total", models.BigIntegerField(default=0, verbose_name="Total")),
+            ],
+            options={
+                "verbose_name": "Statistic counter",
+                "verbose_name_plural": "Statistic counters",
+                "unique_together": {("dimension", "key")},
+            },
+        ),
+    ]
@@ -0,0 +1,133 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+STATUS_CHOICES = [
+    ("DO_ADOPCJI", "For Adoption"),
+    ("ZAADOPTOWANY", "Zaadoptowany"),
+    ("KWARANTANNA", "Kwarantanna"),
+    ("NIE_DO_ADOPCJI", "Nie do adopcji"),
+]
+
+# Rows are appended in time order, a BRIN index on the timestamp stays tiny.
+CREATE_BRIN_SQL = [
+    "CREATE INDEX statustransition_changed_brin ON core_animalstatustransition USING brin (changed_at);",
+]
+
+DROP_BRIN_SQL = [
+    "DROP INDEX IF EXISTS statustransition_changed_brin;",
+]
+
+
+def run_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+def create_initial_transitions(apps, schema_editor):
+    """
+    The history of existing animals starts with their current state at their
+    creation. Rows are inserted by ``created_at`` so that their physical order
+    follows ``changed_at``, as the BRIN index created afterwards expects.
+    """
+
+    Animal = apps.get_model("core", "Animal")
+    AnimalStatusTransition = apps.get_model("core", "AnimalStatusTransition")
+    using = schema_editor.connection.alias
+    animals = (
+        Animal.objects.using(using)
+        .order_by("created_at", "id")
+        .values_list("id", "created_at", "status", "residence", "adopted_by_id")
+    )
+    batch = []
+    for animal_id, created_at, status, residence, adopted_by_id in animals.iterator(chunk_size=2000):
+        batch.append(
+            AnimalStatusTransition(
+                animal_id=animal_id,
+                changed_at=created_at,
+                status=status,
+                residence=residence,
+                adopted_by_id=adopted_by_id,
+            )
+        )
+        if len(batch) == 2000:
+            AnimalStatusTransition.objects.using(using).bulk_create(batch)
+            batch = []
+    AnimalStatusTransition.objects.using(using).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0028_statisticcounter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnimalStatusTransition",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "changed_at",
+                    models.DateTimeField(default=django.utils.timezone.now, verbose_name="Changed at"),
+                ),
+                (
+                    "previous_status",
+                    models.CharField(
+                        blank=True, choices=STATUS_CHOICES, max_length=255, null=True, verbose_name="Previous status"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        blank=True, choices=STATUS_CHOICES, max_length=255, null=True, verbose_name="Status"
+                    ),
+                ),
+                (
+                    "residence",
+                    models.CharField(
+                        choices=[("SCHRONISKO", "Schronisko"), ("TYMCZASOWY_DOM", "Tymczasowy dom")],
+                        max_length=255,
+                        verbose_name="Residence",
+                    ),
+                ),
+                (
+                    "adopted_by",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="core.adopter",
+                        verbose_name="Adopted by",
+                    ),
+                ),
+                (
+                    "animal",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        db_index=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="status_transitions",
+                        to="core.animal",
+                        verbose_name="Animal",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Animal status transition",
+                "verbose_name_plural": "Animal status transitions",
+                "indexes": [models.Index(fields=["animal", "changed_at"], name="statustransition_animal_idx")],
+            },
+        ),
+        migrations.RunPython(create_initial_transitions, migrations.RunPython.noop),
+        migrations.RunPython(run_postgresql(CREATE_BRIN_SQL), run_postgresql(DROP_BRIN_SQL)),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:05
+
+from django.db import migrations
+
+import reks_manager.core.fields
+import reks_manager.core.transliteration
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0029_animalstatustransition"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="animal",
+            name="slug",
+            field=reks_manager.core.fields.PrecomputedSlugField(
+                always_update=True,
+                editable=False,
+                populate_from="name",
+                slugify=reks_manager.core.transliteration.slugify,
+                unique=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,247 @@
+import hashlib
+import typing
+from calendar import timegm
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db.models import Aggregate, Count, Max
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.utils.translation import get_language
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache import get_cache_timeout, get_response_cache_key
+from .optimizers import optimize_queryset
+
+if typing.TYPE_CHECKING:
+    from rest_framework.mixins import ListModelMixin, RetrieveModelMixin
+    from rest_framework.viewsets import GenericViewSet as ViewSetBase
+
+    # The mixins are combined with viewsets, which provide the attributes they use.
+    class ListViewSetBase(ListModelMixin, ViewSetBase):
+        pass
+
+    class RetrieveViewSetBase(RetrieveModelMixin, ViewSetBase):
+        pass
+
+else:
+    ViewSetBase = ListViewSetBase = RetrieveViewSetBase = object
+
+
+def follow_relation(model, path):
+    """
+    Model reached from ``model`` by the lookup ``path``, the lookup leading back
+    from it and whether ``path`` can reach several rows of one ``model`` row.
+    """
+    reverse_path: list[str] = []
+    many = False
+    for name in path.split(LOOKUP_SEP) if path else ():
+        field = model._meta.get_field(name)
+        many = many or field.one_to_many or field.many_to_many
+        reverse_path.insert(0, field.remote_field.name)
+        model = field.related_model
+    return model, LOOKUP_SEP.join(reverse_path), many
+
+
+class OptimizedQuerySetMixin(ViewSetBase):
+    """
+    Preloads every relation rendered by the serializer of the current action,
+    so list endpoints run a constant number of queries.
+    """
+
+    def get_queryset(self):
+        return optimize_queryset(super().get_queryset(), self.get_serializer_class())
+
+
+class CachedResponseMixin(ViewSetBase):
+    """
+    Caches the serialized body of list/retrieve responses under a generation
+    counter of ``cache_namespace``, see ``reks_manager.core.cache``.
+
+    The ETag and Last-Modified of the response are cached along, so put the
+    mixin before the conditional ones: cache hits and their 304 Not Modified
+    answers then run no query. Use ``CachedListMixin`` / ``CachedRetrieveMixin``,
+    the router exposes every action defined on the view.
+    """
+
+    cache_namespace: str | None = None
+    cached_headers = ("ETag", "Last-Modified", "Vary")
+
+    def get_response_cache_key(self, request, **kwargs):
+        return get_response_cache_key(self.cache_namespace, request, f"{self.basename}-{self.action}", kwargs)
+
+    def get_cache_entry(self, response):
+        return response.data, {header: response[header] for header in self.cached_headers if header in response}
+
+    def get_response_from_cache(self, entry, request):
+        data, headers = entry
+        last_modified = parse_http_date_safe(headers.get("Last-Modified"))
+        response = get_conditional_response(request, etag=headers.get("ETag"), last_modified=last_modified)
+        if response is None:
+            response = Response(data)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key(request, **kwargs)
+        if key is not None:
+            entry = cache.get(key)
+            if entry is not None:
+                return self.get_response_from_cache(entry, request)
+
+        response = handler(request, *args, **kwargs)
+        if key is not None and response.status_code == status.HTTP_200_OK:
+            cache.set(key, self.get_cache_entry(response), timeout=get_cache_timeout())
+        return response
+
+    async def aget_cached_response(self, handler, request, *args, **kwargs):
+        """``get_cached_response`` of an async ``handler``."""
+
+        key = await sync_to_async(self.get_response_cache_key)(request, **kwargs)
+        if key is not None:
+            entry = await cache.aget(key)
+            if entry is not None:
+                return self.get_response_from_cache(entry, request)
+
+        response = await handler(request, *args, **kwargs)
+        if key is not None and response.status_code == status.HTTP_200_OK:
+            await cache.aset(key, self.get_cache_entry(response), timeout=get_cache_timeout())
+        return response
+
+
+class ConditionalResponseMixin(ViewSetBase):
+    """
+    Answers list/retrieve requests carrying If-None-Match / If-Modified-Since
+    with 304 Not Modified, using validators computed by aggregates over
+    ``last_modified_fields`` instead of serializing the response.
+
+    ``last_modified_fields`` should list the ``updated_at`` of every relation
+    rendered by the serializer that can change on its own. The rows of each
+    relation are counted as well, so deleting one changes the ETag. Relations
+    with many rows per object are aggregated by a query of their own, joining
+    them together would multiply their rows. Use ``ConditionalListMixin`` /
+    ``ConditionalRetrieveMixin``, or ``ConditionalGetMixin`` for both actions.
+    """
+
+    last_modified_fields: tuple[str, ...] = ("updated_at",)
+
+    def get_validator_queries(self, queryset):
+        """Pairs of a queryset and the aggregates to compute over it."""
+
+        queryset = queryset.order_by()
+        aggregates: dict[str, Aggregate] = {"count": Count("pk", distinct=True)}
+        queries = [(queryset, aggregates)]
+        for index, field in enumerate(self.last_modified_fields):
+            path, _, name = field.rpartition(LOOKUP_SEP)
+            related_model, reverse_path, many = follow_relation(queryset.model, path)
+            if many:
+                rows = related_model._default_manager.using(queryset.db).filter(
+                    **{f"{reverse_path}__in": queryset.values("pk")}
+                )
+                queries.append((rows, {f"count_{index}": Count("pk"), f"last_modified_{index}": Max(name)}))
+                continue
+            aggregates[f"last_modified_{index}"] = Max(field)
+            if path:
+                aggregates[f"count_{index}"] = Count(f"{path}{LOOKUP_SEP}pk", distinct=True)
+        return queries
+
+    def build_validators(self, values, request):
+        if not values["count"]:
+            return None, None
+
+        counts = [value for key, value in sorted(values.items()) if key.startswith("count")]
+        timestamps = [
+            value for key, value in sorted(values.items()) if key.startswith("last_modified") and value is not None
+        ]
+        last_modified = max(timestamps) if timestamps else None
+        # The JSON and the browsable API renderings of a resource differ.
+        media_type = getattr(request, "accepted_media_type", None)
+        state = (
+            request.get_full_path(),
+            get_language(),
+            media_type,
+            counts,
+            [value.isoformat() for value in timestamps],
+        )
+        etag = hashlib.md5(repr(state).encode(), usedforsecurity=False).hexdigest()
+        return etag, last_modified
+
+    def get_validators(self, queryset, request):
+        values = {}
+        for rows, aggregates in self.get_validator_queries(queryset):
+            values.update(rows.aggregate(**aggregates))
+        return self.build_validators(values, request)
+
+    async def aget_validators(self, queryset, request):
+        """``get_validators`` run by the async ORM."""
+
+        values = {}
+        for rows, aggregates in self.get_validator_queries(queryset):
+            values.update(await rows.aaggregate(**aggregates))
+        return self.build_validators(values, request)
+
+    def get_not_modified_response(self, etag, last_modified, request):
+        """304 response when the validators of ``request`` match, ``None`` otherwise."""
+
+        last_modified_timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+        return get_conditional_response(request, etag=quote_etag(etag), last_modified=last_modified_timestamp)
+
+    def set_validators(self, response, etag, last_modified):
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response["ETag"] = quote_etag(etag)
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(timegm(last_modified.utctimetuple()))
+            patch_vary_headers(response, ("Accept",))
+        return response
+
+    def get_conditional_response(self, queryset, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(queryset, request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        response = self.get_not_modified_response(etag, last_modified, request)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return self.set_validators(response, etag, last_modified)
+
+    async def aget_conditional_response(self, queryset, handler, request, *args, **kwargs):
+        """``get_conditional_response`` of an async ``handler``."""
+
+        etag, last_modified = await self.aget_validators(queryset, request)
+        if etag is None:
+            return await handler(request, *args, **kwargs)
+
+        response = self.get_not_modified_response(etag, last_modified, request)
+        if response is None:
+            response = await handler(request, *args, **kwargs)
+        return self.set_validators(response, etag, last_modified)
+
+
+class CachedListMixin(CachedResponseMixin, ListViewSetBase):
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin, RetrieveViewSetBase):
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
+
+
+class ConditionalListMixin(ConditionalResponseMixin, ListViewSetBase):
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.get_conditional_response(queryset, super().list, request, *args, **kwargs)
+
+
+class ConditionalRetrieveMixin(ConditionalResponseMixin, RetrieveViewSetBase):
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+        return self.get_conditional_response(queryset, super().retrieve, request, *args, **kwargs)
+
+
+class ConditionalGetMixin(ConditionalRetrieveMixin, ConditionalListMixin):
+    pass
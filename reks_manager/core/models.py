@@ -1,14 +1,22 @@
-from autoslug import AutoSlugField
+from datetime import datetime, time, timedelta
+from functools import partial
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.core.validators import MinLengthValidator
-from django.db import models
+from django.db import models, router, transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.translation import gettext as _
 from shortuuid.django_fields import ShortUUIDField
 
+from .cache import PUBLIC_ANIMALS_NAMESPACE, bump_generation
+from .fields import PrecomputedSlugField, TimeOrderedIDField
+from .images import delete_variants, generate_variants, get_srcset
+from .transliteration import slugify
+
 User = get_user_model()
 
 STATUS_CHOICES = [
@@ -28,6 +36,8 @@ TYPE_CHOICES = [
     ("KOT", _("Kot")),
 ]
 
+PUBLIC_STATUS = "DO_ADOPCJI"
+
 RESIDENCE_CHOICES = [("SCHRONISKO", _("Schronisko")), ("TYMCZASOWY_DOM", _("Tymczasowy dom"))]
 
 
@@ -147,14 +157,15 @@ class TemporaryHome(models.Model):
 
 
 class Animal(models.Model):
-    id = ShortUUIDField(primary_key=True, length=6, max_length=8, alphabet="12345", prefix="p_", unique=True)
+    id = TimeOrderedIDField(primary_key=True, prefix="p_")
     name = models.CharField(
         max_length=255,
         validators=[MinLengthValidator(limit_value=2, message=_("Name must be at least 2 characters long."))],
         verbose_name=_("Name"),
     )
-    slug = AutoSlugField(
-        populate_from="get_name_without_polish_letters",
+    slug = PrecomputedSlugField(
+        populate_from="name",
+        slugify=slugify,
         unique=True,
         always_update=True,
     )
@@ -178,6 +189,8 @@ class Animal(models.Model):
     description_of_health = models.TextField(blank=True, verbose_name=_("Health description"))
 
     image = models.ImageField(blank=True, null=True, upload_to="animals/", verbose_name=_("Photo"))
+    # Filled by manage.py generate_image_variants, see reks_manager.core.images
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name=_("Photo variants"))
 
     # new in 08.12.2023
     size = models.CharField(max_length=50, blank=True)
@@ -218,10 +231,48 @@ class Animal(models.Model):
     def __str__(self):
         return f"{_(self.animal_type)} {self.name}"
 
+    # Values as stored in the database, compared on save by reks_manager.core.signals
+    # to update the public cache, the statistics and the status history, and by
+    # the slug field to keep the slug while the name is unchanged.
+    tracked_fields = ("name", "status", "animal_type", "residence", "adopted_by_id")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            field: instance.__dict__[field] for field in cls.tracked_fields if field in instance.__dict__
+        }
+        # None when the image is deferred, an unknown image is taken as unchanged.
+        image = instance.__dict__.get("image")
+        instance._loaded_image = None if "image" not in instance.__dict__ else image or ""
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.added_by:
             self.added_by = self.request.user
-        super().save(*args, **kwargs)
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        loaded_image = getattr(self, "_loaded_image", "")
+        image_changed = loaded_image is not None and (self.image.name or "") != loaded_image
+        previous_variants = None
+        if image_changed:
+            if not self._state.adding:
+                # Read again, they may have been generated since the instance was loaded.
+                previous_variants = (
+                    Animal.objects.using(using).filter(pk=self.pk).values_list("image_variants", flat=True).first()
+                )
+            self.image_variants = {}
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "image" in update_fields:
+                kwargs["update_fields"] = [*update_fields, "image_variants"]
+        # The status history and the statistics are written by signals, in the same transaction.
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+        self._loaded_values = {field: getattr(self, field) for field in self.tracked_fields}
+        self._loaded_image = self.image.name or ""
+        if previous_variants:
+            transaction.on_commit(partial(delete_variants, self.image.storage, previous_variants), using=using)
+        if image_changed and self.image and settings.IMAGE_VARIANTS_EAGER:
+            transaction.on_commit(self.generate_image_variants)
 
     def clean(self):
         super().clean()
@@ -243,40 +294,101 @@ class Animal(models.Model):
         self.status = "DO_ADOPCJI"
         self.save()
 
+    def status_timeline(self):
+        """
+        Periods the animal spent in each status and residence, oldest first, as
+        dicts of ``status``, ``residence``, ``adopted_by_id``, ``start``, ``end``
+        and ``duration``. The last period has no end while the animal exists.
+        """
+        transitions = list(
+            self.status_transitions.order_by("changed_at", "pk").values(
+                "status", "residence", "adopted_by_id", "changed_at"
+            )
+        )
+        periods = []
+        now = timezone.now()
+        for transition, following in zip(transitions, transitions[1:] + [None]):
+            if transition["status"] is None:
+                break
+            end = following["changed_at"] if following else None
+            periods.append(
+                {
+                    "status": transition["status"],
+                    "residence": transition["residence"],
+                    "adopted_by_id": transition["adopted_by_id"],
+                    "start": transition["changed_at"],
+                    "end": end,
+                    "duration": (end or now) - transition["changed_at"],
+                }
+            )
+        return periods
+
     def image_url(self):
         if self.image:
             return self.image.url
         return "https://dummyimage.com/350x250/fff/000"
 
-    def get_name_without_polish_letters(self):
-        name = self.name
-        replacements = {
-            "ą": "a",
-            "ć": "c",
-            "ę": "e",
-            "ł": "l",
-            "ń": "n",
-            "ó": "o",
-            "ś": "s",
-            "ź": "z",
-            "ż": "z",
-            "Ą": "A",
-            "Ć": "C",
-            "Ę": "E",
-            "Ł": "L",
-            "Ń": "N",
-            "Ó": "O",
-            "Ś": "S",
-            "Ź": "Z",
-            "Ż": "Z",
-        }
-        for k, v in replacements.items():
-            name = name.replace(k, v)
-        return name
+    def get_image_srcset(self):
+        if not self.image or "jpeg" not in self.image_variants:
+            return None
+        return get_srcset(self.image.storage, self.image_variants)
+
+    def generate_image_variants(self):
+        """
+        Generate the variants of the current image. They are discarded when the
+        image was replaced in the meantime, its own variants are generated next.
+        """
+        if not self.image:
+            return False
+        variants = generate_variants(self.image)
+        updated = Animal.objects.filter(pk=self.pk, image=self.image.name).update(
+            image_variants=variants, updated_at=timezone.now()
+        )
+        if not updated:
+            delete_variants(self.image.storage, variants)
+            return False
+
+        self.image_variants = variants
+        transaction.on_commit(lambda: bump_generation(PUBLIC_ANIMALS_NAMESPACE))
+        return True
 
     class Meta:
         verbose_name = _("Animal")
         verbose_name_plural = _("Animals")
+        indexes = [
+            # Keyset pagination seeks on (ordering field, id), see reks_manager.core.pagination
+            models.Index(fields=["created_at", "id"], name="animal_created_at_id_idx"),
+            models.Index(fields=["name", "id"], name="animal_name_id_idx"),
+            models.Index(fields=["animal_type", "id"], name="animal_type_id_idx"),
+            models.Index(fields=["status", "id"], name="animal_status_id_idx"),
+            models.Index(fields=["birth_date", "id"], name="animal_birth_date_id_idx"),
+            # Public listings only ever read adoptable animals
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(status=PUBLIC_STATUS),
+                name="animal_adoptable_created_idx",
+            ),
+            models.Index(
+                fields=["name", "id"], condition=models.Q(status=PUBLIC_STATUS), name="animal_adoptable_name_idx"
+            ),
+            models.Index(
+                fields=["animal_type", "id"],
+                condition=models.Q(status=PUBLIC_STATUS),
+                name="animal_adoptable_type_idx",
+            ),
+            models.Index(
+                fields=["birth_date", "id"],
+                condition=models.Q(status=PUBLIC_STATUS),
+                name="animal_adoptable_birth_idx",
+            ),
+            # Index-only scan for the Max(updated_at) / Count validators of the public views
+            models.Index(
+                fields=["updated_at"],
+                include=["id"],
+                condition=models.Q(status=PUBLIC_STATUS),
+                name="animal_adoptable_updated_idx",
+            ),
+        ]
 
 
 @receiver(post_save, sender=Animal)
@@ -286,7 +398,7 @@ def create_health_card(sender, instance, created, **kwargs):
 
 
 class HealthCard(models.Model):
-    id = ShortUUIDField(primary_key=True, length=7, max_length=10, alphabet="12345", prefix="hc_", unique=True)
+    id = TimeOrderedIDField(primary_key=True, prefix="hc_")
     animal = models.OneToOneField(
         Animal, on_delete=models.CASCADE, related_name="healthcards", verbose_name=_("Animal")
     )
@@ -324,6 +436,7 @@ class VeterinaryVisit(models.Model):
     class Meta:
         verbose_name = _("Veterinary visit")
         verbose_name_plural = _("Veterinary visits")
+        indexes = [models.Index(fields=["date"], name="veterinaryvisit_date_idx")]
 
 
 class HealthCardAllergy(models.Model):
@@ -341,6 +454,7 @@ class HealthCardAllergy(models.Model):
     class Meta:
         verbose_name = _("Health card - Allergy")
         verbose_name_plural = _("Health card - Allergies")
+        unique_together = ["health_card", "allergy"]
 
 
 class HealthCardMedication(models.Model):
@@ -358,6 +472,7 @@ class HealthCardMedication(models.Model):
     class Meta:
         verbose_name = _("Health card - Medication")
         verbose_name_plural = _("Health card - Medications")
+        unique_together = ["health_card", "medication"]
 
 
 class HealthCardVaccination(models.Model):
@@ -376,3 +491,114 @@ class HealthCardVaccination(models.Model):
     class Meta:
         verbose_name = _("Health card - Vaccination")
         verbose_name_plural = _("Health card - Vaccinations")
+        unique_together = ["health_card", "vaccination", "vaccination_date"]
+        indexes = [models.Index(fields=["vaccination_date"], name="healthcardvacc_date_idx")]
+
+
+class AnimalStatusTransitionQuerySet(models.QuerySet):
+    def occupancy(self, at):
+        """
+        Animals in the care of the shelter at ``at``, a datetime or the end of a
+        date: ``{"total", "by_status", "by_residence"}``. Adopted and removed
+        animals are left out. Only the history table is read, rows are appended
+        in time order, so the highest pk before ``at`` is the state of an animal.
+        """
+        if not isinstance(at, datetime):
+            at = timezone.make_aware(datetime.combine(at + timedelta(days=1), time.min))
+        latest = self.filter(changed_at__lt=at).values("animal_id").annotate(latest=models.Max("pk")).values("latest")
+        present = self.filter(pk__in=latest, status__isnull=False).exclude(status="ZAADOPTOWANY")
+
+        by_status = {status: 0 for status, _label in STATUS_CHOICES if status != "ZAADOPTOWANY"}
+        by_residence = {residence: 0 for residence, _label in RESIDENCE_CHOICES}
+        for status, residence, count in (
+            present.values_list("status", "residence").annotate(count=models.Count("pk")).order_by()
+        ):
+            by_status[status] = by_status.get(status, 0) + count
+            by_residence[residence] = by_residence.get(residence, 0) + count
+        return {"total": sum(by_status.values()), "by_status": by_status, "by_residence": by_residence}
+
+
+class AnimalStatusTransition(models.Model):
+    """
+    Append-only history of the status, residence and adopter of animals, one
+    row per change, written in the transaction of the change. ``status`` is
+    empty once the animal was deleted, the rows are kept.
+    """
+
+    animal = models.ForeignKey(
+        Animal,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="status_transitions",
+        verbose_name=_("Animal"),
+    )
+    changed_at = models.DateTimeField(default=timezone.now, verbose_name=_("Changed at"))
+    previous_status = models.CharField(
+        max_length=255, choices=STATUS_CHOICES, null=True, blank=True, verbose_name=_("Previous status")
+    )
+    status = models.CharField(max_length=255, choices=STATUS_CHOICES, null=True, blank=True, verbose_name=_("Status"))
+    residence = models.CharField(max_length=255, choices=RESIDENCE_CHOICES, verbose_name=_("Residence"))
+    adopted_by = models.ForeignKey(
+        Adopter,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="+",
+        blank=True,
+        null=True,
+        verbose_name=_("Adopted by"),
+    )
+
+    objects = AnimalStatusTransitionQuerySet.as_manager()
+
+    @classmethod
+    def for_state(cls, animal, previous_status, state, changed_at=None):
+        """Unsaved row for ``animal`` entering ``state``, a dict of its tracked values or ``None`` once deleted."""
+
+        return cls(
+            animal_id=animal.pk,
+            changed_at=changed_at or timezone.now(),
+            previous_status=previous_status,
+            status=state["status"] if state else None,
+            residence=(state or {}).get("residence", animal.residence),
+            adopted_by_id=state["adopted_by_id"] if state else None,
+        )
+
+    @classmethod
+    def for_created(cls, animal):
+        return cls.for_state(
+            animal,
+            None,
+            {field: getattr(animal, field) for field in Animal.tracked_fields},
+            changed_at=animal.created_at,
+        )
+
+    def __str__(self):
+        return f"{self.animal_id}: {self.previous_status} -> {self.status} ({self.changed_at})"
+
+    class Meta:
+        verbose_name = _("Animal status transition")
+        verbose_name_plural = _("Animal status transitions")
+        # PostgreSQL also gets a BRIN index on changed_at, see migration 0029.
+        indexes = [models.Index(fields=["animal", "changed_at"], name="statustransition_animal_idx")]
+
+
+class StatisticCounter(models.Model):
+    """
+    Row of the shelter statistics summary, maintained by reks_manager.core.statistics.
+    ``total`` holds a sum next to the count, e.g. the days to adoption.
+    """
+
+    dimension = models.CharField(max_length=50, verbose_name=_("Dimension"))
+    key = models.CharField(max_length=50, verbose_name=_("Key"))
+    count = models.BigIntegerField(default=0, verbose_name=_("Count"))
+    total = models.BigIntegerField(default=0, verbose_name=_("Total"))
+
+    def __str__(self):
+        return f"{self.dimension} {self.key}: {self.count}"
+
+    class Meta:
+        verbose_name = _("Statistic counter")
+        verbose_name_plural = _("Statistic counters")
+        unique_together = ["dimension", "key"]
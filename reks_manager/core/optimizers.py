@@ -0,0 +1,90 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+class QueryPlan:
+    """
+    select_related / prefetch_related lookups needed to serialize a model
+    without issuing a query per row.
+
+    ``prefetch`` holds ``(lookup, related_model, child_plan)`` tuples, the child
+    plan is applied to the queryset of the ``Prefetch`` object.
+    """
+
+    def __init__(self):
+        self.select_related = []
+        self.prefetch = []
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*dict.fromkeys(self.select_related))
+        if self.prefetch:
+            queryset = queryset.prefetch_related(
+                *[
+                    Prefetch(lookup, queryset=plan.apply(model._default_manager.all()))
+                    for lookup, model, plan in self.prefetch
+                ]
+            )
+        return queryset
+
+
+def _get_relation(model, source):
+    if source == "*" or "." in source:
+        return None
+    try:
+        field = model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+    if not field.is_relation:
+        return None
+    return field
+
+
+def _walk(serializer, model, plan, prefix=""):
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        relation = _get_relation(model, field.source)
+        if relation is None:
+            continue
+        lookup = f"{prefix}{field.source}"
+        related_model = relation.related_model
+
+        if isinstance(field, serializers.ListSerializer):
+            child_plan = QueryPlan()
+            _walk(field.child, related_model, child_plan)
+            plan.prefetch.append((lookup, related_model, child_plan))
+        elif isinstance(field, serializers.ManyRelatedField):
+            plan.prefetch.append((lookup, related_model, QueryPlan()))
+        elif relation.many_to_many or relation.one_to_many:
+            continue
+        elif isinstance(field, serializers.BaseSerializer):
+            plan.select_related.append(lookup)
+            _walk(field, related_model, plan, prefix=f"{lookup}__")
+        elif isinstance(field, serializers.RelatedField):
+            if relation.auto_created:
+                # Reverse one-to-one, the pk is not available on the instance itself.
+                plan.select_related.append(lookup)
+        else:
+            # Plain field rendering the related object, e.g. its __str__.
+            plan.select_related.append(lookup)
+
+
+@lru_cache(maxsize=None)
+def get_query_plan(serializer_class):
+    plan = QueryPlan()
+    model = getattr(getattr(serializer_class, "Meta", None), "model", None)
+    if model is not None:
+        _walk(serializer_class(), model, plan)
+    return plan
+
+
+def optimize_queryset(queryset, serializer_class):
+    """
+    Add the select_related / prefetch_related calls derived from the nested
+    fields of ``serializer_class`` to ``queryset``.
+    """
+    return get_query_plan(serializer_class).apply(queryset)
@@ -0,0 +1,259 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+from datetime import date
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .async_views import aiterate
+
+Cursor = namedtuple("Cursor", ["position", "reverse"])
+
+
+def _flip(term):
+    return term[1:] if term.startswith("-") else f"-{term}"
+
+
+def _encode_value(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _get_value(obj, term):
+    value = obj
+    for attr in term.lstrip("-").split("__"):
+        value = getattr(value, attr)
+    return value
+
+
+def get_keyset_filter(ordering, position):
+    """
+    Build the filter selecting rows placed after ``position`` in ``ordering``,
+    i.e. ``(a, b, c) > (x, y, z)`` expanded into ORs so every term can have
+    its own direction.
+    """
+    clauses = []
+    for index, term in enumerate(ordering):
+        lookup = "lt" if term.startswith("-") else "gt"
+        equal = {previous.lstrip("-"): value for previous, value in zip(ordering[:index], position)}
+        clauses.append(Q(**equal, **{f"{term.lstrip('-')}__{lookup}": position[index]}))
+
+    # Redundant bound on the leading term, lets the database range scan its index.
+    first = ordering[0]
+    bound = Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": position[0]})
+    return bound & reduce(or_, clauses)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination seeking on ``(ordering..., pk)`` instead of using OFFSET.
+
+    The ordering is taken from the queryset (``OrderingFilter`` or ``view.ordering``)
+    and falls back to ``-created_at``. The primary key is always appended as a
+    tie-breaker, so each position is unique and deep pages cost the same as the
+    first one. Ordering terms must be non-nullable columns or annotations.
+    """
+
+    cursor_query_param = "cursor"
+    cursor_query_description = _("The pagination cursor value.")
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    page_size_query_description = _("Number of results to return per page.")
+    max_page_size = 100
+    default_ordering = ("-created_at",)
+    invalid_cursor_message = _("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        return self.set_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` reading the page with the async ORM."""
+
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        return self.set_page([obj async for obj in aiterate(page_queryset)])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """The queryset of the rows of the requested page and one more, ``None`` when not paginating."""
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.ordering = self.get_ordering(queryset, view)
+        self.cursor = self.decode_cursor(request, queryset)
+
+        ordering = self.ordering
+        if self.cursor is not None and self.cursor.reverse:
+            ordering = [_flip(term) for term in ordering]
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(get_keyset_filter(ordering, self.cursor.position))
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = self.page_size is not None and len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if self.cursor is not None and self.cursor.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param], strict=True, cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, queryset, view):
+        ordering = [term for term in queryset.query.order_by if isinstance(term, str)]
+        if not ordering:
+            ordering = [term for term in self.default_ordering if self._has_field(queryset.model, term)]
+
+        pk_names = {"pk", queryset.model._meta.pk.name}
+        if not any(term.lstrip("-") in pk_names for term in ordering):
+            descending = bool(ordering) and ordering[0].startswith("-")
+            ordering.append("-pk" if descending else "pk")
+        return ordering
+
+    @staticmethod
+    def _has_field(model, term):
+        try:
+            model._meta.get_field(term.lstrip("-"))
+        except FieldDoesNotExist:
+            return False
+        return True
+
+    @staticmethod
+    def _get_ordering_field(queryset, term):
+        """The model field or annotation output field ``term`` orders ``queryset`` by."""
+
+        name = term.lstrip("-")
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        model = queryset.model
+        for part in name.split("__"):
+            field = model._meta.pk if part == "pk" else model._meta.get_field(part)
+            model = field.related_model
+        return field
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            padding = "=" * (-len(encoded) % 4)
+            data = json.loads(urlsafe_b64decode(encoded + padding))
+            cursor = Cursor(position=list(data["p"]), reverse=bool(data.get("r")))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if len(cursor.position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        # Values not matching the ordering fields would fail when the page is read.
+        try:
+            position = [
+                self._get_ordering_field(queryset, term).to_python(value)
+                for term, value in zip(self.ordering, cursor.position)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+        return cursor._replace(position=position)
+
+    def encode_cursor(self, cursor):
+        data = {"p": cursor.position}
+        if cursor.reverse:
+            data["r"] = 1
+        encoded = urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).decode().rstrip("=")
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def get_position(self, obj):
+        return [_encode_value(_get_value(obj, term)) for term in self.ordering]
+
+    def get_cursor_position(self):
+        return [_encode_value(value) for value in self.cursor.position]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self.get_position(self.page[-1]) if self.page else self.get_cursor_position()
+        return self.encode_cursor(Cursor(position=position, reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self.get_position(self.page[0]) if self.page else self.get_cursor_position()
+        return self.encode_cursor(Cursor(position=position, reverse=True))
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "previous": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": str(self.cursor_query_description),
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": str(self.page_size_query_description),
+                "schema": {"type": "integer"},
+            },
+        ]
@@ -1,13 +1,24 @@
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from django.utils.translation import gettext as _
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 from reks_manager.users.api.serializers import UserSerializer
 
+from . import statistics
+from .cache import PUBLIC_ANIMALS_NAMESPACE, bump_generation
+from .fields import assign_unique_slugs
 from .models import (
+    PUBLIC_STATUS,
     Adopter,
     Allergy,
     Animal,
+    AnimalStatusTransition,
     HealthCard,
     HealthCardAllergy,
     HealthCardMedication,
@@ -18,6 +29,63 @@ from .models import (
     VeterinaryVisit,
 )
 
+# BULK #################################
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field resolving values from ``instances`` once the parent
+    BulkListSerializer preloaded them, instead of a query per item.
+    """
+
+    instances: Mapping | None = None
+
+    def to_python_pk(self, data):
+        try:
+            return self.get_queryset().model._meta.pk.to_python(data)
+        except (DjangoValidationError, TypeError):
+            return None
+
+    def to_internal_value(self, data):
+        if self.instances is None:
+            return super().to_internal_value(data)
+        pk = None if isinstance(data, bool) else self.to_python_pk(data)
+        if pk is None:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return self.instances[pk]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    List serializer loading the objects referenced by the BulkPrimaryKeyRelatedField
+    fields of its child with one query per field.
+    """
+
+    child: serializers.Serializer
+    max_length: int | None
+
+    @contextmanager
+    def preload(self, data):
+        fields = [field for field in self.child.fields.values() if isinstance(field, BulkPrimaryKeyRelatedField)]
+        if isinstance(data, list):
+            for field in fields:
+                pks = {field.to_python_pk(item.get(field.field_name)) for item in data if isinstance(item, Mapping)}
+                pks.discard(None)
+                field.instances = field.get_queryset().in_bulk(pks)
+        try:
+            yield
+        finally:
+            for field in fields:
+                field.instances = None
+
+    def to_internal_value(self, data):
+        with self.preload(data):
+            return super().to_internal_value(data)
+
+
 # SIMPLE #################################
 
 
@@ -108,19 +176,28 @@ class HealthCardVaccinationSerializer(serializers.ModelSerializer):
 
 class HealthCardWriteSerializer(serializers.ModelSerializer):
     class HealthCardAllergyWriteSerializer(serializers.ModelSerializer):
+        serializer_related_field = BulkPrimaryKeyRelatedField
+
         class Meta:
             model = HealthCardAllergy
             fields = ["allergy", "description"]
+            list_serializer_class = BulkListSerializer
 
     class HealthCardMedicationWriteSerializer(serializers.ModelSerializer):
+        serializer_related_field = BulkPrimaryKeyRelatedField
+
         class Meta:
             model = HealthCardMedication
             fields = ["medication", "description"]
+            list_serializer_class = BulkListSerializer
 
     class HealthCardVaccinationWriteSerializer(serializers.ModelSerializer):
+        serializer_related_field = BulkPrimaryKeyRelatedField
+
         class Meta:
             model = HealthCardVaccination
             fields = ["vaccination", "vaccination_date", "description"]
+            list_serializer_class = BulkListSerializer
 
     class VeterinaryVisitWriteSerializer(serializers.ModelSerializer):
         class Meta:
@@ -144,54 +221,73 @@ class HealthCardWriteSerializer(serializers.ModelSerializer):
         fields = ("id", "animal", "allergies", "medications", "vaccinations", "veterinaryvisits")
 
     def update(self, instance, validated_data):
-        # # Update HealthCard object
-
-        # Update or create related objects and associate them with the HealthCard
-        allergies_data = validated_data.get("healthcardallergies", [])
-        medications_data = validated_data.get("healthcardmedications", [])
-        vaccinations_data = validated_data.get("healthcardvaccinations", [])
-        veterinaryvisits_data = validated_data.get("veterinaryvisits", [])
-
-        # Update or create HealthCardAllergy objects
-        for allergy_data in allergies_data:
-            allergy, created = HealthCardAllergy.objects.get_or_create(
-                health_card=instance, allergy=allergy_data["allergy"]
-            )
-            allergy.description = allergy_data.get("description", allergy.description)
-            allergy.save()
+        now = timezone.now()
+        self.save_related_rows(
+            instance, HealthCardAllergy, validated_data.get("healthcardallergies", []), ["allergy"], now
+        )
+        self.save_related_rows(
+            instance, HealthCardMedication, validated_data.get("healthcardmedications", []), ["medication"], now
+        )
+        self.save_related_rows(
+            instance,
+            HealthCardVaccination,
+            validated_data.get("healthcardvaccinations", []),
+            ["vaccination", "vaccination_date"],
+            now,
+        )
+        self.save_veterinary_visits(instance, validated_data.get("veterinaryvisits", []))
+
+        # Bump updated_at, the card validators of the conditional GET depend on it
+        instance.save(update_fields=["updated_at"])
+        return instance
 
-        # Update or create HealthCardMedication objects
-        for medication_data in medications_data:
-            medication, created = HealthCardMedication.objects.get_or_create(
-                health_card=instance, medication=medication_data["medication"]
+    @staticmethod
+    def save_related_rows(instance, model, rows_data, key_fields, now):
+        """
+        Update the descriptions of rows already on the card and insert the others,
+        matching them on ``key_fields``. Runs at most one query per statement kind.
+        """
+        related_name = model._meta.get_field("health_card").remote_field.related_name
+        existing = {
+            tuple(row.serializable_value(field) for field in key_fields): row
+            for row in getattr(instance, related_name).all()
+        }
+
+        to_update, to_create = {}, {}
+        for row_data in rows_data:
+            key = tuple(getattr(row_data[field], "pk", row_data[field]) for field in key_fields)
+            row = existing.get(key)
+            if row is None:
+                to_create[key] = model(health_card=instance, **row_data)
+                continue
+            row.description = row_data.get("description", row.description)
+            row.updated_at = now
+            to_update[key] = row
+
+        if to_update:
+            model.objects.bulk_update(to_update.values(), ["description", "updated_at"])
+        if to_create:
+            model.objects.bulk_create(
+                to_create.values(),
+                update_conflicts=True,
+                unique_fields=["health_card", *key_fields],
+                update_fields=["description", "updated_at"],
             )
-            medication.description = medication_data.get("description", medication.description)
-            medication.save()
-
-        # Update or create HealthCardVaccination objects
-        for vaccination_data in vaccinations_data:
-            vaccination, created = HealthCardVaccination.objects.get_or_create(
-                health_card=instance,
-                vaccination=vaccination_data["vaccination"],
-                vaccination_date=vaccination_data["vaccination_date"],
-            )
-
-            vaccination.description = vaccination_data.get("description", vaccination.description)
-            vaccination.save()
 
-        # Update or create VeterinaryVisit objects
-        for veterinary_visit_data in veterinaryvisits_data:
-            veterinary_visit, created = VeterinaryVisit.objects.get_or_create(
-                health_card=instance,
-                doctor=veterinary_visit_data["doctor"],
-                date=veterinary_visit_data["date"],
-                description=veterinary_visit_data["description"],
-            )
-            veterinary_visit.doctor = veterinary_visit_data.get("doctor", veterinary_visit.doctor)
-            veterinary_visit.date = veterinary_visit_data.get("date", veterinary_visit.date)
-            veterinary_visit.description = veterinary_visit_data.get("description", veterinary_visit.description)
-            veterinary_visit.save()
-        return instance
+    @staticmethod
+    def save_veterinary_visits(instance, visits_data):
+        """
+        Insert the visits not recorded on the card yet, a visit is identified by
+        all of its fields.
+        """
+        existing = {(visit.doctor, visit.date, visit.description) for visit in instance.veterinaryvisits.all()}
+        to_create = {}
+        for visit_data in visits_data:
+            key = (visit_data["doctor"], visit_data["date"], visit_data["description"])
+            if key not in existing:
+                to_create[key] = VeterinaryVisit(health_card=instance, **visit_data)
+        if to_create:
+            VeterinaryVisit.objects.bulk_create(to_create.values())
 
 
 class HealthCardReadSerializer(serializers.ModelSerializer):
@@ -248,8 +344,8 @@ class AnimalReadSerializer(serializers.ModelSerializer):
 
 
 class AnimalWriteSerializer(AnimalReadSerializer):
-    adopted_by = serializers.PrimaryKeyRelatedField(queryset=Adopter.objects.all(), required=False)
-    temporary_home = serializers.PrimaryKeyRelatedField(queryset=TemporaryHome.objects.all(), required=False)
+    adopted_by = BulkPrimaryKeyRelatedField(queryset=Adopter.objects.all(), required=False)
+    temporary_home = BulkPrimaryKeyRelatedField(queryset=TemporaryHome.objects.all(), required=False)
 
     def validate(self, attrs):
         if attrs.get("adopted_by") and attrs.get("status"):
@@ -271,6 +367,116 @@ class AnimalWriteSerializer(AnimalReadSerializer):
 
         return super().update(instance, validated_data)
 
+    def create(self, validated_data):
+        animal = super().create(validated_data)
+        # The health card created with the animal is empty, rendering it needs no queries.
+        health_card = animal.healthcards
+        health_card._prefetched_objects_cache = {
+            relation: getattr(health_card, relation).none()
+            for relation in (
+                "healthcardallergies",
+                "healthcardmedications",
+                "healthcardvaccinations",
+                "veterinaryvisits",
+            )
+        }
+        return animal
+
+
+class AnimalBulkCreateSerializer(BulkListSerializer):
+    """
+    Animal intake in one request. Every item is validated on its own, the valid
+    ones are created with one INSERT for the animals and one for their health
+    cards, the invalid ones are reported in ``errors`` by their index.
+    """
+
+    slug_conflict_retries = 2
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("child", AnimalWriteSerializer())
+        kwargs.setdefault("allow_empty", False)
+        super().__init__(*args, **kwargs)
+        self.row_errors = {}
+        self.row_indexes = []
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            message = self.error_messages["not_a_list"].format(input_type=type(data).__name__)
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]}, code="not_a_list")
+        if not data and not self.allow_empty:
+            message = str(self.error_messages["empty"])
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]}, code="empty")
+        if self.max_length is not None and len(data) > self.max_length:
+            message = self.error_messages["max_length"].format(max_length=self.max_length)
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]}, code="max_length")
+
+        self.row_errors, self.row_indexes, rows = {}, [], []
+        with self.preload(data):
+            for index, item in enumerate(data):
+                try:
+                    rows.append(self.child.run_validation(item))
+                except serializers.ValidationError as exc:
+                    self.row_errors[index] = exc.detail
+                else:
+                    self.row_indexes.append(index)
+        return rows
+
+    def create(self, validated_data):
+        animals = [Animal(**attrs) for attrs in validated_data]
+        if not animals:
+            return []
+        with transaction.atomic():
+            animals = self.insert_animals(animals)
+            HealthCard.objects.bulk_create([HealthCard(animal=animal) for animal in animals])
+            AnimalStatusTransition.objects.bulk_create(
+                [AnimalStatusTransition.for_created(animal) for animal in animals]
+            )
+            statistics.record_created(animals)
+        # bulk_create sends no post_save, see reks_manager.core.signals
+        if any(animal.status == PUBLIC_STATUS for animal in animals):
+            transaction.on_commit(lambda: bump_generation(PUBLIC_ANIMALS_NAMESPACE))
+        return animals
+
+    def insert_animals(self, animals):
+        """
+        Insert ``animals`` with unique slugs and return the inserted ones. A
+        concurrent create can take a slug between the lookup and the INSERT: the
+        batch is retried with fresh slugs, then inserted one by one, reporting
+        the slugs still taken in ``errors`` of their items.
+        """
+        for attempt in range(self.slug_conflict_retries):
+            assign_unique_slugs(animals)
+            try:
+                with transaction.atomic():
+                    return Animal.objects.bulk_create(animals)
+            except IntegrityError:
+                pass
+
+        inserted = []
+        for index, animal in zip(list(self.row_indexes), animals):
+            assign_unique_slugs([animal])
+            try:
+                with transaction.atomic():
+                    Animal.objects.bulk_create([animal])
+            except IntegrityError:
+                if not Animal.objects.filter(slug=animal.slug).exists():
+                    raise
+                self.row_indexes.remove(index)
+                self.row_errors[index] = {"slug": animal.unique_error_message(Animal, ("slug",)).messages}
+            else:
+                inserted.append(animal)
+        return inserted
+
+    def get_results(self):
+        """Created animals and errors, in the order of the submitted items."""
+
+        results = [{"index": index, "errors": errors} for index, errors in self.row_errors.items()]
+        results += [
+            {"index": index, "id": animal.pk, "slug": animal.slug}
+            for index, animal in zip(self.row_indexes, self.instance or [])
+        ]
+        return sorted(results, key=lambda result: result["index"])
+
 
 #  ------------------------------------------------------------
 #  PUBLIC
@@ -278,6 +484,8 @@ class AnimalWriteSerializer(AnimalReadSerializer):
 
 
 class AnimalPublicSerializer(serializers.ModelSerializer):
+    image_srcset = serializers.ReadOnlyField(source="get_image_srcset")
+
     class Meta:
         model = Animal
         fields = [
@@ -299,5 +507,6 @@ class AnimalPublicSerializer(serializers.ModelSerializer):
             "character",
             "for_who",
             "image",
+            "image_srcset",
             "created_at",
         ]
@@ -0,0 +1,95 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import statistics
+from .cache import PUBLIC_ANIMALS_NAMESPACE, bump_generation
+from .images import delete_variants
+from .models import PUBLIC_STATUS, Animal, AnimalStatusTransition
+
+HISTORY_FIELDS = ("status", "residence", "adopted_by_id")
+
+
+def _is_or_was_public(instance, created=False):
+    if instance.status == PUBLIC_STATUS:
+        return True
+    if created:
+        return False
+    loaded_status = getattr(instance, "_loaded_values", {}).get("status")
+    # An unknown previous status might have been the public one.
+    return loaded_status is None or loaded_status == PUBLIC_STATUS
+
+
+@receiver(post_save, sender=Animal)
+def invalidate_public_animals_on_save(sender, instance, created, **kwargs):
+    if _is_or_was_public(instance, created):
+        transaction.on_commit(lambda: bump_generation(PUBLIC_ANIMALS_NAMESPACE))
+
+
+@receiver(post_delete, sender=Animal)
+def invalidate_public_animals_on_delete(sender, instance, **kwargs):
+    if _is_or_was_public(instance):
+        transaction.on_commit(lambda: bump_generation(PUBLIC_ANIMALS_NAMESPACE))
+
+
+@receiver(post_delete, sender=Animal)
+def delete_image_variants(sender, instance, using, **kwargs):
+    if instance.image_variants:
+        transaction.on_commit(partial(delete_variants, instance.image.storage, instance.image_variants), using=using)
+
+
+def _get_state(instance):
+    return {field: getattr(instance, field) for field in Animal.tracked_fields}
+
+
+def _get_loaded_state(instance):
+    loaded = getattr(instance, "_loaded_values", {})
+    # Unknown when not loaded from the database or loaded with deferred fields.
+    return loaded if len(loaded) == len(Animal.tracked_fields) else None
+
+
+@receiver(pre_save, sender=Animal)
+def remember_saved_state(sender, instance, raw, using, **kwargs):
+    if raw or instance._state.adding:
+        instance._saved_state = None
+        return
+    state = _get_loaded_state(instance)
+    if state is None:
+        state = Animal.objects.using(using).filter(pk=instance.pk).values(*Animal.tracked_fields).first()
+    instance._saved_state = state
+
+
+@receiver(post_save, sender=Animal)
+def record_changes_on_save(sender, instance, created, raw, using, update_fields, **kwargs):
+    """Update the statistics and append to the status history, in the transaction of the save."""
+
+    if raw:
+        return
+    before = None if created else instance._saved_state
+    if not created and before is None:
+        return
+    after = _get_state(instance)
+    if update_fields is not None and before is not None:
+        after = {
+            field: value if Animal._meta.get_field(field).name in update_fields else before[field]
+            for field, value in after.items()
+        }
+
+    statistics.apply_deltas(statistics.get_deltas(instance, before, after), using=using)
+    if created:
+        AnimalStatusTransition.for_created(instance).save(using=using)
+    elif before is not None and any(before[field] != after[field] for field in HISTORY_FIELDS):
+        AnimalStatusTransition.for_state(instance, before["status"], after).save(using=using)
+
+
+@receiver(post_delete, sender=Animal)
+def record_changes_on_delete(sender, instance, using, **kwargs):
+    before = _get_loaded_state(instance) or _get_state(instance)
+    deltas = statistics.merge_deltas(
+        statistics.get_deltas(instance, before, None),
+        statistics.get_deleted_adoption_deltas(instance, using=using),
+    )
+    statistics.apply_deltas(deltas, using=using)
+    AnimalStatusTransition.for_state(instance, before["status"], None).save(using=using)
@@ -0,0 +1,231 @@
+"""
+Shelter statistics kept in the ``StatisticCounter`` summary table, so the
+dashboard reads a few dozen rows whatever the number of animals.
+
+Counters per ``dimension`` / ``key``:
+
+- ``status``, ``animal_type``, ``residence``: animals per current value;
+- ``intake``: animals added per month of ``created_at``;
+- ``adoptions``: animals adopted per month, ``total`` sums the days from intake
+  (``date_when_found``, else ``created_at``) to adoption. An animal returned
+  later stays counted, a deleted one takes its adoptions back.
+
+The signals in reks_manager.core.signals move the counters in the transaction
+of every saved or deleted animal, bulk paths call ``record_created``.
+``rebuild`` recomputes the whole table from the animals and their history.
+"""
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import RESIDENCE_CHOICES, STATUS_CHOICES, TYPE_CHOICES, Animal, AnimalStatusTransition, StatisticCounter
+
+ADOPTED_STATUS = "ZAADOPTOWANY"
+COUNTED_FIELDS = ("status", "animal_type", "residence")
+
+
+def _month(value):
+    return f"{value:%Y-%m}"
+
+
+def get_intake_date(animal):
+    return animal.date_when_found or timezone.localdate(animal.created_at)
+
+
+def get_state(animal):
+    """Values of ``animal`` the counters depend on."""
+
+    return {field: getattr(animal, field) for field in COUNTED_FIELDS}
+
+
+def get_deltas(animal, before, after, today=None):
+    """
+    ``Counter`` of ``(dimension, key) -> (count, total)`` changes for ``animal``
+    going from the ``before`` to the ``after`` state, ``None`` when it was
+    created or deleted respectively.
+    """
+    deltas: Counter[tuple] = Counter()
+    totals: Counter[tuple] = Counter()
+    for sign, state in ((-1, before), (1, after)):
+        if state is not None:
+            for field in COUNTED_FIELDS:
+                deltas[(field, state[field])] += sign
+    if before is None and after is not None:
+        deltas[("intake", _month(timezone.localtime(animal.created_at)))] += 1
+    if after is None and before is not None:
+        deltas[("intake", _month(timezone.localtime(animal.created_at)))] -= 1
+
+    # Adoptions are events, an animal returned later stays counted in its month.
+    adopted = after is not None and after["status"] == ADOPTED_STATUS
+    if adopted and (before is None or before["status"] != ADOPTED_STATUS):
+        today = today or timezone.localdate()
+        key = ("adoptions", _month(today))
+        deltas[key] += 1
+        totals[key] += (today - get_intake_date(animal)).days
+
+    return {key: (deltas[key], totals[key]) for key in deltas.keys() | totals.keys() if deltas[key] or totals[key]}
+
+
+def merge_deltas(*deltas):
+    """Sum of several ``get_deltas`` results, without the keys left unchanged."""
+
+    counts: Counter[tuple] = Counter()
+    totals: Counter[tuple] = Counter()
+    for changes in deltas:
+        for key, (count, total) in changes.items():
+            counts[key] += count
+            totals[key] += total
+    return {key: (counts[key], totals[key]) for key in counts.keys() | totals.keys() if counts[key] or totals[key]}
+
+
+def _adoption_events(transitions):
+    return transitions.filter(status=ADOPTED_STATUS).exclude(previous_status=ADOPTED_STATUS)
+
+
+def _count_adoptions(adoptions):
+    """Counter changes of ``(changed_at, intake date)`` adoption events."""
+
+    counts: Counter[tuple] = Counter()
+    days: Counter[tuple] = Counter()
+    for changed_at, intake_date in adoptions:
+        adopted_on = timezone.localdate(changed_at)
+        key = ("adoptions", _month(adopted_on))
+        counts[key] += 1
+        days[key] += (adopted_on - intake_date).days
+    return {key: (counts[key], days[key]) for key in counts}
+
+
+def get_deleted_adoption_deltas(animal, using="default"):
+    """Changes taking back the adoptions of the deleted ``animal``, read from its status history."""
+
+    intake_date = get_intake_date(animal)
+    changed_at = _adoption_events(AnimalStatusTransition.objects.using(using).filter(animal_id=animal.pk))
+    adoptions = _count_adoptions((value, intake_date) for value in changed_at.values_list("changed_at", flat=True))
+    return {key: (-count, -total) for key, (count, total) in adoptions.items()}
+
+
+def apply_deltas(deltas, using="default"):
+    """Add ``deltas`` to the counters with two queries, creating the missing rows."""
+
+    if not deltas:
+        return
+    manager = StatisticCounter.objects.using(using)
+    # Usually within the save of the animal already, no savepoint needed.
+    with transaction.atomic(using=using, savepoint=False):
+        manager.bulk_create(
+            [StatisticCounter(dimension=dimension, key=key) for dimension, key in deltas], ignore_conflicts=True
+        )
+        # One UPDATE, increments stay correct under concurrent transactions.
+        manager.filter(reduce(or_, (Q(dimension=dimension, key=key) for dimension, key in deltas))).update(
+            count=F("count")
+            + Case(
+                *[
+                    When(dimension=dimension, key=key, then=Value(count))
+                    for (dimension, key), (count, _) in deltas.items()
+                ],
+                default=Value(0),
+            ),
+            total=F("total")
+            + Case(
+                *[
+                    When(dimension=dimension, key=key, then=Value(total))
+                    for (dimension, key), (_, total) in deltas.items()
+                ],
+                default=Value(0),
+            ),
+        )
+
+
+def record_created(animals, using="default"):
+    """Count animals created with ``bulk_create``, which sends no signals."""
+
+    apply_deltas(merge_deltas(*(get_deltas(animal, None, get_state(animal)) for animal in animals)), using=using)
+
+
+def rebuild(using="default"):
+    """
+    Recompute every counter from the animals and, for adoptions, from the
+    status history of the animals that still exist.
+    """
+    animals = Animal.objects.using(using)
+    rows = {}
+    for field in COUNTED_FIELDS:
+        for value, count in animals.values_list(field).annotate(count=Count("pk")).order_by():
+            rows[(field, value)] = (count, 0)
+
+    for month, count in (
+        animals.annotate(month=TruncMonth("created_at")).values_list("month").annotate(count=Count("pk")).order_by()
+    ):
+        rows[("intake", _month(month))] = (count, 0)
+
+    transitions = _adoption_events(AnimalStatusTransition.objects.using(using)).values_list(
+        "changed_at", "animal__created_at", "animal__date_when_found"
+    )
+    rows.update(
+        _count_adoptions(
+            (changed_at, date_when_found or timezone.localdate(created_at))
+            for changed_at, created_at, date_when_found in transitions
+        )
+    )
+
+    with transaction.atomic(using=using):
+        StatisticCounter.objects.using(using).all().delete()
+        StatisticCounter.objects.using(using).bulk_create(
+            [
+                StatisticCounter(dimension=dimension, key=key, count=count, total=total)
+                for (dimension, key), (count, total) in rows.items()
+            ]
+        )
+    return len(rows)
+
+
+def _average(total, count):
+    return round(total / count, 1) if count else None
+
+
+def get_summary(using=None):
+    """Dashboard numbers, read with one query from the summary table, on the routed database by default."""
+
+    counters: dict[str, dict] = {}
+    for dimension, key, count, total in StatisticCounter.objects.using(using).values_list(
+        "dimension", "key", "count", "total"
+    ):
+        counters.setdefault(dimension, {})[key] = (count, total)
+
+    def counts(dimension, choices):
+        values = counters.get(dimension, {})
+        return {value: values.get(value, (0, 0))[0] for value, _label in choices}
+
+    intake = counters.get("intake", {})
+    adoptions = counters.get("adoptions", {})
+    months = []
+    for month in sorted(intake.keys() | adoptions.keys()):
+        intake_count = intake.get(month, (0, 0))[0]
+        adoption_count, days = adoptions.get(month, (0, 0))
+        months.append(
+            {
+                "month": month,
+                "intake": intake_count,
+                "adoptions": adoption_count,
+                "adoption_rate": round(adoption_count / intake_count, 3) if intake_count else None,
+                "average_days_to_adoption": _average(days, adoption_count),
+            }
+        )
+
+    by_status = counts("status", STATUS_CHOICES)
+    return {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "by_animal_type": counts("animal_type", TYPE_CHOICES),
+        "by_residence": counts("residence", RESIDENCE_CHOICES),
+        "adoptions": sum(count for count, _days in adoptions.values()),
+        "average_days_to_adoption": _average(
+            sum(days for _count, days in adoptions.values()), sum(count for count, _days in adoptions.values())
+        ),
+        "months": months,
+    }
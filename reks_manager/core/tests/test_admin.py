@@ -0,0 +1,146 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..admin import EstimatedCountPaginator
+from ..models import Allergy, HealthCard, Vaccination, VeterinaryVisit
+from .utils import create_animal, fill_health_card
+
+User = get_user_model()
+
+
+@override_settings(
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    }
+)
+class HealthCardAdminTest(TestCase):
+    """Test cases for the health card admin changelist."""
+
+    def setUp(self):
+        """Set up an admin user and the allergies and vaccination to attach."""
+
+        self.user = User.objects.create_superuser(email="admin@test.test", password="testpassword")
+        self.client.force_login(self.user)
+        self.allergies = [Allergy.objects.create(category="POKARM", name=name) for name in ("Orzechy", "Mleko")]
+        self.vaccination = Vaccination.objects.create(name="Wścieklizna")
+
+    def create_health_cards(self, count):
+        for index in range(count):
+            animal = create_animal(self.user, f"Burek {index}")
+            fill_health_card(animal, self.allergies[: index % 3], [self.vaccination])
+
+    def get_changelist(self, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("admin:core_healthcard_changelist"), params)
+        self.assertEqual(response.status_code, 200)
+        return response, len(context)
+
+    def test_query_count_does_not_depend_on_rows(self):
+        """Test the counts are annotated instead of queried per row."""
+
+        self.create_health_cards(2)
+        _response, few = self.get_changelist()
+        self.create_health_cards(10)
+        response, many = self.get_changelist()
+
+        self.assertEqual(few, many)
+        counts = {card.animal.name: card.allergies_count for card in response.context["cl"].result_list}
+        self.assertEqual(counts["Burek 2"], 2)
+        self.assertEqual(counts["Burek 0"], 0)
+
+    def test_sort_by_counts(self):
+        """Test the count columns sort by their annotations."""
+
+        self.create_health_cards(3)
+        column = self.get_changelist()[0].context["cl"].list_display.index("allergies_count")
+
+        response, _queries = self.get_changelist(o=f"-{column}")
+
+        self.assertEqual([card.allergies_count for card in response.context["cl"].result_list], [2, 1, 0])
+
+
+@override_settings(
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    }
+)
+class LargeTableAdminTest(TestCase):
+    """Test cases for the changelists of the large tables."""
+
+    def setUp(self):
+        """Set up an admin user, two animals and a veterinary visit."""
+
+        self.user = User.objects.create_superuser(email="admin@test.test", password="testpassword")
+        self.client.force_login(self.user)
+        self.animals = [create_animal(self.user, name) for name in ("Burek", "Azor")]
+        VeterinaryVisit.objects.create(
+            health_card=self.animals[0].healthcards, doctor="PIOTR", date=timezone.now().date(), description="Ok"
+        )
+
+    def get_changelist(self, model_name, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse(f"admin:core_{model_name}_changelist"), params)
+        self.assertEqual(response.status_code, 200)
+        return response, [query["sql"] for query in context.captured_queries]
+
+    def test_changelists_run_no_distinct_or_full_count(self):
+        """Test no filter lists the values of a column and the full count is not queried."""
+
+        for model_name in ("animal", "adopter", "temporaryhome", "veterinaryvisit", "healthcard"):
+            with self.subTest(model_name):
+                response, queries = self.get_changelist(model_name)
+                self.assertFalse([sql for sql in queries if "DISTINCT" in sql])
+                self.assertIsNone(response.context["cl"].full_result_count)
+
+    def test_input_filter(self):
+        """Test the text box filters the column and an empty one is ignored."""
+
+        response, _queries = self.get_changelist("animal", name__icontains="bur")
+        self.assertEqual([animal.name for animal in response.context["cl"].result_list], ["Burek"])
+        self.assertContains(response, 'name="name__icontains" value="bur"')
+
+        response, _queries = self.get_changelist("animal", name__icontains="")
+        self.assertEqual(response.context["cl"].result_count, 2)
+
+    def test_autocomplete_filter(self):
+        """Test the related filter renders only the selected object and filters by it."""
+
+        health_card = self.animals[0].healthcards
+        response, _queries = self.get_changelist("veterinaryvisit", health_card__id__exact=health_card.pk)
+
+        self.assertEqual(response.context["cl"].result_count, 1)
+        self.assertContains(response, f'<option value="{health_card.pk}" selected>', html=False)
+        self.assertNotContains(response, str(self.animals[1].healthcards))
+        self.assertContains(response, "admin/js/autocomplete.js")
+
+        response, _queries = self.get_changelist("veterinaryvisit", health_card__id__exact="")
+        self.assertEqual(response.context["cl"].result_count, 1)
+
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {"app_label": "core", "model_name": "veterinaryvisit", "field_name": "health_card", "term": "Azor"},
+        )
+        self.assertEqual([result["id"] for result in response.json()["results"]], [self.animals[1].healthcards.pk])
+
+    def test_estimated_count(self):
+        """Test the paginator uses the planner estimate on PostgreSQL above the threshold, unfiltered only."""
+
+        queryset = HealthCard.objects.order_by("pk")
+        explain = '[{"Plan": {"Plan Rows": %d}}]'
+        with mock.patch.object(connections["default"], "vendor", "postgresql"):
+            with mock.patch.object(type(queryset), "explain", return_value=explain % 50_000):
+                self.assertEqual(EstimatedCountPaginator(queryset, 100).count, 50_000)
+            with mock.patch.object(type(queryset), "explain", return_value=explain % 10):
+                self.assertEqual(EstimatedCountPaginator(queryset, 100).count, 2)
+            with mock.patch.object(type(queryset), "explain", return_value=explain % 50_000) as explain_mock:
+                self.assertEqual(EstimatedCountPaginator(queryset.filter(animal__name="Azor"), 100).count, 1)
+                explain_mock.assert_not_called()
+        self.assertEqual(EstimatedCountPaginator(queryset, 100).count, 2)
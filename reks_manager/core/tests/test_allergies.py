@@ -1,15 +1,15 @@
 import json
+from datetime import datetime
 
 from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 from django.urls import reverse
-from django.utils import timezone
 from django.utils.translation import gettext as _
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 
-from .models import ALLERGY_CATEGORY, Allergy
-from .serializers import AllergiesSerializer
+from ..models import ALLERGY_CATEGORY, Allergy
+from ..serializers import AllergiesSerializer
 
 User = get_user_model()
 
@@ -36,8 +36,8 @@ class AllergyModelTest(TestCase):
         self.assertEqual(self.allergy_instance.category, self.allergy_data["category"])
         self.assertEqual(self.allergy_instance.name, self.allergy_data["name"])
         self.assertEqual(self.allergy_instance.description, self.allergy_data["description"])
-        self.assertIsInstance(self.allergy_instance.created_at, timezone.datetime)
-        self.assertIsInstance(self.allergy_instance.updated_at, timezone.datetime)
+        self.assertIsInstance(self.allergy_instance.created_at, datetime)
+        self.assertIsInstance(self.allergy_instance.updated_at, datetime)
         self.assertEqual(
             str(self.allergy_instance), _("Allergy") + f": {self.allergy_data['category']} {self.allergy_data['name']}"
         )
@@ -0,0 +1,334 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from ..fields import assign_unique_slugs, generate_id
+from ..models import Adopter, Animal, AnimalStatusTransition
+from ..transliteration import slugify, transliterate
+from .utils import create_animal, create_animals, create_staff_user
+
+
+class TimeOrderedIDTest(TestCase):
+    """Test cases for the time-ordered primary keys."""
+
+    def setUp(self):
+        """Set up a user adding the animals."""
+
+        self.user = create_staff_user()
+
+    def test_ids_are_ordered_and_unique(self):
+        """Test IDs generated in a burst keep their order and the prefix."""
+
+        ids = [generate_id("p_") for _ in range(1000)]
+
+        self.assertEqual(sorted(ids), ids)
+        self.assertEqual(len(set(ids)), 1000)
+        self.assertTrue(all(len(value) == 28 and value.startswith("p_") for value in ids))
+
+    def test_animal_and_health_card_ids(self):
+        """Test new animals and their health cards get prefixed, increasing IDs."""
+
+        first = create_animal(self.user)
+        second = create_animal(self.user)
+
+        self.assertRegex(first.pk, r"^p_[0-9a-z]{26}$")
+        self.assertRegex(first.healthcards.pk, r"^hc_[0-9a-z]{26}$")
+        self.assertLess(first.pk, second.pk)
+
+    def test_insert_opens_no_savepoint(self):
+        """Test an animal and its health card are inserted without a savepoint around them."""
+
+        with CaptureQueriesContext(connection) as context:
+            create_animal(self.user)
+
+        self.assertFalse([query for query in context.captured_queries if "SAVEPOINT" in query["sql"]])
+
+    def test_previous_ids_stay_valid(self):
+        """Test animals keep working with IDs of the previous format."""
+
+        animal = create_animal(self.user, id="p_12345")
+
+        self.assertEqual(Animal.objects.get(pk="p_12345").healthcards, animal.healthcards)
+
+
+class AnimalBulkCreateTest(TestCase):
+    """Test cases for the bulk animal intake endpoint."""
+
+    def setUp(self):
+        """Set up a staff user and an adopter."""
+
+        self.user = create_staff_user()
+        self.token = Token.objects.create(user=self.user)
+        self.client = Client(headers={"authorization": f"Token {self.token.key}"})
+        self.adopter = Adopter.objects.create(name="Jan Kowalski", phone_number="123456789")
+        self.url = reverse("api:animal-bulk-create")
+
+    def item(self, name="Burek", **kwargs):
+        return {
+            "name": name,
+            "animal_type": "PIES",
+            "gender": "SAMIEC",
+            "birth_date": timezone.now().date().isoformat(),
+            **kwargs,
+        }
+
+    def post(self, items):
+        return self.client.post(self.url, items, content_type="application/json")
+
+    def test_animals_and_health_cards_are_created(self):
+        """Test every item gets an animal with a health card and a unique slug."""
+
+        create_animal(self.user)
+
+        response = self.post([self.item(), self.item(), self.item("Łatka", adopted_by=self.adopter.pk)])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        results = response.json()["results"]
+        self.assertEqual([result["slug"] for result in results], ["burek-2", "burek-3", "latka"])
+        animals = Animal.objects.filter(pk__in=[result["id"] for result in results])
+        self.assertEqual(animals.filter(healthcards__isnull=False, added_by=self.user).count(), 3)
+        self.assertEqual(Animal.objects.get(slug="latka").adopted_by, self.adopter)
+
+    def test_invalid_items_are_reported(self):
+        """Test invalid items are reported by index and do not stop the valid ones."""
+
+        response = self.post([self.item(), self.item("B"), self.item("Reksio", adopted_by="a_missing")])
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.json()["results"]
+        self.assertEqual([result["index"] for result in results], [0, 1, 2])
+        self.assertEqual(results[0]["slug"], "burek")
+        self.assertIn("name", results[1]["errors"])
+        self.assertIn("adopted_by", results[2]["errors"])
+        self.assertEqual(Animal.objects.count(), 1)
+
+        response = self.post([self.item("B")])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Animal.objects.count(), 1)
+
+    def test_not_a_list_is_rejected(self):
+        """Test the whole request is rejected when it is not a list of items."""
+
+        self.assertEqual(self.post(self.item()).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.post([]).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Animal.objects.exists())
+
+    def test_query_count_is_constant(self):
+        """Test the number of queries does not depend on the number of items."""
+
+        def count_queries(items):
+            with CaptureQueriesContext(connection) as context:
+                response = self.post(items)
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return len(context)
+
+        few = count_queries([self.item(adopted_by=self.adopter.pk) for _ in range(2)])
+        many = count_queries([self.item(adopted_by=self.adopter.pk) for _ in range(20)])
+
+        self.assertEqual(few, many)
+        self.assertEqual(Animal.objects.filter(slug__startswith="burek").count(), 22)
+
+    def race_for_slugs(self, names, calls=None):
+        """
+        Patch the slug assignment so that a concurrent create takes the slug given
+        to an animal named in ``names`` right after it is looked up, in the first
+        ``calls`` assignments or in all of them.
+        """
+
+        made_calls = []
+
+        def assign_and_race(instances, field_name="slug"):
+            assign_unique_slugs(instances, field_name)
+            made_calls.append(instances)
+            if calls is not None and len(made_calls) > calls:
+                return
+            for instance in instances:
+                if instance.name in names:
+                    other = create_animal(self.user, "Inny")
+                    Animal.objects.filter(pk=other.pk).update(slug=instance.slug)
+
+        return mock.patch("reks_manager.core.serializers.assign_unique_slugs", assign_and_race)
+
+    # The concurrent creates run inside the request and count against its budget.
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_slug_taken_concurrently_is_retried(self):
+        """Test a slug taken by a concurrent create is replaced by a fresh one."""
+
+        with self.race_for_slugs(["Burek"], calls=1):
+            response = self.post([self.item(), self.item("Łatka")])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([result["slug"] for result in response.json()["results"]], ["burek-2", "latka"])
+        self.assertEqual(Animal.objects.exclude(name="Inny").filter(healthcards__isnull=False).count(), 2)
+
+    # The concurrent creates run inside the request and count against its budget.
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_slug_conflict_is_reported_by_item(self):
+        """Test an item whose slug keeps being taken is reported and the others are created."""
+
+        with self.race_for_slugs(["Burek"]):
+            response = self.post([self.item(), self.item("Łatka")])
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.json()["results"]
+        self.assertEqual([result["index"] for result in results], [0, 1])
+        self.assertIn("slug", results[0]["errors"])
+        self.assertEqual(results[1]["slug"], "latka")
+        self.assertEqual(list(Animal.objects.exclude(name="Inny").values_list("name", flat=True)), ["Łatka"])
+        self.assertEqual(AnimalStatusTransition.objects.filter(animal__name="Łatka").count(), 1)
+
+    def test_single_create_query_count(self):
+        """Test creating one animal renders its new, empty health card without queries."""
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(reverse("api:animal-list"), self.item(), content_type="application/json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["health_card"]["allergies"], [])
+        self.assertFalse([query for query in context.captured_queries if "healthcardallergy" in query["sql"].lower()])
+
+
+class AnimalSlugTest(TestCase):
+    """Test cases for the slugs of animals."""
+
+    def setUp(self):
+        """Set up a user."""
+
+        self.user = create_staff_user()
+
+    def get_slug_queries(self, context):
+        return [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith('SELECT "core_animal"."slug"')
+        ]
+
+    def test_transliterate(self):
+        """Test Polish and other Latin letters with diacritics are replaced by ASCII."""
+
+        self.assertEqual(transliterate("Żółć Łódź, Ærø straße Nguyễn"), "Zolc Lodz, AEro strasse Nguyen")
+        self.assertEqual(slugify("Mały Książę"), "maly-ksiaze")
+
+    def test_unique_slugs_with_one_query(self):
+        """Test a taken slug gets the next free suffix, found with one query."""
+
+        create_animal(self.user, "Łatka")
+        create_animal(self.user, "Łatka")
+        create_animal(self.user, "Łatka zielona")
+
+        with CaptureQueriesContext(connection) as context:
+            animal = create_animal(self.user, "Łatka")
+
+        self.assertEqual(animal.slug, "latka-3")
+        self.assertEqual(len(self.get_slug_queries(context)), 1)
+
+    def test_unique_slugs_of_long_names(self):
+        """Test suffixes of a slug cropped to its max_length are taken into account."""
+
+        name = "Bardzo długie imię psa ze schroniska w Krakowie przy ulicy Rybnej"[:60]
+        slugs = [create_animal(self.user, name).slug for _ in range(3)]
+
+        base = slugify(name)[:50]
+        self.assertEqual(slugs, [base, f"{base[:48]}-2", f"{base[:48]}-3"])
+
+    def test_slug_kept_while_name_is_unchanged(self):
+        """Test saving without renaming keeps the slug without a query, renaming recomputes it."""
+
+        animal = Animal.objects.get(pk=create_animal(self.user).pk)
+        animal.status = "DO_ADOPCJI"
+        with CaptureQueriesContext(connection) as context:
+            animal.save()
+        self.assertEqual(animal.slug, "burek")
+        self.assertFalse(self.get_slug_queries(context))
+
+        animal.name = "Żwirek"
+        animal.save()
+        self.assertEqual(Animal.objects.get(pk=animal.pk).slug, "zwirek")
+
+
+class AnimalStatusHistoryTest(TestCase):
+    """Test cases for the animal status history."""
+
+    def setUp(self):
+        """Set up a user and an adopter."""
+
+        self.user = create_staff_user()
+        self.adopter = Adopter.objects.create(name="Jan Kowalski", phone_number="123456789")
+
+    def test_status_timeline(self):
+        """Test every change of status, residence or adopter appends a period."""
+
+        animal = create_animal(self.user, status="KWARANTANNA")
+        animal = Animal.objects.get(pk=animal.pk)
+        animal.status = "DO_ADOPCJI"
+        animal.save()
+        animal.name = "Reksio"
+        animal.save()
+        animal.adopt(self.adopter)
+
+        timeline = animal.status_timeline()
+
+        self.assertEqual([period["status"] for period in timeline], ["KWARANTANNA", "DO_ADOPCJI", "ZAADOPTOWANY"])
+        self.assertEqual(timeline[0]["end"], timeline[1]["start"])
+        self.assertEqual(timeline[0]["duration"], timeline[0]["end"] - timeline[0]["start"])
+        self.assertIsNone(timeline[2]["end"])
+        self.assertEqual(timeline[2]["adopted_by_id"], self.adopter.pk)
+        self.assertEqual(
+            list(animal.status_transitions.order_by("pk").values_list("previous_status", flat=True)),
+            [None, "KWARANTANNA", "DO_ADOPCJI"],
+        )
+
+    def test_transition_is_rolled_back_with_the_change(self):
+        """Test the history row is written in the transaction of the change."""
+
+        animal = create_animal(self.user, status="KWARANTANNA")
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            animal.adopt(self.adopter)
+            raise RuntimeError
+
+        self.assertEqual(animal.status_transitions.count(), 1)
+
+    def test_occupancy(self):
+        """Test the occupancy at a date from the history table alone."""
+
+        today = timezone.localdate()
+        days_ago = lambda days: timezone.now() - timedelta(days=days)  # noqa: E731
+        first, second = create_animals(self.user, ["Burek", "Burek"], status="KWARANTANNA")
+        create_animal(self.user, status="DO_ADOPCJI")
+        first.adopt(self.adopter)
+        second.delete()
+        AnimalStatusTransition.objects.filter(previous_status__isnull=True).update(changed_at=days_ago(10))
+        AnimalStatusTransition.objects.filter(animal=first, status="ZAADOPTOWANY").update(changed_at=days_ago(5))
+        AnimalStatusTransition.objects.filter(status__isnull=True).update(changed_at=days_ago(2))
+
+        with CaptureQueriesContext(connection) as context:
+            occupancy = AnimalStatusTransition.objects.occupancy(today - timedelta(days=7))
+        self.assertEqual(len(context), 1)
+        self.assertNotIn('"core_animal"', context.captured_queries[0]["sql"])
+        self.assertEqual(occupancy["total"], 3)
+        self.assertEqual(occupancy["by_status"]["KWARANTANNA"], 2)
+        self.assertEqual(occupancy["by_residence"]["SCHRONISKO"], 3)
+
+        self.assertEqual(AnimalStatusTransition.objects.occupancy(today - timedelta(days=3))["total"], 2)
+        self.assertEqual(AnimalStatusTransition.objects.occupancy(today)["by_status"]["DO_ADOPCJI"], 1)
+        self.assertEqual(AnimalStatusTransition.objects.occupancy(today - timedelta(days=11))["total"], 0)
+
+    def test_bulk_created_animals_have_history(self):
+        """Test the bulk endpoint records the initial state of its animals."""
+
+        token = Token.objects.create(user=self.user)
+        client = Client(headers={"authorization": f"Token {token.key}"})
+        item = {"name": "Azor", "animal_type": "KOT", "gender": "SAMIEC", "birth_date": "2020-01-01"}
+
+        response = client.post(reverse("api:animal-bulk-create"), [item, item], content_type="application/json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(AnimalStatusTransition.objects.filter(status="NIE_DO_ADOPCJI").count(), 2)
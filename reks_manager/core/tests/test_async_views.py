@@ -0,0 +1,94 @@
+import json
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from reks_manager.blog.models import Category
+
+from ..async_views import AsyncReadView
+from .utils import create_animal, create_staff_user
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class AsyncReadViewTest(TestCase):
+    """Test cases for the async read endpoints of the ASGI deployment."""
+
+    def setUp(self):
+        """Set up adoptable animals, a blog category, a user token and an empty cache."""
+
+        cache.clear()
+        self.user = create_staff_user()
+        self.token = Token.objects.create(user=self.user)
+        for name in ("Burek", "Azor", "Reksio"):
+            self.animal = create_animal(self.user, name, status="DO_ADOPCJI")
+        self.category = Category.objects.create(name="Adopcje", description="Adopted animals")
+        self.list_url = reverse("api:public-animals-list")
+        self.detail_url = reverse("api:public-animal-detail", kwargs={"slug": self.animal.slug})
+
+    def request_async(self, method, url, data=None, headers=None):
+        """Return the response of the async view replacing the route of ``url``."""
+
+        match = resolve(url)
+        # The route is served by the viewset unless ASYNC_PUBLIC_VIEWS is on.
+        viewset_view = getattr(match.func, "view_initkwargs", {}).get("viewset_view", match.func)
+        view = AsyncReadView.as_view(viewset_view=viewset_view)
+        request = getattr(AsyncRequestFactory(), method)(url, data, headers=headers)
+        return async_to_sync(view)(request, *match.args, **match.kwargs)
+
+    def test_responses_match_viewsets(self):
+        """Test the async views respond like the viewsets they replace."""
+
+        auth = {"Authorization": f"Token {self.token.key}"}
+        for url, data, headers in [
+            (self.list_url, None, None),
+            (self.list_url, {"ordering": "name", "page_size": "2"}, None),
+            (self.detail_url, None, None),
+            (reverse("api:category-list"), None, auth),
+            (reverse("api:category-detail", kwargs={"pk": self.category.pk}), None, auth),
+        ]:
+            with self.subTest(url=url, data=data):
+                response = self.request_async("get", url, data, headers=headers)
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(json.loads(response.content), self.client.get(url, data, headers=headers).json())
+
+    def test_conditional_and_cached_responses(self):
+        """Test validators are answered with 304 and a cached list runs no query."""
+
+        response = self.request_async("get", self.list_url)
+        with CaptureQueriesContext(connection) as context:
+            cached = self.request_async("get", self.list_url)
+            not_modified = self.request_async("get", self.list_url, headers={"If-None-Match": response["ETag"]})
+
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(len(context.captured_queries), 0)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_errors(self):
+        """Test missing objects, invalid cursors and missing credentials are answered like by the viewsets."""
+
+        missing = reverse("api:public-animal-detail", kwargs={"slug": "missing"})
+        self.assertEqual(self.request_async("get", missing).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.request_async("get", self.list_url, {"cursor": "invalid"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.request_async("get", reverse("api:category-list"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_writes_are_handed_over(self):
+        """Test other methods than GET are served by the viewset."""
+
+        response = self.request_async(
+            "post",
+            reverse("api:category-list"),
+            {"name": "Porady", "description": "Tips"},
+            headers={"Authorization": f"Token {self.token.key}"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Category.objects.filter(name="Porady").exists())
@@ -0,0 +1,182 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import NoReverseMatch, reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import BrowsableAPIRenderer
+
+from ..models import (
+    ALLERGY_CATEGORY,
+    Adopter,
+    Allergy,
+    Animal,
+    HealthCardAllergy,
+    HealthCardVaccination,
+    VeterinaryVisit,
+)
+from .utils import create_animal, create_staff_user, fill_health_card
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class PublicAnimalsCacheTest(TestCase):
+    """Test cases for the cached public animal endpoints."""
+
+    def setUp(self):
+        """Set up an adoptable animal and an empty cache."""
+
+        cache.clear()
+        self.user = create_staff_user()
+        self.animal = create_animal(self.user, status="DO_ADOPCJI")
+        self.list_url = reverse("api:public-animals-list")
+        self.detail_url = reverse("api:public-animal-detail", kwargs={"slug": self.animal.slug})
+
+    def test_responses_are_cached(self):
+        """Test changes bypassing the signals are not visible until invalidation."""
+
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+        Animal.objects.filter(pk=self.animal.pk).update(description="Changed")
+
+        self.assertEqual(self.client.get(self.list_url).json()["results"][0]["description"], "")
+        self.assertEqual(self.client.get(self.detail_url).json()["description"], "")
+
+    def test_hits_answer_conditional_requests_without_queries(self):
+        """Test cached responses keep their validators and answer 304s without a query."""
+
+        for url in (self.list_url, self.detail_url):
+            with self.subTest(url=url):
+                etag = self.client.get(url)["ETag"]
+                with self.assertNumQueries(0):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response["ETag"], etag)
+                self.assertIn("Last-Modified", response)
+
+                with self.assertNumQueries(0):
+                    response = self.client.get(url, headers={"if-none-match": etag})
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+                self.assertEqual(response["ETag"], etag)
+
+    def test_only_implemented_actions_are_routed(self):
+        """Test the cache mixins do not add list/retrieve routes to the views."""
+
+        with self.assertRaises(NoReverseMatch):
+            reverse("api:public-animal-list")
+        with self.assertRaises(NoReverseMatch):
+            reverse("api:public-animals-detail", kwargs={"pk": self.animal.pk})
+
+    def test_save_invalidates_cache(self):
+        """Test saving an animal drops the cached responses after commit."""
+
+        self.client.get(self.list_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.animal.description = "Changed"
+            self.animal.save()
+
+        self.assertEqual(self.client.get(self.list_url).json()["results"][0]["description"], "Changed")
+
+    def test_adoption_invalidates_cache(self):
+        """Test an adopted animal disappears from the public list."""
+
+        adopter = Adopter.objects.create(name="Jan Kowalski", phone_number="123456789")
+        self.client.get(self.list_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Animal.objects.get(pk=self.animal.pk).adopt(adopter)
+
+        self.assertEqual(self.client.get(self.list_url).json()["results"], [])
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_private_animal_does_not_invalidate_cache(self):
+        """Test changes of animals outside the public listing keep the cache."""
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            create_animal(self.user, "Mruczek", animal_type="KOT", status="KWARANTANNA")
+        self.assertEqual(callbacks, [])
+
+
+class ConditionalGetTest(TestCase):
+    """Test cases for the ETag / Last-Modified handling."""
+
+    def setUp(self):
+        """Set up a staff client and an adoptable animal."""
+
+        self.user = create_staff_user()
+        self.token = Token.objects.create(user=self.user)
+        self.client = Client(headers={"authorization": f"Token {self.token.key}"})
+        self.animal = create_animal(self.user, status="DO_ADOPCJI")
+
+    def test_unchanged_detail_returns_not_modified(self):
+        """Test a matching If-None-Match returns 304 until the animal changes."""
+
+        url = reverse("api:public-animal-detail", kwargs={"slug": self.animal.slug})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", response)
+
+        response = self.client.get(url, headers={"if-none-match": response["ETag"]})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.animal.description = "Changed"
+        self.animal.save()
+        response = self.client.get(url, headers={"if-none-match": response["ETag"]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_health_card_list_tracks_nested_rows(self):
+        """Test a new visit changes the validators of the health card list."""
+
+        url = reverse("api:healthcard-list")
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(
+            self.client.get(url, headers={"if-none-match": etag}).status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+        VeterinaryVisit.objects.create(
+            health_card=self.animal.healthcards, doctor="PIOTR", date=timezone.now().date(), description="Checkup"
+        )
+        self.assertEqual(self.client.get(url, headers={"if-none-match": etag}).status_code, status.HTTP_200_OK)
+
+    def test_animal_detail_tracks_deleted_health_card_rows(self):
+        """Test deleting a health card allergy changes the validators of the animal rendering it."""
+
+        allergies = [
+            Allergy.objects.create(category=ALLERGY_CATEGORY[0][0], name=name) for name in ("Mleko", "Orzechy")
+        ]
+        fill_health_card(self.animal, allergies)
+        url = reverse("api:animal-detail", kwargs={"slug": self.animal.slug})
+        etag = self.client.get(url)["ETag"]
+
+        # The most recently updated row stays, so no timestamp changes.
+        HealthCardAllergy.objects.filter(allergy=allergies[0]).delete()
+
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["health_card"]["allergies"]), 1)
+
+    def test_nested_rows_are_aggregated_apart(self):
+        """Test no validator query joins two health card relations, which would multiply their rows."""
+
+        url = reverse("api:animal-detail", kwargs={"slug": self.animal.slug})
+        tables = [model._meta.db_table for model in (HealthCardAllergy, HealthCardVaccination, VeterinaryVisit)]
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+
+        for query in queries.captured_queries:
+            self.assertLessEqual(sum(f'"{table}"' in query["sql"] for table in tables), 1, query["sql"])
+
+    def test_validators_depend_on_renderer(self):
+        """Test the JSON and the browsable API renderings have their own ETags."""
+
+        url = reverse("api:animal-detail", kwargs={"slug": self.animal.slug})
+        response = self.client.get(url)
+        self.assertIn("Accept", response["Vary"])
+
+        # The browsable API templates need the collected static files.
+        with mock.patch.object(BrowsableAPIRenderer, "render", return_value=b""):
+            html = self.client.get(url, headers={"accept": "text/html", "if-none-match": response["ETag"]})
+        self.assertEqual(html.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(html["ETag"], response["ETag"])
@@ -0,0 +1,192 @@
+import json
+from unittest import mock, skipUnless
+
+from django.core.cache import cache
+from django.db import connection, connections
+from django.db.utils import load_backend
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from reks_manager.core.cache import PUBLIC_ANIMALS_NAMESPACE, bump_generation
+from reks_manager.utils.postgresql_pool import ReleaseConnectionsMiddleware, close_pools, get_pool_stats
+from reks_manager.utils.replicas import PIN_COOKIE
+
+from .utils import create_animal, create_staff_user
+
+
+@override_settings(
+    REPLICA_DATABASE="replica", CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class ReplicaRoutingTest(TransactionTestCase):
+    """Test cases for the reads routed to the read replica."""
+
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        """Set up a staff user and an adoptable animal."""
+
+        self.user = create_staff_user()
+        self.animal = create_animal(self.user, status="DO_ADOPCJI")
+        # Forget the primary pin of the public animals created just now.
+        cache.clear()
+
+    def get_animal_queries(self, url):
+        """Return the queries of the animals table run on the primary and on the replica for a GET."""
+
+        with CaptureQueriesContext(connections["default"]) as primary:
+            with CaptureQueriesContext(connections["replica"]) as replica:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                if response.streaming:
+                    response.getvalue()
+        return [
+            [query for query in context.captured_queries if "core_animal" in query["sql"]]
+            for context in (primary, replica)
+        ]
+
+    def test_public_reads_use_replica(self):
+        """Test the public animal list and detail read from the replica."""
+
+        for url in (
+            reverse("api:public-animals-list"),
+            reverse("api:public-animal-detail", kwargs={"slug": self.animal.slug}),
+        ):
+            with self.subTest(url):
+                primary, replica = self.get_animal_queries(url)
+                self.assertFalse(primary)
+                self.assertTrue(replica)
+
+    def test_export_streams_from_replica(self):
+        """Test the rows of a streamed export are read from the replica."""
+
+        self.client.force_login(self.user)
+        primary, replica = self.get_animal_queries(reverse("api:animal-export", kwargs={"export_format": "csv"}))
+
+        self.assertFalse(primary)
+        self.assertTrue(replica)
+
+    def test_staff_reads_own_writes(self):
+        """Test reads of a staff user who wrote go to the primary until the pin cookie expires."""
+
+        self.client.force_login(self.user)
+        url = reverse("api:animal-detail", kwargs={"slug": self.animal.slug})
+        response = self.client.patch(url, data=json.dumps({"name": "Azor"}), content_type="application/json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        primary, replica = self.get_animal_queries(reverse("api:public-animals-list"))
+        self.assertTrue(primary)
+        self.assertFalse(replica)
+
+        self.client.cookies.pop(PIN_COOKIE)
+        # Also expire the pin of the public animals changed above.
+        cache.clear()
+        primary, replica = self.get_animal_queries(reverse("api:public-animals-list"))
+        self.assertFalse(primary)
+        self.assertTrue(replica)
+
+    def test_public_reads_use_primary_after_invalidation(self):
+        """Test the cache of the public animals is refilled from the primary right after a change."""
+
+        bump_generation(PUBLIC_ANIMALS_NAMESPACE)
+
+        for url in (
+            reverse("api:public-animals-list"),
+            reverse("api:public-animal-detail", kwargs={"slug": self.animal.slug}),
+        ):
+            with self.subTest(url):
+                primary, replica = self.get_animal_queries(url)
+                self.assertTrue(primary)
+                self.assertFalse(replica)
+
+    def test_reads_use_primary_without_replica(self):
+        """Test reads stay on the primary when no replica is configured."""
+
+        with override_settings(REPLICA_DATABASE=None):
+            primary, replica = self.get_animal_queries(reverse("api:public-animals-list"))
+
+        self.assertTrue(primary)
+        self.assertFalse(replica)
+
+
+class ReleaseConnectionsMiddlewareTest(TestCase):
+    """Test cases for returning the connections before the response is sent."""
+
+    def get_response(self, response):
+        """Return ``response`` through the middleware, with the connection outside of a transaction."""
+
+        connection.ensure_connection()
+        middleware = ReleaseConnectionsMiddleware(lambda request: response)
+        with mock.patch.object(connection, "in_atomic_block", False), mock.patch.object(
+            connection, "close_if_unusable_or_obsolete"
+        ) as close:
+            middleware(RequestFactory().get("/"))
+        return close
+
+    def test_connections_are_released(self):
+        """Test the connections are closed once the response is built."""
+
+        self.get_response(HttpResponse("body")).assert_called_once_with()
+
+    def test_streaming_response_keeps_connections(self):
+        """Test a streaming response keeps the connections it reads from."""
+
+        self.get_response(StreamingHttpResponse(iter(["body"]))).assert_not_called()
+
+
+@skipUnless(connection.vendor == "postgresql", "Connection pools need PostgreSQL.")
+class ConnectionPoolTest(TestCase):
+    """Test cases for the pooled PostgreSQL backend."""
+
+    def setUp(self):
+        """Set up a pooled connection to the test database."""
+
+        settings_dict = {
+            **connection.settings_dict,
+            "ENGINE": "reks_manager.utils.postgresql_pool",
+            "CONN_MAX_AGE": 0,
+            "OPTIONS": {**connection.settings_dict["OPTIONS"], "pool": {"max_size": 1, "timeout": 5}},
+        }
+        self.pooled = load_backend(settings_dict["ENGINE"]).DatabaseWrapper(settings_dict, alias="pooled")
+        self.addCleanup(close_pools)
+        self.addCleanup(self.pooled.close)
+
+    def get_backend_pid(self):
+        """Return the server process of the pooled connection, closing it afterwards."""
+
+        with self.pooled.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            pid = cursor.fetchone()[0]
+        self.pooled.close()
+        return pid
+
+    def test_closed_connection_is_reused(self):
+        """Test closing returns the connection to the pool instead of disconnecting."""
+
+        pid = self.get_backend_pid()
+
+        self.assertEqual(self.get_backend_pid(), pid)
+        stats = get_pool_stats()["pooled"]
+        self.assertEqual(stats["pool_size"], 1)
+        self.assertEqual(stats["pool_available"], 1)
+
+    def test_broken_connection_is_replaced(self):
+        """Test a connection terminated while in the pool is replaced when it is handed out."""
+
+        pid = self.get_backend_pid()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s, 5000)", [pid])
+
+        self.assertNotEqual(self.get_backend_pid(), pid)
+
+    def test_metrics_endpoint_lists_pools(self):
+        """Test the metrics endpoint exposes the pool statistics per alias."""
+
+        self.get_backend_pid()
+        with override_settings(METRICS_TOKEN="secret"):
+            response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret")
+
+        self.assertIn('reks_db_pool_size{alias="pooled"} 1', response.content.decode())
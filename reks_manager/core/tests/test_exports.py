@@ -0,0 +1,196 @@
+import csv
+import json
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from ..exports import FIELDS
+from ..models import ALLERGY_CATEGORY, Adopter, Allergy, Animal, TemporaryHome, Vaccination
+from .utils import create_animal, create_animals, create_staff_user, fill_health_card
+
+
+class AnimalExportTest(TestCase):
+    """Test cases for the streaming animal exports."""
+
+    def setUp(self):
+        """Set up animals with filled health cards."""
+
+        self.user = create_staff_user()
+        self.token = Token.objects.create(user=self.user)
+        self.client = Client(headers={"authorization": f"Token {self.token.key}"})
+
+        allergy = Allergy.objects.create(category=ALLERGY_CATEGORY[0][0], name="Peanut Allergy")
+        vaccination = Vaccination.objects.create(name="Rabies")
+        for animal in create_animals(self.user, ["Burek", "Łatka", "Reksio"]):
+            fill_health_card(animal, [allergy], [vaccination], description="Mild")
+
+    def get_export(self, export_format):
+        response = self.client.get(reverse("api:animal-export", kwargs={"export_format": export_format}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn(f'.{export_format}"', response["Content-Disposition"])
+        return response.getvalue()
+
+    def test_csv(self):
+        """Test the CSV export holds every animal with its health card rows."""
+
+        rows = list(csv.DictReader(self.get_export("csv").decode().splitlines()))
+
+        self.assertEqual([row["name"] for row in rows], ["Burek", "Łatka", "Reksio"])
+        self.assertEqual(rows[0]["allergies"], f"{ALLERGY_CATEGORY[0][0]} Peanut Allergy: Mild")
+        self.assertTrue(rows[0]["vaccinations"].startswith("Rabies "))
+        self.assertEqual(rows[0]["added_by"], "staff@test.test")
+
+    def test_jsonl(self):
+        """Test the JSON lines export keeps the health card rows as lists."""
+
+        records = [json.loads(line) for line in self.get_export("jsonl").decode().splitlines()]
+
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[1]["slug"], "latka")
+        self.assertEqual(records[1]["allergies"][0]["name"], "Peanut Allergy")
+        self.assertEqual(records[1]["vaccinations"][0]["date"], timezone.now().date().isoformat())
+
+    def test_xlsx(self):
+        """Test the XLSX export is a workbook with a header and a row per animal."""
+
+        rows = list(load_workbook(BytesIO(self.get_export("xlsx")), read_only=True).active.values)
+
+        self.assertEqual(rows[0], FIELDS)
+        self.assertEqual([row[1] for row in rows[1:]], ["Burek", "Łatka", "Reksio"])
+
+    def test_chunks_are_prefetched(self):
+        """Test health cards are fetched per chunk and not per animal."""
+
+        with CaptureQueriesContext(connection) as context:
+            self.get_export("jsonl")
+        few = len(context)
+
+        for i in range(10):
+            create_animal(self.user, f"Azor {i}")
+        with CaptureQueriesContext(connection) as context:
+            self.get_export("jsonl")
+
+        self.assertEqual(len(context), few)
+
+    def test_staff_only(self):
+        """Test the export is not available to other users."""
+
+        self.user.is_staff = False
+        self.user.save()
+
+        response = self.client.get(reverse("api:animal-export", kwargs={"export_format": "csv"}))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_command(self):
+        """Test the management command writes the same export to a file."""
+
+        with tempfile.NamedTemporaryFile(suffix=".csv") as file:
+            call_command("export_animals", "--format", "csv", "--output", file.name, "--chunk-size", "2")
+            self.assertEqual(file.read(), self.get_export("csv"))
+
+
+class ImportRecordsCommandTest(TestCase):
+    """Test cases for manage.py import_records."""
+
+    def setUp(self):
+        """Set up a user and an existing temporary home."""
+
+        self.user = create_staff_user()
+        self.home = TemporaryHome.objects.create(
+            owner="Anna Nowak", phone_number="987654321", city="Kraków", street="Długa", building="1", zip_code="30001"
+        )
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_csv(self, name, rows):
+        path = f"{self.directory.name}/{name}.csv"
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=list(dict.fromkeys(key for row in rows for key in row)))
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+    def import_records(self, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command("import_records", *args, "--chunk-size", "2", stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import(self):
+        """Test records are validated, linked by natural keys and loaded."""
+
+        adopters = self.write_csv(
+            "adopters",
+            [
+                {"name": "Jan Kowalski", "phone_number": "123456789", "address": "Polna 1"},
+                {"name": "Jan Kowalski", "phone_number": "123456789", "address": "Polna 1"},
+                {"name": "Ewa", "phone_number": "123", "address": ""},
+            ],
+        )
+        home = {"phone_number": "987654321", "city": "Wieliczka", "street": "Krótka", "building": "2"}
+        homes = self.write_csv("homes", [{**home, "owner": "Anna Nowak", "zip_code": "32020"}])
+        animal = {"animal_type": "PIES", "gender": "SAMIEC", "birth_date": "2020-01-01"}
+        adopter = {"adopter_name": "Jan Kowalski", "adopter_phone_number": "123456789", "adopter_address": "Polna 1"}
+        home_phone = {"temporary_home_phone_number": "987654321"}
+        animals = self.write_csv(
+            "animals",
+            [
+                {**animal, "name": "Burek", **adopter},
+                {**animal, "name": "Burek", "temporary_home_owner": "Anna  Nowak", **home_phone},
+                {**animal, "name": "Łatka", "temporary_home_owner": "Nobody", **home_phone},
+                {**animal, "name": "Reksio", "birth_date": "yesterday"},
+            ],
+        )
+        visits = self.write_csv(
+            "visits",
+            [
+                {"animal": "burek", "doctor": "PIOTR", "date": "2021-05-01", "description": "Checkup"},
+                {"animal": "unknown", "doctor": "PIOTR", "date": "2021-05-01", "description": "Checkup"},
+            ],
+        )
+
+        stdout, stderr = self.import_records(
+            "--adopters",
+            adopters,
+            "--temporary-homes",
+            homes,
+            "--animals",
+            animals,
+            "--veterinary-visits",
+            visits,
+            "--added-by",
+            "staff@test.test",
+        )
+
+        self.assertEqual(Adopter.objects.count(), 1)
+        self.home.refresh_from_db()
+        self.assertEqual(self.home.city, "Wieliczka")
+        self.assertEqual(TemporaryHome.objects.count(), 1)
+        self.assertEqual(sorted(Animal.objects.values_list("slug", flat=True)), ["burek", "burek-2"])
+        burek = Animal.objects.get(slug="burek")
+        self.assertEqual(burek.adopted_by, Adopter.objects.get(name="Jan Kowalski"))
+        self.assertEqual(burek.added_by, self.user)
+        self.assertEqual(burek.healthcards.veterinaryvisits.get().description, "Checkup")
+        self.assertEqual(Animal.objects.get(slug="burek-2").temporary_home, self.home)
+
+        self.assertIn("animals: 4 rows, 2 loaded, 2 rejected", stdout)
+        self.assertIn("rows/s", stdout)
+        self.assertIn("Unknown temporary home.", stderr)
+        self.assertIn(f"{animals}:5:", stderr)
+        self.assertIn("Unknown animal.", stderr)
+
+    def test_nothing_to_import(self):
+        """Test the command requires a file."""
+
+        with self.assertRaises(CommandError):
+            self.import_records()
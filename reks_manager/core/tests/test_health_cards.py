@@ -0,0 +1,70 @@
+import json
+
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from ..models import ALLERGY_CATEGORY, Allergy, HealthCardAllergy
+from .utils import create_animal, create_staff_user
+
+
+class HealthCardUpdateTest(TestCase):
+    """Test cases for updating a health card through the API."""
+
+    def setUp(self):
+        """Set up a staff client, an animal and a catalogue of allergies."""
+
+        self.user = create_staff_user()
+        self.token = Token.objects.create(user=self.user)
+        self.client = Client(headers={"authorization": f"Token {self.token.key}"})
+        self.animal = create_animal(self.user)
+        self.allergies = Allergy.objects.bulk_create(
+            Allergy(category=ALLERGY_CATEGORY[0][0], name=f"Allergy {i}") for i in range(50)
+        )
+        self.url = reverse("api:healthcard-detail", kwargs={"animal": self.animal.pk})
+
+    def patch_allergies(self, allergies, description):
+        """Send the allergies to the API and return the number of queries."""
+
+        data = {"allergies": [{"allergy": allergy.pk, "description": description} for allergy in allergies]}
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(self.url, data=json.dumps(data), content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context)
+
+    def test_update_creates_and_updates_rows(self):
+        """Test existing rows are updated and missing ones are created."""
+
+        self.patch_allergies(self.allergies[:2], "First")
+        self.patch_allergies(self.allergies[1:3], "Second")
+
+        descriptions = dict(
+            HealthCardAllergy.objects.filter(health_card=self.animal.healthcards).values_list("allergy", "description")
+        )
+        self.assertEqual(
+            descriptions,
+            {self.allergies[0].pk: "First", self.allergies[1].pk: "Second", self.allergies[2].pk: "Second"},
+        )
+
+    def test_update_query_count_is_constant(self):
+        """Test the number of queries does not depend on the number of entries."""
+
+        self.assertEqual(
+            self.patch_allergies(self.allergies[:5], "Created"),
+            self.patch_allergies(self.allergies[5:], "Created"),
+        )
+        self.assertEqual(
+            self.patch_allergies(self.allergies[:5], "Updated"),
+            self.patch_allergies(self.allergies[5:], "Updated"),
+        )
+
+    def test_unknown_allergy_is_rejected(self):
+        """Test a missing allergy is reported as a validation error."""
+
+        data = {"allergies": [{"allergy": 0}, {"allergy": "abc"}]}
+        response = self.client.patch(self.url, data=json.dumps(data), content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.json()["allergies"]), 2)
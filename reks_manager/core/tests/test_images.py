@@ -0,0 +1,97 @@
+from io import BytesIO, StringIO
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from ..models import Animal
+from .utils import create_animal, create_staff_user
+
+
+@override_settings(
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    },
+    MEDIA_URL="/media/",
+)
+class ImageVariantsTest(TestCase):
+    """Test cases for the animal photo variants."""
+
+    def setUp(self):
+        """Set up an adoptable animal with a photo carrying EXIF data."""
+
+        exif = Image.Exif()
+        exif[0x010F] = "Phone maker"
+        buffer = BytesIO()
+        Image.new("RGB", (2000, 1000), "red").save(buffer, format="JPEG", exif=exif)
+
+        user = create_staff_user()
+        self.animal = create_animal(
+            user,
+            status="DO_ADOPCJI",
+            image=SimpleUploadedFile("burek.jpg", buffer.getvalue(), content_type="image/jpeg"),
+        )
+
+    def test_variants_are_generated_by_the_command(self):
+        """Test resized, EXIF-stripped JPEG and WebP variants are stored next to the photo."""
+
+        self.assertIsNone(self.animal.get_image_srcset())
+
+        call_command("generate_image_variants", "--once", stdout=StringIO())
+
+        self.animal.refresh_from_db()
+        for key, image_format in [("jpeg", "JPEG"), ("webp", "WEBP")]:
+            variants = self.animal.image_variants[key]
+            self.assertEqual([variant["width"] for variant in variants], [320, 640, 1024, 1600])
+            self.assertEqual(variants[0]["height"], 160)
+            with self.animal.image.storage.open(variants[-1]["name"]) as file:
+                image = Image.open(file)
+                self.assertEqual(image.format, image_format)
+                self.assertEqual(image.size, (1600, 800))
+                self.assertEqual(len(image.getexif()), 0)
+                if image_format == "JPEG":
+                    self.assertTrue(image.info.get("progressive"))
+
+    def test_srcset_in_public_api(self):
+        """Test the public serializer exposes srcset values for both formats."""
+
+        self.animal.generate_image_variants()
+
+        response = self.client.get(reverse("api:public-animal-detail", kwargs={"slug": self.animal.slug}))
+        srcset = response.json()["image_srcset"]
+        self.assertRegex(srcset["webp"], r"^/media/animals/variants/burek.*-320w\.webp 320w, ")
+        self.assertIn("1600w.jpg 1600w", srcset["jpeg"])
+        self.assertTrue(srcset["src"].endswith("-1600w.jpg"))
+
+    def get_variant_names(self, variants):
+        return [variant["name"] for key in ("jpeg", "webp") for variant in variants[key]]
+
+    def test_new_photo_clears_variants(self):
+        """Test replacing the photo drops the variants of the previous one and deletes their files."""
+
+        # Generated by the command, after the instance was loaded.
+        Animal.objects.get(pk=self.animal.pk).generate_image_variants()
+        names = self.get_variant_names(Animal.objects.get(pk=self.animal.pk).image_variants)
+        self.assertTrue(all(default_storage.exists(name) for name in names))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.animal.image = SimpleUploadedFile("other.jpg", self.animal.image.read(), content_type="image/jpeg")
+            self.animal.save()
+
+        self.animal.refresh_from_db()
+        self.assertEqual(self.animal.image_variants, {})
+        self.assertEqual(Animal.objects.filter(image_variants={}).count(), 1)
+        self.assertFalse([name for name in names if default_storage.exists(name)])
+
+    def test_deleted_animal_deletes_variants(self):
+        """Test deleting an animal deletes the files of its variants."""
+
+        self.animal.generate_image_variants()
+        names = self.get_variant_names(self.animal.image_variants)
+        with self.captureOnCommitCallbacks(execute=True):
+            Animal.objects.filter(pk=self.animal.pk).delete()
+
+        self.assertFalse([name for name in names if default_storage.exists(name)])
@@ -0,0 +1,90 @@
+import json
+from base64 import urlsafe_b64encode
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from ..models import Animal
+from ..pagination import KeysetPagination
+from .utils import create_animal, create_staff_user
+
+
+class KeysetPaginationTest(TestCase):
+    """Test cases for the keyset pagination of the public animal list."""
+
+    def setUp(self):
+        """Set up adoptable animals sharing names and creation time."""
+
+        self.user = create_staff_user()
+        for name in ["Azor", "Azor", "Burek", "Burek", "Burek", "Reks", "Szarik"]:
+            create_animal(self.user, name, status="DO_ADOPCJI")
+        Animal.objects.update(created_at=timezone.now())
+        self.url = reverse("api:public-animals-list")
+
+    def walk_pages(self, url):
+        """Follow the next links and return the slugs of every page."""
+
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([animal["slug"] for animal in response.json()["results"]])
+            url = response.json()["next"]
+        return pages
+
+    def test_pages_cover_every_animal_once(self):
+        """Test rows with equal ordering values are neither skipped nor repeated."""
+
+        for ordering in ["", "name", "-name"]:
+            pages = self.walk_pages(f"{self.url}?page_size=2&ordering={ordering}")
+            slugs = [slug for page in pages for slug in page]
+            self.assertEqual(len(pages), 4)
+            self.assertCountEqual(slugs, Animal.objects.values_list("slug", flat=True))
+
+    def test_previous_link_returns_previous_page(self):
+        """Test the previous link of the second page points to the first page."""
+
+        first = self.client.get(f"{self.url}?page_size=3&ordering=name")
+        second = self.client.get(first.json()["next"])
+        previous = self.client.get(second.json()["previous"])
+
+        self.assertEqual(previous.json()["results"], first.json()["results"])
+        self.assertIsNone(first.json()["previous"])
+
+    def test_page_size_is_capped(self):
+        """Test the requested page size cannot exceed the maximum."""
+
+        with mock.patch.object(KeysetPagination, "max_page_size", 3):
+            response = self.client.get(f"{self.url}?page_size=50")
+        self.assertEqual(len(response.json()["results"]), 3)
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is rejected."""
+
+        response = self.client.get(f"{self.url}?cursor=invalid")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_values_must_match_ordering(self):
+        """Test positions which are not valid values of the ordering fields are rejected."""
+
+        for position in [["x", "y"], [None, "p_1"], [{"a": 1}, "p_1"]]:
+            cursor = urlsafe_b64encode(json.dumps({"p": position}).encode()).decode()
+            with self.subTest(position):
+                response = self.client.get(f"{self.url}?cursor={cursor}")
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_empty_page_keeps_cursor(self):
+        """Test the links of a page past the last row point back to its position."""
+
+        created_at, pk = Animal.objects.order_by("created_at", "pk").values_list("created_at", "pk")[0]
+        position = [created_at.isoformat(), pk]
+        cursor = urlsafe_b64encode(json.dumps({"p": position}).encode()).decode()
+
+        response = self.client.get(f"{self.url}?cursor={cursor}")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"], [])
+        self.assertIsNotNone(response.json()["previous"])
@@ -0,0 +1,150 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from reks_manager.utils.instrumentation import QueryBudgetExceeded, registry
+
+from ..models import ALLERGY_CATEGORY, Allergy, Animal, Vaccination, VeterinaryVisit
+from ..pagination import KeysetPagination
+from ..views import AnimalsPublicViewSet
+from .utils import create_animal, create_animals, create_staff_user, fill_health_card
+
+
+class AnimalsViewSetQueryCountTest(TestCase):
+    """Test that listing animals does not issue queries per row."""
+
+    def setUp(self):
+        """Set up a staff user and the shared health card entries."""
+
+        self.user = create_staff_user()
+        self.token = Token.objects.create(user=self.user)
+        self.client = Client(headers={"authorization": f"Token {self.token.key}"})
+
+        self.allergy = Allergy.objects.create(category=ALLERGY_CATEGORY[0][0], name="Peanut Allergy")
+        self.vaccination = Vaccination.objects.create(name="Rabies")
+
+    def create_animals(self, count):
+        """Create animals with filled health cards."""
+
+        offset = Animal.objects.count()
+        for animal in create_animals(self.user, [f"Burek {offset + i}" for i in range(count)]):
+            health_card = fill_health_card(animal, [self.allergy], [self.vaccination])
+            VeterinaryVisit.objects.create(
+                health_card=health_card, doctor="PIOTR", date=timezone.now().date(), description="Checkup"
+            )
+
+    def count_list_queries(self):
+        """Return the number of queries issued by the animal list endpoint."""
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("api:animal-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context)
+
+    def test_list_query_count_is_constant(self):
+        """Test the number of queries does not depend on the number of animals."""
+
+        self.create_animals(2)
+        queries_for_few = self.count_list_queries()
+
+        self.create_animals(10)
+        queries_for_many = self.count_list_queries()
+
+        self.assertEqual(queries_for_few, queries_for_many)
+
+
+class ExplainApiQuerysetsCommandTest(TestCase):
+    """Test cases for the explain_api_querysets management command."""
+
+    def setUp(self):
+        """Set up an adoptable animal to look up."""
+
+        create_animal(create_staff_user(), status="DO_ADOPCJI")
+
+    def test_reports_every_registered_viewset(self):
+        """Test each routed action is explained and the animal listings use an index."""
+
+        out = StringIO()
+        call_command("explain_api_querysets", "--orderings", stdout=out)
+        output = out.getvalue()
+
+        for label in ["public-animals-list", "public-animal-detail", "animal-list", "healthcard-list", "post-list"]:
+            self.assertIn(label, output)
+        self.assertNotIn("public-animal-list", output)
+        self.assertIn("public-animals-list: OK", output)
+        self.assertIn("animal-list ?ordering=name: OK", output)
+
+    def test_without_page_size(self):
+        """Test a paginator without a page size explains a page of the default size."""
+
+        out = StringIO()
+        with mock.patch.object(KeysetPagination, "page_size", None), override_settings(
+            REST_FRAMEWORK={"PAGE_SIZE": None}
+        ):
+            call_command("explain_api_querysets", stdout=out)
+
+        self.assertIn("public-animals-list: OK", out.getvalue())
+
+
+class InstrumentationTest(TestCase):
+    """Test cases for the query metrics middleware and endpoint."""
+
+    def setUp(self):
+        """Set up an adoptable animal and empty metrics."""
+
+        registry.clear()
+        create_animal(create_staff_user(), status="DO_ADOPCJI")
+        self.url = reverse("api:public-animals-list")
+
+    @override_settings(METRICS_RESPONSE_HEADERS=True)
+    def test_response_headers(self):
+        """Test the query count and timings are sent as headers."""
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertEqual(int(response["X-SQL-Count"]), len(queries))
+        self.assertRegex(response["Server-Timing"], r"^sql;dur=[\d.]+, serializer;dur=[\d.]+, total;dur=[\d.]+$")
+
+    def test_metrics_per_basename_and_action(self):
+        """Test requests are aggregated per router basename and action."""
+
+        self.client.get(self.url)
+        self.client.get(self.url)
+
+        series = registry.series[("public-animals", "list")]
+        self.assertEqual(series["requests"], 2)
+        self.assertGreater(series["sql_queries"], 0)
+        self.assertGreater(series["serializer_seconds"], 0)
+        self.assertNotIn("X-SQL-Count", self.client.get(self.url))
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_endpoint(self):
+        """Test the Prometheus endpoint requires the token."""
+
+        self.client.get(self.url)
+
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('reks_api_requests_total{view="public-animals",action="list"} 1', response.content.decode())
+        self.assertIn(
+            'reks_api_request_seconds_bucket{view="public-animals",action="list",le="+Inf"} 1',
+            response.content.decode(),
+        )
+
+    @override_settings(DEBUG_PROPAGATE_EXCEPTIONS=True)
+    def test_query_budget(self):
+        """Test exceeding the query budget of a view fails the request."""
+
+        with mock.patch.object(AnimalsPublicViewSet, "query_budgets", {"list": 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(self.url)
@@ -0,0 +1,58 @@
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+from uuid import UUID
+
+from django.test import TestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from reks_manager.utils.parsers import ORJSONParser
+from reks_manager.utils.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTest(TestCase):
+    """Test cases for the orjson renderer and parser."""
+
+    def setUp(self):
+        """Set up data with every type the renderer has to handle."""
+
+        self.data = {
+            "created_at": datetime(2023, 5, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            "birth_date": date(2020, 1, 1),
+            "weight": Decimal("12.50"),
+            "id": UUID("12345678-1234-5678-1234-567812345678"),
+            "status": gettext_lazy("Adopted"),
+            "description": "Łapa\u2028Reks",
+            "by_month": {2023: [1, 2.5, None, True]},
+        }
+
+    def test_renders_like_json_renderer(self):
+        """Test the output is byte for byte the one of the default renderer."""
+
+        self.assertEqual(ORJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_falls_back_to_json_renderer(self):
+        """Test indented output and a missing orjson use the default renderer."""
+
+        renderer = ORJSONRenderer()
+        indented = renderer.render(self.data, "application/json; indent=4")
+        self.assertEqual(indented, JSONRenderer().render(self.data, "application/json; indent=4"))
+        with mock.patch("reks_manager.utils.renderers.orjson", None):
+            self.assertEqual(renderer.render(self.data), JSONRenderer().render(self.data))
+
+    def test_parses_json(self):
+        """Test valid documents are parsed and invalid ones raise a parse error."""
+
+        rendered = ORJSONRenderer().render(self.data)
+        parsed = ORJSONParser().parse(BytesIO(rendered))
+
+        self.assertEqual(parsed["description"], self.data["description"])
+        self.assertEqual(parsed["created_at"], "2023-05-01T12:30:15.123456Z")
+        for document in (b"{", b'{"weight": NaN}', "{}".encode("utf-16")):
+            with self.subTest(document), self.assertRaises(ParseError):
+                ORJSONParser().parse(BytesIO(document))
@@ -0,0 +1,71 @@
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+
+from .utils import create_animal, create_staff_user
+
+
+class AnimalSearchTestCase(TestCase):
+    """Adoptable animals and a helper returning the names found by a search."""
+
+    def setUp(self):
+        """Set up adoptable animals with names, breeds and descriptions to search."""
+
+        user = create_staff_user()
+        animals = {
+            "Azor": {"description": "Brat psa Burek, lubi dzieci, nie lubi kotów"},
+            "Burek": {"breed": "Kundel", "description": "Lubi dzieci"},
+            "Szarik": {"breed": "Owczarek"},
+            "Żółw": {"animal_type": "KOT"},
+        }
+        for name, fields in animals.items():
+            create_animal(user, name, status="DO_ADOPCJI", **fields)
+        self.url = reverse("api:public-animals-list")
+
+    def search(self, terms, **params):
+        response = self.client.get(self.url, {"search": terms, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [animal["name"] for animal in response.json()["results"]]
+
+
+@skipUnless(connection.vendor == "postgresql", "Full-text search needs PostgreSQL.")
+class AnimalSearchFilterTest(AnimalSearchTestCase):
+    """Test cases for the full-text and trigram animal search."""
+
+    def test_websearch_syntax(self):
+        """Test quoted phrases, OR and excluded words of the websearch syntax."""
+
+        self.assertCountEqual(self.search('"lubi dzieci"'), ["Azor", "Burek"])
+        self.assertEqual(self.search("lubi -kotów"), ["Burek"])
+        self.assertCountEqual(self.search("kundel or owczarek"), ["Burek", "Szarik"])
+
+    def test_diacritics_are_folded(self):
+        """Test searching without Polish letters finds names and words written with them."""
+
+        self.assertEqual(self.search("zolw"), ["Żółw"])
+        self.assertEqual(self.search("kotow"), ["Azor"])
+
+    def test_typo_matches_name(self):
+        """Test a misspelled name is found by the trigram similarity."""
+
+        self.assertEqual(self.search("Szarek"), ["Szarik"])
+
+    def test_results_are_ranked(self):
+        """Test a name match ranks above a description match unless an ordering is requested."""
+
+        self.assertEqual(self.search("Burek"), ["Burek", "Azor"])
+        self.assertEqual(self.search("Burek", ordering="name"), ["Azor", "Burek"])
+
+
+class AnimalSearchFallbackTest(AnimalSearchTestCase):
+    """Test cases for the search on databases other than PostgreSQL."""
+
+    def test_icontains_search(self):
+        """Test the search matches parts of the search fields and ignores the other columns."""
+
+        with mock.patch.object(connection, "vendor", "sqlite"):
+            self.assertEqual(self.search("ure"), ["Burek"])
+            self.assertEqual(self.search("kundel"), [])
@@ -0,0 +1,134 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from ..models import Adopter, Animal, StatisticCounter
+from ..statistics import get_summary
+from .utils import create_animal, create_staff_user
+
+
+class StatisticsTest(TestCase):
+    """Test cases for the shelter statistics summary."""
+
+    def setUp(self):
+        """Seed animals of every status, type and residence, one adopted after ten days."""
+
+        self.user = create_staff_user()
+        self.token = Token.objects.create(user=self.user)
+        self.client = Client(headers={"authorization": f"Token {self.token.key}"})
+        self.today = timezone.localdate()
+
+        self.create_animal("PIES", "DO_ADOPCJI")
+        self.create_animal("PIES", "DO_ADOPCJI", residence="TYMCZASOWY_DOM")
+        self.create_animal("KOT", "KWARANTANNA")
+        cat = self.create_animal("KOT", "KWARANTANNA")
+        cat.status = "DO_ADOPCJI"
+        cat.save()
+        self.create_animal("KOT", "NIE_DO_ADOPCJI").delete()
+        adopter = Adopter.objects.create(name="Jan Kowalski", phone_number="123456789")
+        self.create_animal("PIES", "NIE_DO_ADOPCJI", date_when_found=self.today - timedelta(days=10))
+        Animal.objects.get(status="NIE_DO_ADOPCJI").adopt(adopter)
+
+    def create_animal(self, animal_type, status, **kwargs):
+        birth_date = self.today - timedelta(days=400)
+        return create_animal(self.user, animal_type=animal_type, birth_date=birth_date, status=status, **kwargs)
+
+    def get_counters(self):
+        return set(StatisticCounter.objects.filter(count__gt=0).values_list("dimension", "key", "count", "total"))
+
+    def test_summary(self):
+        """Test the incrementally maintained counters match the seeded animals."""
+
+        summary = get_summary()
+
+        self.assertEqual(summary["total"], 5)
+        self.assertEqual(
+            summary["by_status"], {"DO_ADOPCJI": 3, "ZAADOPTOWANY": 1, "KWARANTANNA": 1, "NIE_DO_ADOPCJI": 0}
+        )
+        self.assertEqual(summary["by_animal_type"], {"PIES": 3, "KOT": 2})
+        self.assertEqual(summary["by_residence"], {"SCHRONISKO": 4, "TYMCZASOWY_DOM": 1})
+        self.assertEqual(summary["average_days_to_adoption"], 10)
+        self.assertEqual(
+            summary["months"],
+            [
+                {
+                    "month": f"{self.today:%Y-%m}",
+                    "intake": 5,
+                    "adoptions": 1,
+                    "adoption_rate": 0.2,
+                    "average_days_to_adoption": 10,
+                }
+            ],
+        )
+
+    def test_rebuild_matches_incremental_counters(self):
+        """Test the full rebuild yields the counters maintained by the signals."""
+
+        counters = self.get_counters()
+        StatisticCounter.objects.all().delete()
+
+        call_command("rebuild_statistics", stdout=StringIO())
+
+        self.assertEqual(self.get_counters(), counters)
+
+    def test_deleted_adopted_animal_is_rebuilt_alike(self):
+        """Test deleting an adopted animal takes its adoption back, as the rebuild does."""
+
+        Animal.objects.get(status="ZAADOPTOWANY").delete()
+        counters = self.get_counters()
+        StatisticCounter.objects.all().delete()
+
+        call_command("rebuild_statistics", stdout=StringIO())
+
+        self.assertEqual(self.get_counters(), counters)
+        self.assertEqual(get_summary()["adoptions"], 0)
+
+    def test_rollback_reverts_counters(self):
+        """Test the counters move in the transaction of the change."""
+
+        counters = self.get_counters()
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.create_animal("KOT", "DO_ADOPCJI")
+            raise RuntimeError
+
+        self.assertEqual(self.get_counters(), counters)
+
+    def test_bulk_created_animals_are_counted(self):
+        """Test animals created by the bulk endpoint are counted although no signals are sent."""
+
+        item = {"name": "Azor", "animal_type": "KOT", "gender": "SAMIEC", "birth_date": "2020-01-01"}
+        response = self.client.post(reverse("api:animal-bulk-create"), [item, item], content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(get_summary()["by_animal_type"], {"PIES": 3, "KOT": 4})
+
+    def test_endpoint(self):
+        """Test the endpoint is staff only and its queries do not depend on the number of animals."""
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(reverse("api:statistics-list"))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(context), response.json()
+
+        few, summary = count_queries()
+        self.assertEqual(summary, json.loads(json.dumps(get_summary())))
+        for _i in range(5):
+            self.create_animal("PIES", "DO_ADOPCJI")
+        many, summary = count_queries()
+        self.assertEqual(few, many)
+        self.assertEqual(summary["total"], 10)
+
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse("api:statistics-list")).status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,57 @@
+import json
+from unittest import mock
+
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from ..models import ALLERGY_CATEGORY, Allergy, HealthCardAllergy
+from ..serializers import HealthCardWriteSerializer
+from .utils import create_animal, create_staff_user
+
+
+@override_settings(
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    }
+)
+class TransactionPolicyTest(TestCase):
+    """Test cases for the transactions opened by the API views."""
+
+    def setUp(self):
+        """Set up a staff client, an adoptable animal and an allergy."""
+
+        self.user = create_staff_user()
+        self.client.force_login(self.user)
+        self.animal = create_animal(self.user, status="DO_ADOPCJI")
+        self.allergy = Allergy.objects.create(category=ALLERGY_CATEGORY[0][0], name="Orzechy")
+
+    def test_reads_run_in_autocommit(self):
+        """Test read-only requests open no transaction, a savepoint within the test case."""
+
+        for url in (
+            reverse("api:public-animals-list"),
+            reverse("api:animal-list"),
+            reverse("api:healthcard-detail", kwargs={"animal": self.animal.pk}),
+        ):
+            with self.subTest(url), CaptureQueriesContext(connection) as context:
+                self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+            self.assertFalse([query for query in context.captured_queries if "SAVEPOINT" in query["sql"]])
+
+    def test_write_is_rolled_back_as_a_whole(self):
+        """Test rows written before a failing statement of the same update are rolled back."""
+
+        data = {
+            "allergies": [{"allergy": self.allergy.pk, "description": "Rash"}],
+            "veterinaryvisits": [{"doctor": "PIOTR", "date": "2023-01-01", "description": "Checkup"}],
+        }
+        url = reverse("api:healthcard-detail", kwargs={"animal": self.animal.pk})
+
+        with mock.patch.object(HealthCardWriteSerializer, "save_veterinary_visits", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.client.patch(url, data=json.dumps(data), content_type="application/json")
+
+        self.assertFalse(HealthCardAllergy.objects.exists())
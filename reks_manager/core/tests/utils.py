@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from ..models import Animal, HealthCardAllergy, HealthCardVaccination
+
+User = get_user_model()
+
+
+def create_staff_user(email="staff@test.test"):
+    """Create a staff user with the password used across the tests."""
+
+    return User.objects.create_user(email=email, password="testpassword", is_staff=True)
+
+
+def create_animal(added_by, name="Burek", **kwargs):
+    """Create a dog found today, ``kwargs`` override or add fields."""
+
+    fields = {"animal_type": "PIES", "gender": "SAMIEC", "birth_date": timezone.now().date(), **kwargs}
+    return Animal.objects.create(name=name, added_by=added_by, **fields)
+
+
+def create_animals(added_by, names, **kwargs):
+    """Create an animal for each of ``names``."""
+
+    return [create_animal(added_by, name, **kwargs) for name in names]
+
+
+def fill_health_card(animal, allergies=(), vaccinations=(), **allergy_fields):
+    """Add ``allergies`` and ``vaccinations`` (given today) to the health card of ``animal``."""
+
+    for allergy in allergies:
+        HealthCardAllergy.objects.create(health_card=animal.healthcards, allergy=allergy, **allergy_fields)
+    for vaccination in vaccinations:
+        HealthCardVaccination.objects.create(
+            health_card=animal.healthcards, vaccination=vaccination, vaccination_date=timezone.now().date()
+        )
+    return animal.healthcards
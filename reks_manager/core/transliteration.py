@@ -0,0 +1,62 @@
+"""
+ASCII transliteration of Latin letters with diacritics, done by a single
+``str.translate`` call with a table built once at import.
+"""
+import unicodedata
+
+from django.utils.text import slugify as django_slugify
+
+# Letters without a decomposition into a base letter and a combining mark.
+SPECIAL_LETTERS = {
+    "ł": "l",
+    "Ł": "L",
+    "ß": "ss",
+    "ẞ": "SS",
+    "æ": "ae",
+    "Æ": "AE",
+    "œ": "oe",
+    "Œ": "OE",
+    "ø": "o",
+    "Ø": "O",
+    "đ": "d",
+    "Đ": "D",
+    "ð": "d",
+    "Ð": "D",
+    "þ": "th",
+    "Þ": "TH",
+    "ħ": "h",
+    "Ħ": "H",
+    "ı": "i",
+    "ŀ": "l",
+    "Ŀ": "L",
+    "ŋ": "ng",
+    "Ŋ": "NG",
+    "ſ": "s",
+}
+# Latin-1 Supplement, Latin Extended-A and -B, Latin Extended Additional.
+LATIN_RANGES = (range(0x00C0, 0x0250), range(0x1E00, 0x1F00))
+
+
+def _build_table():
+    table = {}
+    for code in (code for latin_range in LATIN_RANGES for code in latin_range):
+        ascii_value = unicodedata.normalize("NFKD", chr(code)).encode("ascii", "ignore").decode("ascii")
+        if ascii_value:
+            table[code] = ascii_value
+    table.update({ord(letter): ascii_value for letter, ascii_value in SPECIAL_LETTERS.items()})
+    return table
+
+
+TRANSLITERATION_TABLE = _build_table()
+
+
+def transliterate(value):
+    """``value`` with the Latin letters with diacritics replaced by ASCII, e.g. ``Żółw`` -> ``Zolw``."""
+
+    return value.translate(TRANSLITERATION_TABLE)
+
+
+def slugify(value):
+    """Django's ``slugify`` of the transliterated ``value``, which would drop letters like ``ł``."""
+
+    return django_slugify(transliterate(value))
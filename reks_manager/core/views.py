@@ -1,13 +1,46 @@
+from django.db import router
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView
-from rest_framework import filters
+from rest_framework import filters, status
+from rest_framework.decorators import action
 from rest_framework.mixins import ListModelMixin, RetrieveModelMixin, UpdateModelMixin
 from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
-from .models import Adopter, Allergy, Animal, HealthCard, Medication, TemporaryHome, Vaccination, VeterinaryVisit
+from reks_manager.utils.instrumentation import InstrumentedViewMixin
+from reks_manager.utils.replicas import ReplicaReadsMixin, replica_reads
+from reks_manager.utils.transactions import AtomicWritesMixin
+
+from . import exports, statistics
+from .cache import PUBLIC_ANIMALS_NAMESPACE
+from .filters import AnimalSearchFilter
+from .mixins import (
+    CachedListMixin,
+    CachedRetrieveMixin,
+    ConditionalGetMixin,
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    OptimizedQuerySetMixin,
+)
+from .models import (
+    PUBLIC_STATUS,
+    Adopter,
+    Allergy,
+    Animal,
+    HealthCard,
+    Medication,
+    StatisticCounter,
+    TemporaryHome,
+    Vaccination,
+    VeterinaryVisit,
+)
 from .serializers import (
     AdopterSerializer,
     AllergiesSerializer,
+    AnimalBulkCreateSerializer,
     AnimalPublicSerializer,
     AnimalReadSerializer,
     AnimalWriteSerializer,
@@ -20,19 +53,21 @@ from .serializers import (
 )
 
 
+@method_decorator(replica_reads, name="dispatch")
 class HomeTestView(ListView):
     template_name = "pages/home.html"
-    queryset = Animal.objects.filter(status="DO_ADOPCJI")
+    queryset = Animal.objects.filter(status=PUBLIC_STATUS)
     context_object_name = "animals"
 
 
-class BaseAdminAbstractView(ModelViewSet):
+class BaseAdminAbstractView(InstrumentedViewMixin, AtomicWritesMixin, OptimizedQuerySetMixin, ModelViewSet):
     permission_classes = [
         IsAdminUser,
     ]
     filter_backends = [filters.OrderingFilter, filters.SearchFilter]
     search_fields = ["id", "name"]
     ordering_fields = ["id", "name"]
+    query_budgets = {"list": 5, "retrieve": 5, "create": 5, "update": 6, "partial_update": 6}
 
 
 class AllergyView(BaseAdminAbstractView):
@@ -108,15 +143,44 @@ class AdopterView(BaseAdminAbstractView):
     ordering_fields = ["owner", "address"]
 
 
-class AnimalsViewSet(ModelViewSet):
+class AnimalsViewSet(
+    InstrumentedViewMixin,
+    AtomicWritesMixin,
+    ReplicaReadsMixin,
+    ConditionalGetMixin,
+    OptimizedQuerySetMixin,
+    ModelViewSet,
+):
     permission_classes = [
         IsAdminUser,
     ]
     queryset = Animal.objects.all()
-    filter_backends = [filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [filters.OrderingFilter, AnimalSearchFilter]
     search_fields = ["name", "slug", "animal_type", "status"]
     ordering_fields = ["name", "animal_type", "status", "birth_date"]
     lookup_field = "slug"
+    last_modified_fields = (
+        "updated_at",
+        "adopted_by__updated_at",
+        "temporary_home__updated_at",
+        "healthcards__updated_at",
+        "healthcards__healthcardallergies__updated_at",
+        "healthcards__healthcardmedications__updated_at",
+        "healthcards__healthcardvaccinations__updated_at",
+        "healthcards__veterinaryvisits__updated_at",
+    )
+    query_budgets = {
+        "list": 14,
+        "retrieve": 14,
+        "create": 10,
+        "update": 14,
+        "partial_update": 14,
+        "bulk_create": 15,
+        # Only the queries run before streaming starts are counted.
+        "export": 5,
+    }
+    bulk_create_max_items = 500
+    replica_actions = ("export",)
 
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update"]:
@@ -124,13 +188,59 @@ class AnimalsViewSet(ModelViewSet):
         return AnimalReadSerializer
 
     def perform_create(self, serializer):
-        if self.request.user.is_authenticated:
-            serializer.save(added_by=self.request.user)
+        with self.atomic():
+            if self.request.user.is_authenticated:
+                serializer.save(added_by=self.request.user)
+            else:
+                serializer.save()
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_create(self, request, *args, **kwargs):
+        """
+        Create up to ``bulk_create_max_items`` animals from a list of AnimalWriteSerializer
+        items. Invalid items do not stop the others, the response lists the ``id``
+        and ``slug`` or the ``errors`` of every item by its ``index``:
+        201 when all were created, 400 when none was and 207 otherwise.
+        """
+        serializer = AnimalBulkCreateSerializer(
+            data=request.data, max_length=self.bulk_create_max_items, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+
+        if not serializer.row_errors:
+            response_status: int = status.HTTP_201_CREATED
+        elif not serializer.row_indexes:
+            response_status = status.HTTP_400_BAD_REQUEST
         else:
-            serializer.save()
-
-
-class HealthCardView(ListModelMixin, RetrieveModelMixin, UpdateModelMixin, GenericViewSet):
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response({"results": serializer.get_results()}, status=response_status)
+
+    @action(detail=False, methods=["get"], url_path=f"export/(?P<export_format>{'|'.join(exports.EXPORT_FORMATS)})")
+    def export(self, request, export_format, *args, **kwargs):
+        """
+        Stream every animal with the contents of its health card as ``csv``,
+        ``jsonl`` or ``xlsx``, see reks_manager.core.exports.
+        """
+        content_type = exports.EXPORT_FORMATS[export_format][1]
+        # Rows are read while streaming, after the request routing state is gone.
+        queryset = exports.get_queryset().using(router.db_for_read(Animal))
+        response = StreamingHttpResponse(exports.export(export_format, queryset), content_type=content_type)
+        filename = f"animals-{timezone.localdate():%Y%m%d}.{export_format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class HealthCardView(
+    InstrumentedViewMixin,
+    AtomicWritesMixin,
+    ConditionalGetMixin,
+    OptimizedQuerySetMixin,
+    RetrieveModelMixin,
+    ListModelMixin,
+    UpdateModelMixin,
+    GenericViewSet,
+):
     """
     HealthCard CRUD, accepts allergies, vaccinations, medications and veterinaryvisits
 
@@ -139,6 +249,14 @@ class HealthCardView(ListModelMixin, RetrieveModelMixin, UpdateModelMixin, Gener
 
     queryset = HealthCard.objects.all()
     lookup_field = "animal"
+    last_modified_fields = (
+        "updated_at",
+        "healthcardallergies__updated_at",
+        "healthcardmedications__updated_at",
+        "healthcardvaccinations__updated_at",
+        "veterinaryvisits__updated_at",
+    )
+    query_budgets = {"list": 14, "retrieve": 14, "update": 19, "partial_update": 19}
 
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update"]:
@@ -146,12 +264,37 @@ class HealthCardView(ListModelMixin, RetrieveModelMixin, UpdateModelMixin, Gener
         return HealthCardReadSerializer
 
 
+class StatisticsViewSet(InstrumentedViewMixin, ReplicaReadsMixin, GenericViewSet):
+    """
+    Shelter statistics: animals per status / type / residence, intake and
+    adoptions per month and the average days to adoption. Read from the
+    summary table maintained by reks_manager.core.statistics.
+    """
+
+    permission_classes = [
+        IsAdminUser,
+    ]
+    queryset = StatisticCounter.objects.all()
+    query_budgets = {"list": 5}
+
+    def list(self, request, *args, **kwargs):
+        return Response(statistics.get_summary())
+
+
 #  ------------------------------------------------------------
 #  PUBLIC
 #  ------------------------------------------------------------
 
 
-class AnimalsPublicViewSet(ListModelMixin, GenericViewSet):
+class AnimalsPublicViewSet(
+    InstrumentedViewMixin,
+    ReplicaReadsMixin,
+    CachedListMixin,
+    ConditionalListMixin,
+    OptimizedQuerySetMixin,
+    ListModelMixin,
+    GenericViewSet,
+):
     """
     PUBLIC ANIMALS SET STATUS = DO_ADOPCJI
     """
@@ -161,13 +304,23 @@ class AnimalsPublicViewSet(ListModelMixin, GenericViewSet):
         AllowAny,
     ]
     serializer_class = AnimalPublicSerializer
-    queryset = Animal.objects.filter(status="DO_ADOPCJI")
-    filter_backends = [filters.OrderingFilter, filters.SearchFilter]
+    queryset = Animal.objects.filter(status=PUBLIC_STATUS)
+    cache_namespace = PUBLIC_ANIMALS_NAMESPACE
+    filter_backends = [filters.OrderingFilter, AnimalSearchFilter]
     search_fields = ["name", "slug", "animal_type", "status"]
     ordering_fields = ["name", "animal_type", "status", "birth_date"]
-
-
-class AnimalPublicView(RetrieveModelMixin, GenericViewSet):
+    query_budgets = {"list": 5, "retrieve": 5}
+
+
+class AnimalPublicView(
+    InstrumentedViewMixin,
+    ReplicaReadsMixin,
+    CachedRetrieveMixin,
+    ConditionalRetrieveMixin,
+    OptimizedQuerySetMixin,
+    RetrieveModelMixin,
+    GenericViewSet,
+):
     """
     PUBLIC ANIMAL DATA, STATUS = DO_ADOPCJI
     """
@@ -177,8 +330,10 @@ class AnimalPublicView(RetrieveModelMixin, GenericViewSet):
         AllowAny,
     ]
     serializer_class = AnimalPublicSerializer
-    queryset = Animal.objects.filter(status="DO_ADOPCJI")
-    filter_backends = [filters.OrderingFilter, filters.SearchFilter]
+    queryset = Animal.objects.filter(status=PUBLIC_STATUS)
+    cache_namespace = PUBLIC_ANIMALS_NAMESPACE
+    filter_backends = [filters.OrderingFilter, AnimalSearchFilter]
     search_fields = ["name", "slug", "animal_type", "status"]
     ordering_fields = ["name", "animal_type", "status", "birth_date"]
+    query_budgets = {"list": 5, "retrieve": 5}
     lookup_field = "slug"
@@ -6,9 +6,5 @@ class UsersConfig(AppConfig):
     name = "reks_manager.user_auth"
     verbose_name = _("User-Auth")
 
-    #
-    # def ready(self):
-    #     try:
-    #         import reks_manager.users.signals  # noqa: F401
-    #     except ImportError:
-    #         pass
+    def ready(self):
+        import reks_manager.user_auth.signals  # noqa: F401
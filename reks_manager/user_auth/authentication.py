@@ -0,0 +1,182 @@
+"""
+Token authentication resolving keys from a per-process LRU, then from the
+default cache (Redis in production), and only then with the ``Token`` +
+``User`` query. The caches hold the token creation time and the ``USER_FIELDS``
+checked by the API only, the other fields of the user are loaded together when
+one of them is read.
+
+Entries are dropped when the token is deleted (logout, rotation) or its user
+is saved (e.g. deactivated), see reks_manager.user_auth.signals.
+Other processes drop their local entry after
+``AUTH_TOKEN_LOCAL_CACHE_TIMEOUT`` seconds at the latest.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, router, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+# Fields of the user cached with its tokens, those checked by the API.
+USER_FIELDS = ("id", "is_active", "is_staff", "is_superuser")
+
+
+class LocalTTLCache:
+    """Thread-safe LRU of at most ``maxsize`` entries, each expiring ``timeout`` seconds after it was set."""
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LocalTTLCache(settings.AUTH_TOKEN_LOCAL_CACHE_SIZE, settings.AUTH_TOKEN_LOCAL_CACHE_TIMEOUT)
+
+
+def get_cache_key(key):
+    # Hashed, the cache must not hold usable tokens in its keys.
+    return f"auth-credentials:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def invalidate(key):
+    cache_key = get_cache_key(key)
+    local_cache.delete(cache_key)
+    cache.delete(cache_key)
+
+
+def invalidate_on_commit(keys):
+    """
+    Invalidate ``keys`` now and again once the transaction deleting or
+    changing them is committed, a request reading the old rows before the
+    commit could have cached them in between.
+    """
+    keys = list(keys)
+    for key in keys:
+        invalidate(key)
+    if keys:
+        transaction.on_commit(lambda: [invalidate(key) for key in keys])
+
+
+def get_token_expiry(token):
+    """Time ``token`` expires at, ``None`` with ``AUTH_TOKEN_TTL`` = 0."""
+
+    if not settings.AUTH_TOKEN_TTL:
+        return None
+    return token.created + timedelta(seconds=settings.AUTH_TOKEN_TTL)
+
+
+def is_expired(token):
+    expiry = get_token_expiry(token)
+    return expiry is not None and expiry <= timezone.now()
+
+
+def get_or_rotate_token(user):
+    """
+    Token of ``user``, a new one replacing it when it is older than
+    ``AUTH_TOKEN_ROTATE_AFTER`` seconds or expired.
+    """
+    token, created = Token.objects.get_or_create(user=user)
+    if created:
+        return token
+    age = (timezone.now() - token.created).total_seconds()
+    if is_expired(token) or age >= settings.AUTH_TOKEN_ROTATE_AFTER:
+        try:
+            with transaction.atomic():
+                token.delete()
+                token = Token.objects.create(user=user)
+        except IntegrityError:
+            # A concurrent sign in rotated the token first.
+            token = Token.objects.get(user=user)
+    return token
+
+
+def refresh_deferred_fields(user, using=None, fields=None):
+    """``refresh_from_db`` of ``user`` loading all its deferred fields when one of them is read."""
+
+    deferred_fields = user.get_deferred_fields()
+    if fields is not None and deferred_fields.issuperset(fields):
+        fields = list(deferred_fields)
+    type(user).refresh_from_db(user, using=using, fields=fields)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` with cached token lookups and token expiry."""
+
+    def authenticate_credentials(self, key):
+        cache_key = get_cache_key(key)
+        entry = local_cache.get(cache_key)
+        if entry is None:
+            entry = cache.get(cache_key)
+            if entry is None:
+                entry = self.load_credentials(key)
+                cache.set(cache_key, entry, settings.AUTH_TOKEN_CACHE_TIMEOUT)
+            local_cache.set(cache_key, entry)
+
+        user_values, created = entry
+        token = Token(key=key, user_id=user_values["id"], created=created)
+        token._state.adding = False
+        # Expired tokens are replaced at the next sign in, see get_or_rotate_token.
+        if is_expired(token):
+            raise exceptions.AuthenticationFailed(_("Token has expired."))
+        if not user_values["is_active"]:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        token.user = user = self.get_user(user_values)
+        return user, token
+
+    def get_user(self, user_values):
+        """User with the cached ``user_values``, its other fields are deferred."""
+
+        User = get_user_model()
+        field_names = [field.attname for field in User._meta.fields if field.attname in user_values]
+        user = User.from_db(router.db_for_read(User), field_names, [user_values[name] for name in field_names])
+        user.refresh_from_db = partial(refresh_deferred_fields, user)  # type: ignore[method-assign]
+        return user
+
+    def load_credentials(self, key):
+        try:
+            token = (
+                Token.objects.select_related("user")
+                .only("created", *(f"user__{name}" for name in USER_FIELDS))
+                .get(key=key)
+            )
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        return {name: getattr(token.user, name) for name in USER_FIELDS}, token.created
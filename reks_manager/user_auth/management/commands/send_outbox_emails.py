@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reks_manager.user_auth.models import OutboxEmail
+
+
+class Command(BaseCommand):
+    help = "Send the queued e-mails of the outbox, in batches, until stopped."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--interval", type=float, default=5, help="Seconds to wait when the outbox is empty.")
+        parser.add_argument("--once", action="store_true", help="Exit once there are no e-mails due.")
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                sent, failed = OutboxEmail.objects.due().send(batch_size=options["batch_size"])
+                if sent or failed:
+                    self.stdout.write(f"Sent {sent}, failed {failed}")
+                if sent + failed < options["batch_size"]:
+                    if options["once"]:
+                        break
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:48
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user_auth", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxEmail",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("subject", models.CharField(max_length=255, verbose_name="Subject")),
+                ("body", models.TextField(blank=True, verbose_name="Body")),
+                ("html_body", models.TextField(blank=True, verbose_name="HTML body")),
+                ("from_email", models.CharField(max_length=255, verbose_name="From")),
+                ("to", models.JSONField(default=list, verbose_name="To")),
+                ("headers", models.JSONField(blank=True, default=dict, verbose_name="Headers")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("PENDING", "Pending"), ("SENT", "Sent"), ("FAILED", "Failed")],
+                        default="PENDING",
+                        max_length=10,
+                        verbose_name="Status",
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0, verbose_name="Attempts")),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(default=django.utils.timezone.now, verbose_name="Next attempt at"),
+                ),
+                ("last_error", models.TextField(blank=True, verbose_name="Last error")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("sent_at", models.DateTimeField(blank=True, null=True, verbose_name="Sent at")),
+            ],
+            options={
+                "verbose_name": "Outbox e-mail",
+                "verbose_name_plural": "Outbox e-mails",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status", "PENDING")),
+                        fields=["next_attempt_at"],
+                        name="outboxemail_pending_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,11 +1,13 @@
 import binascii
 import os
+from datetime import timedelta
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.mail import EmailMultiAlternatives
-from django.db import models
+from django.core.mail import EmailMessage, EmailMultiAlternatives, get_connection
+from django.db import models, transaction
 from django.template.loader import render_to_string
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 EXPIRY_PERIOD = 3  # days
@@ -54,7 +56,7 @@ def send_multi_format_email(template_prefix, template_ctxt, target_email):
         [to],
     )
     msg.attach_alternative(html_content, "text/html")
-    msg.send()
+    OutboxEmail.objects.enqueue(msg)
 
 
 class SignupCode(models.Model):
@@ -74,3 +76,149 @@ class SignupCode(models.Model):
 
     def __str__(self):
         return self.code
+
+
+class OutboxEmailManager(models.Manager):
+    def enqueue(self, message):
+        """
+        Store ``message`` to be sent by the ``send_outbox_emails`` worker. The row
+        is written in the current transaction, so nothing is sent when it rolls
+        back. With ``EMAIL_OUTBOX_EAGER`` it is also sent right after commit.
+        """
+        html_body = ""
+        body = message.body
+        if message.content_subtype == "html":
+            html_body, body = body, ""
+        for content, mimetype in getattr(message, "alternatives", []):
+            if mimetype == "text/html":
+                html_body = content
+
+        email = self.create(
+            subject=message.subject,
+            body=body,
+            html_body=html_body,
+            from_email=message.from_email,
+            to=list(message.to),
+            headers=message.extra_headers,
+        )
+        if getattr(settings, "EMAIL_OUTBOX_EAGER", False):
+            transaction.on_commit(lambda: OutboxEmail.objects.using(self.db).filter(pk=email.pk).send())
+        return email
+
+    def due(self):
+        return self.filter(status=OutboxEmail.PENDING, next_attempt_at__lte=timezone.now())
+
+
+class OutboxEmailQuerySet(models.QuerySet):
+    def send(self, batch_size=100):
+        """
+        Send up to ``batch_size`` pending e-mails over a single backend connection.
+        Locked rows are skipped, so several workers can drain the outbox.
+        Returns the number of sent and failed e-mails.
+        """
+        sent = failed = 0
+        with transaction.atomic():
+            emails = list(
+                self.filter(status=OutboxEmail.PENDING)
+                .select_for_update(skip_locked=True)
+                .order_by("next_attempt_at")[:batch_size]
+            )
+            if not emails:
+                return sent, failed
+
+            now = timezone.now()
+            connection = get_connection(fail_silently=False)
+            try:
+                connection.open()
+            except Exception as e:
+                # E.g. the SMTP server is down, the batch is retried with backoff.
+                for email in emails:
+                    email.attempts += 1
+                    email.record_failure(e, now)
+                failed = len(emails)
+            else:
+                try:
+                    for email in emails:
+                        email.attempts += 1
+                        try:
+                            email.to_message(connection).send()
+                        except Exception as e:
+                            email.record_failure(e, now)
+                            failed += 1
+                        else:
+                            email.status = OutboxEmail.SENT
+                            email.sent_at = now
+                            sent += 1
+                finally:
+                    connection.close()
+            self.model.objects.bulk_update(
+                emails, ["status", "attempts", "last_error", "next_attempt_at", "sent_at"], batch_size=batch_size
+            )
+        return sent, failed
+
+
+class OutboxEmail(models.Model):
+    PENDING = "PENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+    STATUS_CHOICES = [
+        (PENDING, _("Pending")),
+        (SENT, _("Sent")),
+        (FAILED, _("Failed")),
+    ]
+    MAX_ATTEMPTS = 8
+    BACKOFF_BASE = timedelta(seconds=30)
+    BACKOFF_MAX = timedelta(hours=2)
+
+    subject = models.CharField(_("Subject"), max_length=255)
+    body = models.TextField(_("Body"), blank=True)
+    html_body = models.TextField(_("HTML body"), blank=True)
+    from_email = models.CharField(_("From"), max_length=255)
+    to = models.JSONField(_("To"), default=list)
+    headers = models.JSONField(_("Headers"), default=dict, blank=True)
+    status = models.CharField(_("Status"), max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(_("Attempts"), default=0)
+    next_attempt_at = models.DateTimeField(_("Next attempt at"), default=timezone.now)
+    last_error = models.TextField(_("Last error"), blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(_("Sent at"), null=True, blank=True)
+
+    objects = OutboxEmailManager.from_queryset(OutboxEmailQuerySet)()
+
+    class Meta:
+        verbose_name = _("Outbox e-mail")
+        verbose_name_plural = _("Outbox e-mails")
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"], condition=models.Q(status="PENDING"), name="outboxemail_pending_idx"
+            ),
+        ]
+
+    def get_backoff(self):
+        return min(self.BACKOFF_BASE * 2 ** (self.attempts - 1), self.BACKOFF_MAX)
+
+    def record_failure(self, error, now):
+        """Reschedule the e-mail after a failed attempt, or give up after ``MAX_ATTEMPTS``."""
+
+        self.last_error = repr(error)
+        if self.attempts >= self.MAX_ATTEMPTS:
+            self.status = self.FAILED
+        else:
+            self.next_attempt_at = now + self.get_backoff()
+
+    def to_message(self, connection=None):
+        if self.body or not self.html_body:
+            message = EmailMultiAlternatives(
+                self.subject, self.body, self.from_email, self.to, headers=self.headers, connection=connection
+            )
+            if self.html_body:
+                message.attach_alternative(self.html_body, "text/html")
+            return message
+        html_message = EmailMessage(
+            self.subject, self.html_body, self.from_email, self.to, headers=self.headers, connection=connection
+        )
+        html_message.content_subtype = "html"
+        return html_message
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)}"
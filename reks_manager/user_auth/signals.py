@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_on_commit
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_on_commit([instance.key])
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, update_fields, **kwargs):
+    """Drop the cached user of the tokens of a changed user, e.g. deactivated or no longer staff."""
+
+    # last_login is saved on every sign in and is not checked by the API.
+    if created or (update_fields is not None and set(update_fields) <= {"last_login"}):
+        return
+    invalidate_on_commit(Token.objects.filter(user_id=instance.pk).values_list("key", flat=True))
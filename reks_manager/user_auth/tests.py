@@ -0,0 +1,228 @@
+from datetime import timedelta
+from smtplib import SMTPException
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.sites.models import Site
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext as _
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from .authentication import USER_FIELDS, get_cache_key, get_or_rotate_token, local_cache
+from .models import OutboxEmail, SignupCode
+
+User = get_user_model()
+
+
+class OutboxEmailTest(TestCase):
+    """Test cases for the e-mail outbox and its worker."""
+
+    def setUp(self):
+        """Set up a user to send e-mails to."""
+
+        Site.objects.get_or_create(pk=1, defaults={"domain": "testserver", "name": "testserver"})
+        self.user = User.objects.create_user(email="user@test.test", password="testpassword")
+
+    def test_signup_email_is_queued(self):
+        """Test the signup e-mail is stored and only sent by the worker."""
+
+        SignupCode.objects.create_signup_code(self.user).send_signup_email()
+
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.to, ["user@test.test"])
+        self.assertNotEqual(email.html_body, "")
+
+        call_command("send_outbox_emails", "--once", stdout=mock.Mock())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("text/html", [part.get_content_type() for part in mail.outbox[0].message().walk()])
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.SENT)
+        self.assertEqual(email.attempts, 1)
+
+    def test_password_reset_email_is_queued(self):
+        """Test the password reset view does not send the e-mail itself."""
+
+        response = self.client.post(reverse("user_auth:password_reset"), {"email": "user@test.test"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.get().to, ["user@test.test"])
+
+    @override_settings(EMAIL_OUTBOX_EAGER=True)
+    def test_eager_sends_after_commit(self):
+        """Test EMAIL_OUTBOX_EAGER sends the e-mail once the transaction commits."""
+
+        with self.captureOnCommitCallbacks(execute=True):
+            SignupCode.objects.create_signup_code(self.user).send_signup_email()
+            self.assertEqual(len(mail.outbox), 0)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmail.SENT)
+
+    def test_failed_send_is_retried_with_backoff(self):
+        """Test failures are rescheduled with a growing delay and given up eventually."""
+
+        SignupCode.objects.create_signup_code(self.user).send_signup_email()
+        email = OutboxEmail.objects.get()
+
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=SMTPException):
+            self.assertEqual(OutboxEmail.objects.due().send(), (0, 1))
+            email.refresh_from_db()
+            self.assertEqual(email.status, OutboxEmail.PENDING)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+            self.assertIn("SMTPException", email.last_error)
+            self.assertFalse(OutboxEmail.objects.due().exists())
+
+            first_delay = email.get_backoff()
+            email.attempts += 1
+            self.assertEqual(email.get_backoff(), first_delay * 2)
+
+            OutboxEmail.objects.filter(pk=email.pk).update(attempts=OutboxEmail.MAX_ATTEMPTS - 1)
+            OutboxEmail.objects.all().send()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.FAILED)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_unavailable_backend_is_retried_with_backoff(self):
+        """Test a backend failing to open counts as an attempt for the whole batch."""
+
+        SignupCode.objects.create_signup_code(self.user).send_signup_email()
+        SignupCode.objects.create_signup_code(self.user).send_signup_email()
+
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.open", side_effect=ConnectionRefusedError):
+            call_command("send_outbox_emails", "--once", stdout=mock.Mock())
+
+        self.assertFalse(OutboxEmail.objects.due().exists())
+        for email in OutboxEmail.objects.all():
+            self.assertEqual(email.status, OutboxEmail.PENDING)
+            self.assertEqual(email.attempts, 1)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+            self.assertIn("ConnectionRefusedError", email.last_error)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class CachedTokenAuthenticationTest(TestCase):
+    """Test cases for the cached token authentication."""
+
+    def setUp(self):
+        """Set up a user with a token and enable the per-process cache."""
+
+        self.user = User.objects.create_user(email="staff@test.test", password="testpassword", is_staff=True)
+        self.token = Token.objects.create(user=self.user)
+        local_cache.clear()
+        patcher = mock.patch.object(local_cache, "timeout", 60)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(local_cache.clear)
+
+    def get_user(self, key=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse("user_auth:user"), headers={"authorization": f"Token {key or self.token.key}"}
+            )
+        return response, [query["sql"] for query in context.captured_queries]
+
+    def get_token_queries(self, queries):
+        return [sql for sql in queries if "authtoken_token" in sql]
+
+    def test_token_lookup_is_cached(self):
+        """Test only the first request queries the token, from either cache tier."""
+
+        response, queries = self.get_user()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(self.get_token_queries(queries)), 1)
+
+        response, queries = self.get_user()
+        self.assertEqual(response.json()["email"], "staff@test.test")
+        self.assertFalse(self.get_token_queries(queries))
+
+        # Another process, with an empty local cache, reads the shared cache.
+        local_cache.clear()
+        response, queries = self.get_user()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(self.get_token_queries(queries))
+
+    def test_cache_holds_no_password(self):
+        """Test only the fields checked by the API are cached, the others are read when needed."""
+
+        response, queries = self.get_user()
+        self.assertEqual(response.json()["email"], "staff@test.test")
+
+        user_values, created = cache.get(get_cache_key(self.token.key))
+        self.assertEqual(set(user_values), set(USER_FIELDS))
+        self.assertEqual(created, self.token.created)
+        self.assertNotIn("password", self.get_token_queries(queries)[0])
+
+        response, queries = self.get_user()
+        self.assertEqual(response.json()["email"], "staff@test.test")
+        self.assertEqual(len(queries), 1)
+
+    def test_logout_invalidates_token(self):
+        """Test a token deleted on logout is rejected right away."""
+
+        self.get_user()
+        response = self.client.post(reverse("user_auth:logout"), headers={"authorization": f"Token {self.token.key}"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.get_user()[0].json()["detail"], _("Invalid token."))
+
+    def test_deactivated_user_is_rejected(self):
+        """Test deactivating the user invalidates the cached lookup."""
+
+        self.get_user()
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        self.assertEqual(self.get_user()[0].json()["detail"], _("User inactive or deleted."))
+
+    def test_expired_token_is_rejected(self):
+        """Test a token older than AUTH_TOKEN_TTL is rejected."""
+
+        Token.objects.filter(pk=self.token.pk).update(created=timezone.now() - timedelta(days=30))
+
+        with self.settings(AUTH_TOKEN_TTL=60 * 60 * 24 * 14):
+            response, _queries = self.get_user()
+
+        self.assertEqual(response.json()["detail"], _("Token has expired."))
+
+    def test_obtain_token_rotates_old_token(self):
+        """Test /auth-token/ returns the current token, and a new one once it is old enough."""
+
+        credentials = {"username": "staff@test.test", "password": "testpassword"}
+
+        response = self.client.post("/auth-token/", credentials)
+        self.assertEqual(response.json()["token"], self.token.key)
+        self.assertIsNotNone(response.json()["expires_at"])
+
+        Token.objects.filter(pk=self.token.pk).update(created=timezone.now() - timedelta(days=2))
+        self.get_user()
+        response = self.client.post("/auth-token/", credentials)
+
+        new_key = response.json()["token"]
+        self.assertNotEqual(new_key, self.token.key)
+        self.assertEqual(self.get_user()[0].json()["detail"], _("Invalid token."))
+        self.assertEqual(self.get_user(new_key)[0].status_code, status.HTTP_200_OK)
+
+    def test_concurrent_rotation_returns_new_token(self):
+        """Test a sign in losing the race to rotate the token returns the token of the winner."""
+
+        Token.objects.filter(pk=self.token.pk).update(created=timezone.now() - timedelta(days=2))
+        old_token = Token.objects.get(pk=self.token.pk)
+        # The other sign in read the same old token and replaced it first.
+        Token.objects.filter(pk=old_token.pk).delete()
+        winner = Token.objects.create(user=self.user)
+
+        with mock.patch.object(Token.objects, "get_or_create", return_value=(old_token, False)):
+            self.assertEqual(get_or_rotate_token(self.user), winner)
@@ -2,6 +2,7 @@ from allauth.account.models import EmailAddress
 from django.contrib.auth import get_user_model
 from django.contrib.auth import logout as django_logout
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
 from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy as _
 from django.views.decorators.debug import sensitive_post_parameters
@@ -187,6 +188,7 @@ class RegistrationLinkView(APIView):
     permission_classes = (IsAdminUser,)
     serializer_class = RegistrationLinkSerializer
 
+    @transaction.atomic
     def post(self, request, format=None):
         serializer = self.serializer_class(data=request.data)
 
@@ -232,6 +234,7 @@ class RegistrationFinishView(APIView):
         """
         return RegistrationFinishSerializer(*args, **kwargs)
 
+    @transaction.atomic
     def post(self, request, format=None):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
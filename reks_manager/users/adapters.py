@@ -7,6 +7,8 @@ from allauth.socialaccount.adapter import DefaultSocialAccountAdapter
 from django.conf import settings
 from django.http import HttpRequest
 
+from reks_manager.user_auth.models import OutboxEmail
+
 if typing.TYPE_CHECKING:
     from allauth.socialaccount.models import SocialLogin
 
@@ -17,6 +19,9 @@ class AccountAdapter(DefaultAccountAdapter):
     def is_open_for_signup(self, request: HttpRequest) -> bool:
         return getattr(settings, "ACCOUNT_ALLOW_REGISTRATION", True)
 
+    def send_mail(self, template_prefix: str, email: str, context: dict[str, typing.Any]) -> None:
+        OutboxEmail.objects.enqueue(self.render_mail(template_prefix, email, context))
+
 
 class SocialAccountAdapter(DefaultSocialAccountAdapter):
     def is_open_for_signup(self, request: HttpRequest, sociallogin: SocialLogin) -> bool:
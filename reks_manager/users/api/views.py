@@ -1,6 +1,5 @@
 from django.contrib.auth import get_user_model
 from rest_framework import status
-from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.decorators import action
 from rest_framework.mixins import ListModelMixin, RetrieveModelMixin, UpdateModelMixin
@@ -8,6 +7,8 @@ from rest_framework.response import Response
 from rest_framework.views import exception_handler
 from rest_framework.viewsets import GenericViewSet
 
+from reks_manager.user_auth.authentication import get_or_rotate_token, get_token_expiry
+
 from .serializers import UserSerializer
 
 User = get_user_model()
@@ -18,10 +19,11 @@ class CustomAuthToken(ObtainAuthToken):
         serializer = self.serializer_class(data=request.data, context={"request": request})
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data["user"]
-        token, created = Token.objects.get_or_create(user=user)
+        token = get_or_rotate_token(user)
         return Response(
             {
                 "token": token.key,
+                "expires_at": get_token_expiry(token),
                 "user_id": user.pk,
                 "email": user.email,
                 "first_name": user.first_name,
@@ -0,0 +1,252 @@
+"""
+Per-request SQL / serializer / total timings, aggregated per router basename
+and action.
+
+``QueryMetricsMiddleware`` counts every query run while handling a request,
+``InstrumentedViewMixin`` adds the serializer time and declares the query
+budgets of a viewset. The totals are kept per process and exposed in the
+Prometheus text format by ``metrics_view``, along with the statistics of the
+database connection pools.
+"""
+import logging
+import threading
+import time
+import typing
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseNotFound
+from django.utils.crypto import constant_time_compare
+
+from .postgresql_pool import render_pool_metrics
+
+if typing.TYPE_CHECKING:
+    from rest_framework.generics import GenericAPIView as ViewBase
+else:
+    ViewBase = object
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.total_time = 0.0
+        self.view = None
+        self.action = None
+        self.query_budget = None
+
+    def __call__(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook."""
+
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.sql_count += 1
+
+    def finish(self):
+        self.total_time = time.perf_counter() - self.started
+
+
+class MetricsRegistry:
+    """Totals per ``(view, action)``, shared by the threads of the process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.series = {}
+
+    def record(self, metrics):
+        with self.lock:
+            series = self.series.setdefault(
+                (metrics.view, metrics.action),
+                {
+                    "requests": 0,
+                    "sql_queries": 0,
+                    "sql_seconds": 0.0,
+                    "serializer_seconds": 0.0,
+                    "request_seconds": 0.0,
+                    "budget_exceeded": 0,
+                    "buckets": [0] * len(LATENCY_BUCKETS),
+                },
+            )
+            series["requests"] += 1
+            series["sql_queries"] += metrics.sql_count
+            series["sql_seconds"] += metrics.sql_time
+            series["serializer_seconds"] += metrics.serializer_time
+            series["request_seconds"] += metrics.total_time
+            if metrics.query_budget is not None and metrics.sql_count > metrics.query_budget:
+                series["budget_exceeded"] += 1
+            index = bisect_left(LATENCY_BUCKETS, metrics.total_time)
+            if index < len(LATENCY_BUCKETS):
+                series["buckets"][index] += 1
+
+    def render(self):
+        """Render the totals in the Prometheus text exposition format."""
+
+        with self.lock:
+            series = {key: {**value, "buckets": list(value["buckets"])} for key, value in self.series.items()}
+
+        lines = []
+        counters = [
+            ("requests", "reks_api_requests_total", "Requests handled."),
+            ("sql_queries", "reks_api_sql_queries_total", "SQL queries run."),
+            ("sql_seconds", "reks_api_sql_seconds_total", "Time spent running SQL queries."),
+            ("serializer_seconds", "reks_api_serializer_seconds_total", "Time spent serializing responses."),
+            (
+                "budget_exceeded",
+                "reks_api_query_budget_exceeded_total",
+                "Requests running more queries than budgeted.",
+            ),
+        ]
+        for key, name, description in counters:
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+            for (view, action), values in sorted(series.items()):
+                lines.append(f"{name}{{{_labels(view, action)}}} {values[key]}")
+
+        name = "reks_api_request_seconds"
+        lines += [f"# HELP {name} Total time spent handling requests.", f"# TYPE {name} histogram"]
+        for (view, action), values in sorted(series.items()):
+            labels = _labels(view, action)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, values["buckets"]):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {values["requests"]}')
+            lines.append(f"{name}_sum{{{labels}}} {values['request_seconds']}")
+            lines.append(f"{name}_count{{{labels}}} {values['requests']}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(view, action):
+    return f'view="{view}",action="{action}"'
+
+
+registry = MetricsRegistry()
+
+
+class QueryMetricsMiddleware:
+    """
+    Records the metrics of every request in ``registry``, adds them as
+    ``Server-Timing`` / ``X-SQL-Count`` headers when ``METRICS_RESPONSE_HEADERS``
+    is on and enforces the query budget of the view.
+
+    Should be the first middleware, so queries of the other middleware count too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.metrics = metrics = RequestMetrics()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+        metrics.finish()
+
+        if metrics.view is None:
+            # 404 and views outside of the URLconf share one series, keeps the label set bounded.
+            metrics.view = metrics.action = "unmatched"
+        registry.record(metrics)
+
+        if getattr(settings, "METRICS_RESPONSE_HEADERS", False):
+            response["X-SQL-Count"] = metrics.sql_count
+            response["Server-Timing"] = ", ".join(
+                [
+                    f"sql;dur={metrics.sql_time * 1000:.1f}",
+                    f"serializer;dur={metrics.serializer_time * 1000:.1f}",
+                    f"total;dur={metrics.total_time * 1000:.1f}",
+                ]
+            )
+
+        if metrics.query_budget is not None and metrics.sql_count > metrics.query_budget:
+            message = (
+                f"{metrics.view} {metrics.action} ran {metrics.sql_count} queries, "
+                f"the budget is {metrics.query_budget}"
+            )
+            if getattr(settings, "QUERY_BUDGET_STRICT", False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = request.metrics
+        view_class = getattr(view_func, "cls", None)
+        actions = getattr(view_func, "actions", None)
+        basename = getattr(view_func, "initkwargs", {}).get("basename")
+
+        if view_class is not None and actions is not None and basename:
+            method = request.method.lower()
+            metrics.view = basename
+            metrics.action = actions.get(method, "metadata" if method == "options" else method)
+            get_query_budget = getattr(view_class, "get_query_budget", None)
+            metrics.query_budget = get_query_budget(metrics.action) if get_query_budget else None
+        else:
+            metrics.view = request.resolver_match.view_name
+            metrics.action = request.method.lower()
+
+
+class InstrumentedViewMixin(ViewBase):
+    """
+    Measures the serializer time of a viewset and declares its query budgets,
+    ``query_budgets`` maps action names to the maximum number of queries of a
+    request. Exceeding it raises in tests and logs a warning otherwise.
+    """
+
+    query_budgets: dict[str, int] = {}
+
+    @classmethod
+    def get_query_budget(cls, action):
+        return cls.query_budgets.get(action)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        metrics = getattr(self.request, "metrics", None)
+        if metrics is None:
+            return serializer
+
+        to_representation = serializer.to_representation
+
+        def timed_to_representation(instance):
+            started = time.perf_counter()
+            try:
+                return to_representation(instance)
+            finally:
+                metrics.serializer_time += time.perf_counter() - started
+
+        serializer.to_representation = timed_to_representation  # type: ignore[method-assign]
+        return serializer
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint, requires ``Authorization: Bearer <METRICS_TOKEN>``.
+    Without a configured token it is only served in DEBUG.
+    """
+
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if token:
+        authorized = constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}")
+    else:
+        authorized = settings.DEBUG
+    if not authorized:
+        return HttpResponseNotFound()
+    return HttpResponse(
+        registry.render() + render_pool_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
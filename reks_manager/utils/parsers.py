@@ -0,0 +1,27 @@
+"""JSON parser decoding with orjson, see reks_manager.utils.renderers."""
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer, orjson
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        # orjson rejects NaN and Infinity, like the strict stdlib parser.
+        if orjson is None or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            data = stream.read()
+            if codecs.lookup(encoding).name != "utf-8":
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except ValueError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1,91 @@
+"""
+PostgreSQL backend taking its connections from a psycopg 3 ``ConnectionPool``
+per database alias and process, enabled with::
+
+    DATABASES["default"]["ENGINE"] = "reks_manager.utils.postgresql_pool"
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"]["pool"] = {"min_size": 1, "max_size": 4}
+
+Closing a Django connection, at the end of every request with
+``CONN_MAX_AGE = 0``, returns it to the pool instead of disconnecting. The
+``pool`` options are passed to ``ConnectionPool``, connections are checked
+before they are handed out. The pool statistics are exposed with the other
+metrics of ``reks_manager.utils.instrumentation.metrics_view``.
+
+Under ASGI the end of a request comes after the response was sent to the
+client, ``ReleaseConnectionsMiddleware`` returns the connections as soon as
+the response is built, so slow clients do not hold them.
+"""
+import os
+import threading
+import typing
+
+from django.db import connections
+
+if typing.TYPE_CHECKING:
+    from psycopg_pool import ConnectionPool
+
+# (alias, pid) -> ConnectionPool, a forked worker opens its own pools.
+pools: dict[tuple[str, int], "ConnectionPool"] = {}
+pools_lock = threading.Lock()
+
+# Current values, the other statistics only grow.
+GAUGES = {"pool_min", "pool_max", "pool_size", "pool_available", "requests_waiting"}
+
+
+def get_pool_stats():
+    """Statistics of the pools of this process per alias, see ``ConnectionPool.get_stats``."""
+
+    pid = os.getpid()
+    with pools_lock:
+        current = {alias: pool for (alias, pool_pid), pool in pools.items() if pool_pid == pid}
+    return {alias: pool.get_stats() for alias, pool in sorted(current.items())}
+
+
+def close_pools():
+    """Close the pools of this process, e.g. in a test tearing down its database."""
+
+    pid = os.getpid()
+    with pools_lock:
+        keys = [key for key in pools if key[1] == pid]
+        closing = [pools.pop(key) for key in keys]
+    for pool in closing:
+        pool.close()
+
+
+def render_pool_metrics():
+    """Pool statistics in the Prometheus text exposition format, nothing without pools."""
+
+    stats = get_pool_stats()
+    names = sorted({name for values in stats.values() for name in values})
+    lines = []
+    for name in names:
+        metric = f"reks_db_{name}"
+        metric_type = "gauge" if name in GAUGES else "counter"
+        lines += [f"# HELP {metric} Connection pool statistic {name}.", f"# TYPE {metric} {metric_type}"]
+        for alias, values in stats.items():
+            if name in values:
+                lines.append(f'{metric}{{alias="{alias}"}} {values[name]}')
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+class ReleaseConnectionsMiddleware:
+    """
+    Closes the connections of the request, returning them to the pool, once the
+    response is built instead of at ``request_finished``. Streaming responses
+    read their rows while they are sent and keep them.
+
+    Should be the first middleware, so the others are done with their queries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not response.streaming:
+            for connection in connections.all(initialized_only=True):
+                # The transaction of a test case spans its requests.
+                if not connection.in_atomic_block:
+                    connection.close_if_unusable_or_obsolete()
+        return response
@@ -0,0 +1,74 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base as postgresql
+from django.utils.asyncio import async_unsafe
+from psycopg import IsolationLevel
+
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError as e:
+    raise ImproperlyConfigured(f"Error loading psycopg_pool module: {e}")
+
+from . import pools, pools_lock
+
+
+class DatabaseWrapper(postgresql.DatabaseWrapper):
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    @property
+    def pool(self):
+        """Pool of the alias in this process, ``None`` for the short-lived connections to the ``postgres`` database."""
+
+        if self.alias == NO_DB_ALIAS:
+            return None
+        key = (self.alias, os.getpid())
+        pool = pools.get(key)
+        if pool is not None:
+            return pool
+        with pools_lock:
+            if key not in pools:
+                options = {"min_size": 1, **self.settings_dict["OPTIONS"].get("pool", {})}
+                pools[key] = ConnectionPool(
+                    kwargs=self.get_connection_params(),
+                    check=ConnectionPool.check_connection,
+                    name=self.alias,
+                    open=True,
+                    **options,
+                )
+            return pools[key]
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        # Same as the parent, with a connection of the pool opened with conn_params.
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        try:
+            self.isolation_level = IsolationLevel(
+                IsolationLevel.READ_COMMITTED if isolation_level is None else isolation_level
+            )
+        except ValueError:
+            raise ImproperlyConfigured(
+                f"Invalid transaction isolation level {isolation_level} "
+                f"specified. Use one of the psycopg.IsolationLevel values."
+            )
+        connection = pool.getconn()
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        pool = self.pool
+        if self.connection is None or pool is None:
+            return super()._close()  # type: ignore[misc]
+        # The pool rolls back a connection returned in a transaction and
+        # replaces a broken one.
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
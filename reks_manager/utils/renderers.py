@@ -0,0 +1,40 @@
+"""
+JSON renderer encoding with orjson, several times faster than the stdlib
+``json`` on large responses, falling back to DRF's ``JSONRenderer`` when
+orjson is not installed or the output has to be indented or ASCII-only.
+
+Dates and times are passed through to DRF's ``JSONEncoder``, which formats
+them like the default renderer (``Z`` suffix for UTC). It handles
+``Decimal``, lazy translation strings and the other types orjson does not
+know as well.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+# Non-string keys are converted like the stdlib does.
+OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson is not None else None
+
+_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+
+        ret = orjson.dumps(data, default=_encoder.default, option=OPTIONS)
+        # Escaped like JSONRenderer does, keeps the output a strict JavaScript subset.
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
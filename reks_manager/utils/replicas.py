@@ -0,0 +1,165 @@
+"""
+Optional read replica. With a ``REPLICA_DATABASE`` alias configured
+(``DATABASE_REPLICA_URL``), the public and reporting views read from it:
+
+- ``ReplicaReadsMixin`` for DRF views, after authentication and permission
+  checks ran on the primary, for the actions in ``replica_actions``;
+- ``replica_reads`` for plain Django views.
+
+Everything else, and any code outside a request, uses ``default``.
+
+Read-your-writes: once a staff user wrote to the primary, the response sets
+a signed cookie sending the reads of that browser to the primary for
+``REPLICA_STICKY_SECONDS``, longer than the replication lag should be.
+
+Cached views: ``pin_primary_reads(namespace)``, called when a cache namespace
+is invalidated, sends the reads of the views with that ``cache_namespace`` to
+the primary for ``REPLICA_STICKY_SECONDS``. The responses cached and the
+validators computed right after a change then do not come from a replica
+still lagging behind it.
+"""
+import typing
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+if typing.TYPE_CHECKING:
+    from rest_framework.generics import GenericAPIView as ViewBase
+else:
+    ViewBase = object
+
+PIN_COOKIE = "primary_db"
+PIN_SALT = "reks_manager.utils.replicas"
+PIN_CACHE_PREFIX = "primary-reads"
+
+
+class RoutingState:
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.use_replica = False
+        self.wrote = False
+
+
+_state: ContextVar[RoutingState | None] = ContextVar("replica_routing", default=None)
+
+
+def get_replica_alias():
+    alias = getattr(settings, "REPLICA_DATABASE", None)
+    return alias if alias and alias in settings.DATABASES else None
+
+
+def read_from_replica():
+    """Send the remaining reads of the current request to the replica, unless it is pinned to the primary."""
+
+    state = _state.get()
+    if state is not None:
+        state.use_replica = True
+
+
+def pin_primary_reads(namespace):
+    if get_replica_alias() is not None:
+        cache.set(f"{PIN_CACHE_PREFIX}:{namespace}", True, timeout=settings.REPLICA_STICKY_SECONDS)
+
+
+def is_primary_pinned(namespace):
+    if namespace is None or get_replica_alias() is None:
+        return False
+    return cache.get(f"{PIN_CACHE_PREFIX}:{namespace}", False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            # Related objects come from the database of the instance.
+            return instance._state.db
+        state = _state.get()
+        if state is not None and state.use_replica and not state.pinned:
+            return get_replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == get_replica_alias():
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Keeps the routing state of the request and the read-your-writes cookie."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if get_replica_alias() is None:
+            return self.get_response(request)
+
+        state = RoutingState(pinned=self.is_pinned(request))
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+
+        user = getattr(request, "user", None)
+        if state.wrote and request.method not in SAFE_METHODS and user is not None and user.is_staff:
+            response.set_signed_cookie(
+                PIN_COOKIE,
+                "1",
+                salt=PIN_SALT,
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                secure=request.is_secure(),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def is_pinned(self, request):
+        try:
+            request.get_signed_cookie(PIN_COOKIE, salt=PIN_SALT, max_age=settings.REPLICA_STICKY_SECONDS)
+        except (KeyError, signing.BadSignature):
+            return False
+        return True
+
+
+class ReplicaReadsMixin(ViewBase):
+    """
+    Reads of the safe-method actions listed in ``replica_actions``, all of
+    them when ``None``, go to the replica, unless the ``cache_namespace`` of
+    the view was pinned to the primary by ``pin_primary_reads``.
+    """
+
+    replica_actions: tuple[str, ...] | None = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        action = getattr(self, "action", None)
+        if request.method in SAFE_METHODS and (self.replica_actions is None or action in self.replica_actions):
+            if not is_primary_pinned(getattr(self, "cache_namespace", None)):
+                read_from_replica()
+
+
+def replica_reads(view_func):
+    """Decorator sending the reads of the safe-method requests of a Django view to the replica."""
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            read_from_replica()
+        return view_func(request, *args, **kwargs)
+
+    return wrapper
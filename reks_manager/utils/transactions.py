@@ -0,0 +1,48 @@
+"""
+Transaction policy of the API. Requests are not wrapped in a transaction
+(``ATOMIC_REQUESTS`` is off), so reads run in autocommit and never hold a
+transaction open while a response is serialized or streamed.
+
+Writes made of several statements run in an explicit ``transaction.atomic``
+block around the database work only: ``AtomicWritesMixin`` for the generic
+viewsets, a ``with transaction.atomic()`` in custom actions and views.
+Anything leaving the database (mail, cache invalidation, image processing)
+is registered with ``transaction.on_commit`` by the code doing the write.
+"""
+import typing
+
+from django.db import router, transaction
+
+if typing.TYPE_CHECKING:
+    from rest_framework.generics import GenericAPIView
+    from rest_framework.mixins import CreateModelMixin, DestroyModelMixin, UpdateModelMixin
+
+    # The mixin is combined with generic views, which provide the methods it wraps.
+    class WritesViewBase(CreateModelMixin, UpdateModelMixin, DestroyModelMixin, GenericAPIView):
+        pass
+
+else:
+    WritesViewBase = object
+
+
+class AtomicWritesMixin(WritesViewBase):
+    """
+    Runs ``perform_create``, ``perform_update`` and ``perform_destroy`` of a
+    generic view in a transaction of the database its model is written to.
+    Views overriding them wrap their own body with ``self.atomic()``.
+    """
+
+    def atomic(self):
+        return transaction.atomic(using=router.db_for_write(self.get_queryset().model))
+
+    def perform_create(self, serializer):
+        with self.atomic():
+            super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        with self.atomic():
+            super().perform_update(serializer)
+
+    def perform_destroy(self, instance):
+        with self.atomic():
+            super().perform_destroy(instance)